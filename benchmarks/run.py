@@ -0,0 +1,208 @@
+"""Runs the crawlers end to end in headless Chrome against the local fixture site (see `benchmarks.site`) and reports the
+throughput, the per-item latency and the peak memory of every scenario.
+
+Usage:
+    python -m benchmarks.run                      # run every scenario and print the report
+    python -m benchmarks.run --save-baseline      # record the report as the baseline
+    python -m benchmarks.run --compare            # compare against the baseline, fail on a throughput regression
+"""
+from benchmarks.site import FixtureSite, SiteOptions
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+from tiktok_crawler.downloader import Downloader
+
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SCENARIOS = ("foryou", "search")
+DRIVER_OPTIONS = ["--headless=new", "--no-sandbox", "--disable-dev-shm-usage", "--window-size=1280,2000"]
+
+class RssSampler:
+    """Samples the resident memory of this process and of its children, e.g. chromedriver and Chrome, from a background thread.
+    Without `psutil`, only the peak of this process is known.
+
+    Args:
+        interval (float): The number of seconds between two samples.
+    """
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def peak_mb(self) -> float:
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return round(max(own, self.peak / 1024 ** 2), 1)
+
+    def _sample(self) -> None:
+        if psutil is None:
+            return
+
+        process = psutil.Process()
+        while not self._stop.wait(self.interval):
+            try:
+                tree = [process] + process.children(recursive=True)
+                self.peak = max(self.peak, sum(child.memory_info().rss for child in tree if child.is_running()))
+            except psutil.Error:
+                continue
+
+def run_scenario(scenario: str, options: SiteOptions, extractor: str, download: bool, lean: bool = False) -> dict:
+    """Crawls the fixture site with one crawler.
+
+    Args:
+        scenario (str): One of `SCENARIOS`.
+        options (SiteOptions): The shape of the fixture site.
+        extractor (str): The extractor backend, see `tiktok_crawler.crawler.EXTRACTORS`.
+        download (bool): Saves every Tiktok video, streaming the video from the fake MP4 endpoint.
+        lean (bool): Crawls with a lean browser, see `tiktok_crawler.driver.make_lean()`.
+
+    Returns:
+        dict: The measurements of the run.
+    """
+    from tiktok_crawler.crawler.foryoupage import CrawlerForYouPage
+    from tiktok_crawler.crawler.search import SearchCrawler
+
+    with FixtureSite(options) as site, tempfile.TemporaryDirectory() as output, RssSampler() as sampler:
+        Config.CRAWL_ROOT_URL = f"{site.url}/foryou"
+        Config.CRAWL_SEARCH_URL = f"{site.url}/search?"
+        instrumentation.registry.reset()
+
+        started = time.perf_counter()
+        if scenario == "foryou":
+            crawler = CrawlerForYouPage(limit=options.items, driver_options=DRIVER_OPTIONS, extractor=extractor, lean=lean)
+        else:
+            crawler = SearchCrawler(
+                "benchmark", limit=options.items, driver_options=DRIVER_OPTIONS, extractor=extractor, lean=lean
+            )
+        setup = time.perf_counter() - started
+
+        latencies, missing = [], 0
+        with Downloader(rate=None) as downloader:
+            last = time.perf_counter()
+            for tiktok in crawler.iter_tiktok_videos():
+                now = time.perf_counter()
+                latencies.append(now - last)
+                last = now
+                missing += not tiktok.media.link
+                if download:
+                    downloader.submit(tiktok, path=output)
+        elapsed = time.perf_counter() - started
+
+    count = len(latencies)
+    latencies = np.array(latencies or [np.nan])
+    return dict(
+        scenario=scenario,
+        extractor=extractor,
+        lean=lean,
+        items=count,
+        missing=missing,
+        setup_seconds=round(setup, 3),
+        elapsed_seconds=round(elapsed, 3),
+        items_per_second=round(count / elapsed, 3),
+        p50_seconds=round(float(np.nanpercentile(latencies, 50)), 4),
+        p99_seconds=round(float(np.nanpercentile(latencies, 99)), 4),
+        peak_rss_mb=sampler.peak_mb(),
+        stages=instrumentation.registry.summary()["histograms"],
+    )
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the change of every scenario against the baseline.
+
+    Args:
+        report (dict): The report of this run.
+        baseline (dict): The report of the baseline.
+        tolerance (float): The relative drop of `items_per_second` which counts as a regression.
+
+    Returns:
+        bool: `True` if no scenario regressed.
+    """
+    ok = True
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name}: no baseline")
+            continue
+
+        changes = []
+        for key in ("items_per_second", "p50_seconds", "p99_seconds", "peak_rss_mb"):
+            if before.get(key) and result.get(key) is not None:
+                changes.append(f"{key} {before[key]} -> {result[key]} ({(result[key] / before[key] - 1) * 100:+.1f}%)")
+        print(f"{name}: " + ", ".join(changes))
+
+        if before.get("items_per_second") and result["items_per_second"] < before["items_per_second"] * (1 - tolerance):
+            print(f"{name}: throughput regressed by more than {tolerance:.0%}")
+            ok = False
+    return ok
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the crawlers against a local Tiktok-like fixture site.")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="The scenarios to run. Defaults to all of them.")
+    parser.add_argument("--extractor", default="script", help="The extractor backend.")
+    parser.add_argument("--items", type=int, default=50, help="The number of Tiktok videos on the fixture site.")
+    parser.add_argument("--batch", type=int, default=10, help="The number of Tiktok videos appended per scroll or click.")
+    parser.add_argument("--latency", type=int, default=200, help="The milliseconds it takes to append a batch.")
+    parser.add_argument("--captcha", type=int, default=0, help="The milliseconds the captcha stays up. No captcha if 0.")
+    parser.add_argument("--missing", type=int, default=0, help="Every n-th Tiktok video has no video. None if 0.")
+    parser.add_argument("--lean", action="store_true", help="Crawls with a lean browser which blocks images, media and fonts.")
+    parser.add_argument("--no-download", action="store_true", help="Does not save the Tiktok videos.")
+    parser.add_argument("--output", help="Writes the report to this file.")
+    parser.add_argument("--baseline", default=BASELINE, help="The baseline report.")
+    parser.add_argument("--save-baseline", action="store_true", help="Records the report as the baseline.")
+    parser.add_argument("--compare", action="store_true", help="Compares the report with the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="The throughput drop which counts as a regression.")
+    args = parser.parse_args(argv)
+    if args.compare and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"No baseline at {args.baseline}, record one with --save-baseline first")
+
+    logging.basicConfig(level=logging.WARNING)
+    options = SiteOptions(items=args.items, batch=args.batch, latency=args.latency, captcha=args.captcha, missing=args.missing)
+    report = dict(
+        options=vars(options),
+        scenarios={
+            scenario: run_scenario(scenario, options, args.extractor, not args.no_download, args.lean)
+            for scenario in args.scenario or SCENARIOS
+        },
+    )
+
+    from tiktok_crawler.driver import Driver
+    Driver().get_driver().quit()
+
+    text = json.dumps(report, indent=4)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            file.write(text)
+    if args.compare:
+        with open(args.baseline) as file:
+            return 0 if compare(report, json.load(file), args.tolerance) else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
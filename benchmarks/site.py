@@ -0,0 +1,258 @@
+"""A local, Tiktok-like fixture site for the benchmarks.
+
+The pages follow the structure matched by `tiktok_crawler.xpath.foryoupage` and `tiktok_crawler.xpath.search`, embed the same
+items as hydration state, and link to a fake MP4 endpoint, so the crawlers run end to end without touching the network.
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import html
+import json
+import re
+import threading
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+{overlay}<div id="app"><div></div><div></div><div><div></div>{body}</div></div>
+<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">{state}</script>
+<script>{script}</script>
+</body></html>"""
+
+FORYOU_SCRIPT = """
+var remaining = JSON.parse(document.getElementById("pending").textContent), loading = false;
+window.addEventListener("scroll", function () {
+    if (loading || !remaining.length || window.innerHeight + window.scrollY < document.body.scrollHeight - 10) return;
+    loading = true;
+    setTimeout(function () {
+        document.getElementById("feed").insertAdjacentHTML("beforeend", remaining.splice(0, %(batch)d).join(""));
+        loading = false;
+    }, %(latency)d);
+});
+"""
+
+SEARCH_SCRIPT = """
+var remaining = JSON.parse(document.getElementById("pending").textContent);
+var captcha = document.getElementById("tiktok-verify-ele");
+if (captcha) setTimeout(function () {
+    captcha.remove();
+    document.getElementById("results").style.display = "";
+}, %(captcha)d);
+document.getElementById("more").addEventListener("click", function () {
+    var button = this;
+    setTimeout(function () {
+        document.getElementById("list").insertAdjacentHTML("beforeend", remaining.splice(0, %(batch)d).join(""));
+        if (!remaining.length) button.remove();
+    }, %(latency)d);
+});
+"""
+
+@dataclass
+class SiteOptions:
+    """The shape of the fixture site.
+
+    Args:
+        items (int): The number of Tiktok videos in the feed and in the search results.
+        batch (int): The number of Tiktok videos rendered at first and appended by every scroll or click on *Load more*.
+        latency (int): The milliseconds it takes to append a batch.
+        captcha (int): The milliseconds the captcha of the search results stays up before it is "solved". No captcha if 0.
+        missing (int): Every `missing`-th Tiktok video has no video `src`. No missing videos if 0.
+        video_size (int): The number of bytes served by the fake MP4 endpoint.
+    """
+    items: int = 50
+    batch: int = 10
+    latency: int = 200
+    captcha: int = 0
+    missing: int = 0
+    video_size: int = 256 * 1024
+
+class FixtureSite:
+    """Serves the fixture site from a background thread.
+
+    Args:
+        options (SiteOptions): The shape of the fixture site.
+        host (str): The interface to bind.
+        port (int): The port to bind, a free port if 0.
+    """
+    def __init__(self, options: SiteOptions = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.options = options or SiteOptions()
+        site = self
+
+        class Handler(_Handler):
+            pass
+        Handler.site = site
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> "FixtureSite":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def item(self, index: int) -> dict:
+        """The hydration item struct of the Tiktok video at `index`.
+        """
+        missing = self.options.missing and (index + 1) % self.options.missing == 0
+        return dict(
+            id=str(7000000000000000000 + index),
+            desc=f"Fixture video {index}",
+            author=dict(uniqueId=f"user{index % 7}", nickname=f"User {index % 7}", avatarThumb=f"{self.url}/avatar/{index % 7}.jpeg"),
+            video=dict(playAddr="" if missing else f"{self.url}/media/{index}.mp4"),
+            music=dict(id=str(6000000000000000000 + index % 5), title=f"original sound {index % 5}"),
+            stats=dict(diggCount=1000 * index + 17, commentCount=10 * index, shareCount=index),
+            textExtra=[dict(hashtagName="fixture"), dict(hashtagName=f"tag{index % 3}")],
+        )
+
+    def video_link(self, item: dict) -> str:
+        return f"{self.url}/@{item['author']['uniqueId']}/video/{item['id']}"
+
+    def foryou_item(self, index: int) -> str:
+        link = html.escape(self.video_link(self.item(index)))
+        item = self._escape(self.item(index))
+        return (
+            "<div><div>"
+            "<div>"
+            f"<div><a href=\"{item['author_link']}\"><div><span><img src=\"{item['avatar']}\"></span></div></a>"
+            f"<a href=\"{item['author_link']}\"><h3>{item['uniqueid']}</h3><h4>{item['nickname']}</h4></a></div>"
+            f"<div>{item['caption']}</div>"
+            f"<h4>{item['music']}</h4>"
+            "</div>"
+            f"<div><div><div><div><div><div>{item['video']}</div></div></div></div></div>"
+            f"<div>{item['metrics']}</div></div>"
+            f"</div><a href=\"{link}\"></a></div>"
+        )
+
+    def search_item(self, index: int) -> str:
+        link = html.escape(self.video_link(self.item(index)))
+        return f"<div><div><div><div><div><a href=\"{link}\">Fixture video {index}</a></div></div></div></div></div>"
+
+    def video_page(self, index: int) -> str:
+        item = self._escape(self.item(index))
+        container = (
+            "<div>"
+            "<div><div><div></div>"
+            f"<div><div><div><div>{item['video']}</div></div></div></div>"
+            f"<div></div><div>{item['metrics']}</div></div>"
+            f"<div><div>{item['caption']}</div><h4>{item['music']}</h4></div></div>"
+            f"<div><div><a href=\"{item['author_link']}\"><div><span><img src=\"{item['avatar']}\"></span></div></a>"
+            f"<a href=\"{item['author_link']}\"><span>{item['uniqueid']}</span><span><span>{item['nickname']}</span></span></a></div></div>"
+            "</div>"
+        )
+        body = f"<div><div><div></div><div>{container}</div></div></div>"
+        return self._page(f"Video {index}", body, dict(itemInfo=dict(itemStruct=self.item(index))), "")
+
+    def foryou_page(self) -> str:
+        options = self.options
+        first = min(options.batch, options.items)
+        feed = "".join(self.foryou_item(index) for index in range(first))
+        pending = [self.foryou_item(index) for index in range(first, options.items)]
+        body = (
+            f"<div><div id=\"feed\">{feed}</div></div>"
+            f"<script id=\"pending\" type=\"application/json\">{self._json(pending)}</script>"
+        )
+        state = dict(itemList=[self.item(index) for index in range(first)])
+        return self._page("For You", body, state, FORYOU_SCRIPT % dict(batch=options.batch, latency=options.latency))
+
+    def search_page(self, query: str) -> str:
+        options = self.options
+        first = min(options.batch, options.items)
+        results = "".join(self.search_item(index) for index in range(first))
+        pending = [self.search_item(index) for index in range(first, options.items)]
+        captcha = "<div id=\"tiktok-verify-ele\"><div>Drag the slider</div></div>" if options.captcha else ""
+        hidden = " style=\"display: none\"" if options.captcha else ""
+        more = "<button id=\"more\">Load more</button>" if pending else "<span id=\"more\"></span>"
+        body = (
+            f"<div><div></div><div{hidden} id=\"results\"><div id=\"list\">{results}</div><div>{more}</div></div></div>"
+            f"<script id=\"pending\" type=\"application/json\">{self._json(pending)}</script>"
+        )
+        script = SEARCH_SCRIPT % dict(batch=options.batch, latency=options.latency, captcha=options.captcha)
+        return self._page(f"Search {html.escape(query)}", body, dict(itemList=[]), script, overlay=captcha)
+
+    def _page(self, title: str, body: str, state: dict, script: str, overlay: str = "") -> str:
+        return PAGE.format(
+            title=title, overlay=overlay, body=body, state=self._json(dict(__DEFAULT_SCOPE__=state)), script=script
+        )
+
+    def _escape(self, item: dict) -> dict:
+        author, music, stats = item["author"], item["music"], item["stats"]
+        tags = "".join(
+            f"<a href=\"{self.url}/tag/{extra['hashtagName']}\"><strong>#{extra['hashtagName']}</strong></a>"
+            for extra in item["textExtra"]
+        )
+        src = item["video"]["playAddr"]
+        src = f" src=\"{html.escape(src)}\"" if src else ""
+        return dict(
+            author_link=html.escape(f"{self.url}/@{author['uniqueId']}"),
+            avatar=html.escape(author["avatarThumb"]),
+            uniqueid=html.escape(author["uniqueId"]),
+            nickname=html.escape(author["nickname"]),
+            caption=f"<span>{html.escape(item['desc'])}</span><span>{tags}</span>",
+            music=f"<a href=\"{self.url}/music/{music['id']}\">{html.escape(music['title'])}</a>",
+            video=f"<video{src}><source{src} type=\"video/mp4\"></video>",
+            metrics="".join(
+                f"<button><strong>{stats[name]}</strong></button>" for name in ("diggCount", "commentCount", "shareCount")
+            ),
+        )
+
+    @staticmethod
+    def _json(value) -> str:
+        return json.dumps(value).replace("</", "<\\/")
+
+class _Handler(BaseHTTPRequestHandler):
+    site = None
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        site = self.site
+        if url.path == "/foryou":
+            return self._send(200, "text/html", site.foryou_page().encode())
+        if url.path == "/search":
+            return self._send(200, "text/html", site.search_page(parse_qs(url.query).get("q", [""])[0]).encode())
+
+        match = re.fullmatch(r"/@[^/]+/video/(\d+)", url.path)
+        if match:
+            return self._send(200, "text/html", site.video_page(int(match.group(1)) - 7000000000000000000).encode())
+
+        match = re.fullmatch(r"/media/(\d+)\.mp4", url.path)
+        if match:
+            return self._send_video(site.options.video_size)
+
+        self._send(404, "text/plain", b"Not found")
+
+    def _send_video(self, size: int) -> None:
+        start = 0
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            if start >= size:
+                return self._send(416, "video/mp4", b"")
+
+        body = bytes(size - start)
+        self.send_response(206 if match else 200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(body)))
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
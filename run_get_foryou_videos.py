@@ -1,6 +1,12 @@
+from tiktok_crawler import instrumentation
 from tiktok_crawler.crawler.foryoupage import CrawlerForYouPage
+from tiktok_crawler.dedup import SeenIndex
+from tiktok_crawler.downloader import Downloader
 
-crawl = CrawlerForYouPage(limit=5)
-tiktoks = crawl.get_tiktok_videos()
-for tiktok in tiktoks:
-    tiktok.save(path="./output")
+with SeenIndex("./output/seen.db") as seen:
+    crawl = CrawlerForYouPage(limit=5, seen=seen)
+    with Downloader() as downloader:
+        for tiktok in crawl.iter_tiktok_videos():
+            downloader.submit(tiktok, path="./output")
+
+instrumentation.registry.to_json("./output/metrics.json")
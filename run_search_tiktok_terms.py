@@ -0,0 +1,8 @@
+from tiktok_crawler.coordinator import ShardCoordinator, read_terms
+
+import logging
+
+if __name__ == "__main__":
+    coordinator = ShardCoordinator(read_terms("./terms.txt"), limit=100, sink="jsonl", seen="./output/seen.db")
+    coordinator.run()
+    logging.info(f"Shards per status: {coordinator.summary()}")
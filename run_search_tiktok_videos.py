@@ -1,9 +1,15 @@
+from tiktok_crawler import instrumentation
+from tiktok_crawler.checkpoint import CheckpointStore
 from tiktok_crawler.crawler.search import SearchCrawler
+from tiktok_crawler.dedup import SeenIndex
+from tiktok_crawler.downloader import Downloader
 
 # driver_options = ["start-maximized"]
 
-crawl = SearchCrawler(limit=100, search="test")
-tiktoks = crawl.get_tiktok_videos()
-for tiktok in tiktoks:
-    tiktok.save(path="./output")
+with CheckpointStore("./output/checkpoint.db", job="test") as checkpoint, SeenIndex("./output/seen.db") as seen:
+    crawl = SearchCrawler(limit=100, search="test", checkpoint=checkpoint, seen=seen)
+    with Downloader() as downloader:
+        for tiktok in crawl.iter_tiktok_videos():
+            downloader.submit(tiktok, path="./output", checkpoint=checkpoint)
 
+instrumentation.registry.to_json("./output/metrics.json")
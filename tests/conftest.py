@@ -0,0 +1,28 @@
+from benchmarks.site import FixtureSite, SiteOptions
+
+import importlib
+import os
+import sys
+
+import pytest
+
+# `tiktok_crawler.config` is created by the user from `config_sample.py`, fall back to the sample in a fresh checkout.
+try:
+    importlib.import_module("tiktok_crawler.config")
+except ImportError:
+    sys.modules["tiktok_crawler.config"] = importlib.import_module("tiktok_crawler.config_sample")
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def read_fixture(name: str) -> str:
+    """Reads an HTML fixture rendered by `tests.fixtures.generate`.
+    """
+    with open(os.path.join(FIXTURES, name)) as file:
+        return file.read()
+
+@pytest.fixture(scope="session")
+def fixture_site():
+    """A running fixture site of the benchmarks, e.g. to download its fake videos.
+    """
+    with FixtureSite(SiteOptions(items=4, video_size=64 * 1024)) as site:
+        yield site
@@ -0,0 +1,54 @@
+"""Regenerates the HTML fixtures of the tests from the fixture site of the benchmarks.
+
+Usage:
+    python -m tests.fixtures.generate
+"""
+from benchmarks.site import FixtureSite, SiteOptions
+
+import json
+import os
+
+FIXTURES = os.path.dirname(__file__)
+URL = "https://www.tiktok.com"
+ITEMS = 8
+BATCH = 4
+MISSING = 3
+NULL_MUSIC = 4
+STATE = "<script id=\"__UNIVERSAL_DATA_FOR_REHYDRATION__\" type=\"application/json\">"
+
+def reverse_items(page: str) -> str:
+    """Reverses the items of the hydration state of a page, leaving its DOM as is.
+    """
+    start = page.index(STATE) + len(STATE)
+    stop = page.index("</script>", start)
+    state = json.loads(page[start:stop])
+    state["__DEFAULT_SCOPE__"]["itemList"].reverse()
+    return page[:start] + json.dumps(state).replace("</", "<\\/") + page[stop:]
+
+def generate() -> dict:
+    """Renders every fixture.
+
+    Returns:
+        dict: The HTML of every fixture by file name.
+    """
+    site = FixtureSite(SiteOptions(items=ITEMS, batch=BATCH, missing=MISSING))
+    site.server.server_close()
+    site.url = URL
+
+    feed = "</div></div><script id=\"pending\""
+    scrolled = "".join(site.foryou_item(index) for index in range(BATCH, ITEMS))
+    music = json.dumps(site.item(NULL_MUSIC)["music"]["title"])
+    return {
+        "foryou.html": site.foryou_page(),
+        "foryou_scrolled.html": site.foryou_page().replace(feed, scrolled + feed, 1),
+        "foryou_reversed.html": reverse_items(site.foryou_page()),
+        "search.html": site.search_page("fixture"),
+        "video.html": site.video_page(0),
+        "video_missing_media.html": site.video_page(MISSING - 1),
+        "video_null_music.html": site.video_page(NULL_MUSIC).replace(f"\"title\": {music}", "\"title\": null", 1),
+    }
+
+if __name__ == "__main__":
+    for name, page in generate().items():
+        with open(os.path.join(FIXTURES, name), "w") as file:
+            file.write(page)
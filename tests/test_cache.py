@@ -0,0 +1,71 @@
+from tests.conftest import read_fixture
+from tiktok_crawler import cache as cache_module
+from tiktok_crawler.cache import PageCache
+from tiktok_crawler.crawler.search import SearchCrawler
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+
+from types import SimpleNamespace
+
+import pytest
+
+VIDEO = "https://www.tiktok.com/@user0/video/7000000000000000000"
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake clock of the cache, advanced by setting `clock.now`.
+    """
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+@pytest.fixture
+def cache(tmp_path):
+    with PageCache(str(tmp_path / "cache.db"), ttl=60, max_bytes=1 << 20) as cache:
+        yield cache
+
+def test_pages_turn_stale_after_the_ttl(cache, clock):
+    cache.put(VIDEO, "<html></html>")
+    assert not cache.get(VIDEO).is_stale
+
+    clock.now += 60
+    page = cache.get(VIDEO)
+    assert page.is_stale
+    assert page.content == "<html></html>"
+
+def test_evicts_the_least_recently_accessed_pages(cache, clock):
+    for name in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(f"https://www.tiktok.com/{name}", name * 100)
+    clock.now += 1
+    cache.get("https://www.tiktok.com/a")
+
+    cache.max_bytes = cache.size() - 1
+    cache._evict()
+    assert "https://www.tiktok.com/b" not in cache
+    assert "https://www.tiktok.com/a" in cache
+    assert "https://www.tiktok.com/c" in cache
+
+def test_links_of_a_video_share_a_page(cache):
+    cache.put(VIDEO, "<html></html>")
+    assert f"{VIDEO}?lang=en" in cache
+    assert "https://www.tiktok.com/@other/video/7000000000000000000" in cache
+    assert "https://www.tiktok.com/@user0/video/7000000000000000001" not in cache
+    assert len(cache) == 1
+
+    cache.put(f"{VIDEO}?lang=en", "<html><body></body></html>")
+    assert len(cache) == 1
+    assert cache.get(VIDEO).content == "<html><body></body></html>"
+
+def get_cached_tiktoks(cache: PageCache, url: str) -> list:
+    crawler = SimpleNamespace(cache=cache, limiter=None, _cache_extractor=HydrationExtractor(SearchCrawler.XPATH))
+    return SearchCrawler._get_cached_tiktoks(crawler, url)
+
+def test_cached_video_page_is_extracted(cache):
+    cache.put(VIDEO, read_fixture("video.html"))
+    tiktoks = get_cached_tiktoks(cache, VIDEO)
+    assert len(tiktoks) == 1
+    assert tiktoks[0].url == VIDEO
+
+def test_cached_page_that_fails_to_parse_is_a_miss(cache):
+    cache.put(VIDEO, "")
+    assert get_cached_tiktoks(cache, VIDEO) is None
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pyppeteer")
+
+from pyppeteer.chromium_downloader import check_chromium
+
+from tiktok_crawler.crawler.cdp import AsyncCrawler, AsyncSearchCrawler
+
+pytestmark = pytest.mark.skipif(not check_chromium(), reason="pyppeteer has not downloaded Chromium")
+
+LAUNCH_OPTIONS = dict(headless=True, args=["--no-sandbox"])
+
+def collect(crawler: AsyncCrawler) -> list:
+    async def _collect() -> list:
+        return [tiktok async for tiktok in crawler.stream()]
+    return asyncio.run(_collect())
+
+def test_async_crawler_streams_video_pages(fixture_site):
+    items = [fixture_site.item(index) for index in range(fixture_site.options.items)]
+    crawler = AsyncCrawler(urls=[fixture_site.video_link(item) for item in items], tabs=2, launch_options=LAUNCH_OPTIONS)
+
+    tiktoks = {tiktok.id: tiktok for tiktok in collect(crawler)}
+    assert sorted(tiktoks) == sorted(item["id"] for item in items)
+    for item in items:
+        assert tiktoks[item["id"]].caption.text == item["desc"]
+        assert tiktoks[item["id"]].media.link == item["video"]["playAddr"]
+
+def test_async_search_crawler_streams_search_results(fixture_site):
+    crawler = AsyncSearchCrawler(
+        "fixture", limit=3, tabs=2, launch_options=LAUNCH_OPTIONS, search_url=f"{fixture_site.url}/search?q=fixture"
+    )
+
+    tiktoks = collect(crawler)
+    assert sorted(tiktok.id for tiktok in tiktoks) == [fixture_site.item(index)["id"] for index in range(3)]
@@ -0,0 +1,79 @@
+from tiktok_crawler import coordinator
+from tiktok_crawler.coordinator import ShardCoordinator
+
+import multiprocessing
+import os
+import queue
+
+import pytest
+
+def _exit(tasks, events, limiter, options) -> None:
+    """A worker which dies before it takes a shard.
+    """
+    os._exit(3)
+
+def _start(tasks, events, limiter, options) -> None:
+    """A worker which only reports the shards it takes as started.
+    """
+    while (term := tasks.get()) is not None:
+        events.put(("start", os.getpid(), term, None))
+
+def _fail(tasks, events, limiter, options) -> None:
+    """A worker which fails every shard it takes.
+    """
+    while (term := tasks.get()) is not None:
+        events.put(("start", os.getpid(), term, None))
+        events.put(("failed", os.getpid(), term, "RuntimeError('boom')"))
+
+@pytest.fixture
+def shards(tmp_path):
+    return ShardCoordinator(["cats", "dogs"], processes=1, output=str(tmp_path), max_attempts=2)
+
+def test_retry_requeues_the_shard(shards):
+    tasks = queue.Queue()
+    shards.progress["cats"].update(status="running", attempts=1)
+
+    shards._retry("cats", "boom", tasks)
+
+    assert shards.progress["cats"]["status"] == "pending"
+    assert shards.progress["cats"]["error"] == "boom"
+    assert tasks.get_nowait() == "cats"
+
+def test_retry_gives_up_after_max_attempts(shards):
+    tasks = queue.Queue()
+    shards.progress["cats"].update(status="running", attempts=2)
+
+    shards._retry("cats", "boom", tasks)
+
+    assert shards.progress["cats"]["status"] == "failed"
+    assert tasks.empty()
+
+def test_recover_respawns_a_dead_worker(shards, monkeypatch):
+    tasks, events = multiprocessing.Queue(), multiprocessing.Queue()
+    workers = {}
+    monkeypatch.setattr(coordinator, "_work", _exit)
+    shards._spawn(workers, tasks, events, None)
+    (pid, dead), = workers.items()
+    dead.join()
+    assigned = {pid: "cats"}
+    shards.progress["cats"].update(status="running", attempts=1)
+
+    monkeypatch.setattr(coordinator, "_work", _start)
+    shards._recover(workers, assigned, tasks, events, None)
+    try:
+        assert pid not in workers and not assigned
+        assert shards.progress["cats"]["error"] == "Worker died with exit code 3"
+        (replacement, process), = workers.items()
+        assert events.get(timeout=5) == ("start", replacement, "cats", None)
+    finally:
+        tasks.put(None)
+        for process in workers.values():
+            process.join()
+
+def test_run_gives_up_failing_shards(shards, monkeypatch):
+    monkeypatch.setattr(coordinator, "_work", _fail)
+
+    progress = shards.run()
+
+    assert shards.summary() == {"failed": 2}
+    assert all(shard["attempts"] == 2 and shard["error"] == "RuntimeError('boom')" for shard in progress.values())
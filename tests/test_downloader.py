@@ -0,0 +1,64 @@
+from tiktok_crawler.downloader import Downloader
+
+import os
+import threading
+
+import pytest
+
+@pytest.fixture
+def downloader():
+    with Downloader(workers=1, rate=0) as downloader:
+        yield downloader
+
+def test_download(fixture_site, downloader, tmp_path):
+    path = downloader.download(f"{fixture_site.url}/media/0.mp4", str(tmp_path / "0.mp4"))
+
+    assert os.path.getsize(path) == fixture_site.options.video_size
+    assert not os.path.exists(f"{path}.part")
+
+def test_download_resumes_part_file(fixture_site, downloader, tmp_path):
+    path = str(tmp_path / "1.mp4")
+    offset = fixture_site.options.video_size // 3
+    with open(f"{path}.part", "wb") as file:
+        file.write(b"\1" * offset)
+
+    downloader.download(f"{fixture_site.url}/media/1.mp4", path)
+
+    with open(path, "rb") as file:
+        data = file.read()
+    assert len(data) == fixture_site.options.video_size
+    assert data[:offset] == b"\1" * offset
+    assert data[offset:] == bytes(fixture_site.options.video_size - offset)
+
+def test_download_finishes_complete_part_file(fixture_site, downloader, tmp_path):
+    path = str(tmp_path / "2.mp4")
+    with open(f"{path}.part", "wb") as file:
+        file.write(bytes(fixture_site.options.video_size))
+
+    downloader.download(f"{fixture_site.url}/media/2.mp4", path)
+
+    assert os.path.getsize(path) == fixture_site.options.video_size
+    assert not os.path.exists(f"{path}.part")
+
+class Blocking:
+    """Stands in for a Tiktok video whose save blocks until it is released.
+    """
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def save(self, *args) -> None:
+        self.release.wait(5)
+
+def test_submit_blocks_while_the_queue_is_full():
+    first, second = Blocking(), Blocking()
+    with Downloader(workers=1, rate=0, max_pending=0) as downloader:
+        downloader.submit(first)
+        submitted = threading.Event()
+        thread = threading.Thread(target=lambda: (downloader.submit(second), submitted.set()))
+        thread.start()
+
+        assert not submitted.wait(0.2)
+        first.release.set()
+        assert submitted.wait(5)
+        second.release.set()
+        thread.join()
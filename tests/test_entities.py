@@ -0,0 +1,36 @@
+from tests.conftest import read_fixture
+from tiktok_crawler.entities import parse_count
+from tiktok_crawler.extractor import build_tiktok
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+from tiktok_crawler.records import freeze
+from tiktok_crawler.xpath import search
+
+import pytest
+
+URL = "https://www.tiktok.com/@user0/video/7000000000000000000"
+KEYS = ["id", "Author", "Caption", "Music", "Media", "Metrics", "Status", "Url"]
+
+@pytest.mark.parametrize("text, count", [
+    ("17", 17),
+    ("1,234", 1234),
+    ("34.5K", 34500),
+    ("1.2M", 1200000),
+    ("2b", 2000000000),
+    (" 3.4k ", 3400),
+    ("0", 0),
+    ("", None),
+    (None, None),
+    ("Share", None),
+    ("1.2.3K", None),
+])
+def test_parse_count(text, count):
+    assert parse_count(text) == count
+
+def test_to_dict_keys():
+    records = HydrationExtractor(search).extract_html(read_fixture("video.html"), search.TiktokVideo.CONTAINER, 0, 1, base_url=URL)
+    tiktok = build_tiktok(records[0])
+    tiktok.url = URL
+
+    assert list(tiktok.to_dict()) == KEYS
+    assert list(freeze(tiktok).to_dict()) == KEYS
+    assert freeze(tiktok).to_dict()["Url"] == URL
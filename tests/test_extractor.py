@@ -0,0 +1,135 @@
+from lxml import html as lxml_html
+
+from tests.conftest import read_fixture
+from tests.fixtures.generate import BATCH, ITEMS, MISSING, NULL_MUSIC, URL
+
+from tiktok_crawler.extractor import build_tiktok, compile_spec
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+from tiktok_crawler.extractor.pagesource import PageSourceExtractor
+from tiktok_crawler.xpath import foryoupage, search
+
+import pytest
+
+VIDEO_ID = 7000000000000000000
+
+def video_url(index: int) -> str:
+    return f"{URL}/@user{index % 7}/video/{VIDEO_ID + index}"
+
+def media_link(index: int) -> str:
+    return "" if (index + 1) % MISSING == 0 else f"{URL}/media/{index}.mp4"
+
+def fields(record: dict) -> tuple:
+    return (
+        record["author"]["uniqueid"],
+        record["author"]["nickname"],
+        record["caption"]["text"],
+        [tag["text"] for tag in record["caption"]["tags"]],
+        record["media"]["link"] or "",
+        record["metrics"],
+        record["music"]["title"],
+    )
+
+@pytest.mark.parametrize("extractor", [PageSourceExtractor, HydrationExtractor])
+def test_foryou(extractor):
+    records = extractor(foryoupage).extract_html(
+        read_fixture("foryou.html"), foryoupage.ContainerItem.CONTAINERS, base_url=f"{URL}/foryou"
+    )
+
+    assert [record["index"] for record in records] == list(range(BATCH))
+    for index, record in enumerate(records):
+        assert record["author"]["uniqueid"] == f"user{index % 7}"
+        assert record["caption"]["text"] == f"Fixture video {index}"
+        assert (record["media"]["link"] or "") == media_link(index)
+        assert record["metrics"]["likes"] == str(1000 * index + 17)
+        assert record["music"]["title"] == f"original sound {index % 5}"
+
+def test_foryou_hydration_matches_page_source():
+    page = read_fixture("foryou.html")
+    expected = PageSourceExtractor(foryoupage).extract_html(page, foryoupage.ContainerItem.CONTAINERS, base_url=f"{URL}/foryou")
+    records = HydrationExtractor(foryoupage).extract_html(page, foryoupage.ContainerItem.CONTAINERS, base_url=f"{URL}/foryou")
+
+    assert [fields(record) for record in records] == [fields(record) for record in expected]
+    assert [record["url"] for record in records] == [video_url(index) for index in range(BATCH)]
+
+def test_hydration_aligns_items_by_video_id():
+    records = HydrationExtractor(foryoupage).extract_html(
+        read_fixture("foryou_reversed.html"), foryoupage.ContainerItem.CONTAINERS, base_url=f"{URL}/foryou"
+    )
+
+    assert [record["url"] for record in records] == [video_url(index) for index in range(BATCH)]
+    assert [record["media"]["link"] or "" for record in records] == [media_link(index) for index in range(BATCH)]
+
+def test_hydration_falls_back_to_page_source_for_scrolled_containers():
+    records = HydrationExtractor(foryoupage).extract_html(
+        read_fixture("foryou_scrolled.html"), foryoupage.ContainerItem.CONTAINERS, BATCH - 1, None, base_url=f"{URL}/foryou"
+    )
+
+    assert [record["index"] for record in records] == list(range(BATCH - 1, ITEMS))
+    assert [record["caption"]["text"] for record in records] == [f"Fixture video {index}" for index in range(BATCH - 1, ITEMS)]
+    assert [record["media"]["link"] or "" for record in records] == [media_link(index) for index in range(BATCH - 1, ITEMS)]
+    assert [record["url"] for record in records] == [video_url(index) for index in range(BATCH - 1, ITEMS)]
+
+@pytest.mark.parametrize("extractor", [PageSourceExtractor, HydrationExtractor])
+def test_video_page(extractor):
+    records = extractor(search).extract_html(read_fixture("video.html"), search.TiktokVideo.CONTAINER, 0, 1, base_url=video_url(0))
+
+    assert len(records) == 1
+    assert records[0]["author"]["uniqueid"] == "user0"
+    assert records[0]["media"]["link"] == media_link(0)
+    assert records[0]["metrics"] == dict(likes="17", comments="0", shares="0")
+    assert [tag["text"] for tag in records[0]["caption"]["tags"]] == ["#fixture", "#tag0"]
+
+def test_video_page_from_state_alone():
+    page = read_fixture("video.html").replace("<div id=\"app\">", "<div id=\"loading\">")
+    records = HydrationExtractor(search).extract_html(page, search.TiktokVideo.CONTAINER, 0, 1, base_url=video_url(0))
+
+    assert [record["url"] for record in records] == [video_url(0)]
+    assert records[0]["media"]["link"] == media_link(0)
+
+@pytest.mark.parametrize("extractor", [PageSourceExtractor, HydrationExtractor])
+def test_missing_media(extractor):
+    index = MISSING - 1
+    page = read_fixture("video_missing_media.html")
+    records = extractor(search).extract_html(page, search.TiktokVideo.CONTAINER, 0, 1, base_url=video_url(index))
+
+    assert records[0]["media"]["link"] is None
+    assert build_tiktok(records[0]).status == "MediaNotFoundException"
+
+def test_null_music_title():
+    page = read_fixture("video_null_music.html")
+    records = HydrationExtractor(search).extract_html(page, search.TiktokVideo.CONTAINER, 0, 1, base_url=video_url(NULL_MUSIC))
+
+    music = records[0]["music"]
+    assert music["title"] is None
+    assert music["link"] == f"{URL}/music/-{6000000000000000000 + NULL_MUSIC % 5}"
+    assert build_tiktok(records[0]).music.title == ""
+
+def test_missing_music():
+    page = read_fixture("video.html").replace("\"music\": {", "\"sound\": {", 1)
+    records = HydrationExtractor(search).extract_html(page, search.TiktokVideo.CONTAINER, 0, 1, base_url=video_url(0))
+
+    assert records[0]["music"] == dict(title=None, link=None)
+
+@pytest.mark.parametrize("xpath, fixture, containers", [
+    (search, "video.html", search.TiktokVideo.CONTAINER),
+    (foryoupage, "foryou.html", foryoupage.ContainerItem.CONTAINERS),
+])
+def test_spec_matches_fixture(xpath, fixture, containers):
+    """The compiled spec is what the script and CDP backends evaluate in the browser, so every field must match the fixture.
+    """
+    spec = compile_spec(xpath)
+    container = lxml_html.fromstring(read_fixture(fixture)).xpath(containers)[0]
+
+    for entity in ("author", "caption", "media", "metrics", "music"):
+        context = container
+        if "container" in spec[entity]:
+            context = container.xpath(spec[entity]["container"])[0]
+        for name, field in spec[entity].items():
+            if name != "container":
+                assert context.xpath(field), f"{entity}.{name}"
+
+def test_search_results_link_to_video_pages():
+    document = lxml_html.fromstring(read_fixture("search.html"))
+    links = [link.get("href") for link in document.xpath(search.ContainerItem.TIKTOK_VIDEOS)]
+
+    assert links == [video_url(index) for index in range(BATCH)]
@@ -0,0 +1,53 @@
+from tiktok_crawler.__main__ import ENV_PREFIX, parse_args
+from tiktok_crawler.config import Config
+
+import json
+import os
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch):
+    """Clears the options of the environment and restores the constants of `Config` overridden by a test.
+    """
+    for key in list(os.environ):
+        if key.startswith(ENV_PREFIX):
+            monkeypatch.delenv(key)
+    for key in ("DOWNLOAD_WORKERS", "DOWNLOAD_RATE_LIMIT"):
+        monkeypatch.setattr(Config, key, getattr(Config, key))
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"limit": 5, "workers": 2, "sink": "jsonl", "pool-size": 3, "DOWNLOAD_RATE_LIMIT": 8}))
+    return str(path)
+
+def test_environment_wins_over_the_config_file(config, monkeypatch):
+    monkeypatch.setenv("TIKTOK_CRAWLER_WORKERS", "4")
+    args = parse_args(["search", "--config", config, "--term", "cats"])
+
+    assert (args.limit, args.workers, args.pool_size, args.sink) == (5, 4, 3, "jsonl")
+    assert Config.DOWNLOAD_RATE_LIMIT == 8
+
+def test_command_line_wins_over_the_environment(config, monkeypatch):
+    monkeypatch.setenv("TIKTOK_CRAWLER_WORKERS", "4")
+    monkeypatch.setenv("TIKTOK_CRAWLER_LIMIT", "6")
+    args = parse_args(["search", "--config", config, "--term", "cats", "--workers", "8"])
+
+    assert (args.limit, args.workers) == (6, 8)
+
+def test_set_wins_over_the_config_file(config):
+    parse_args(["foryou", "--config", config, "--set", "DOWNLOAD_RATE_LIMIT=2", "--set", "DOWNLOAD_WORKERS=16"])
+
+    assert (Config.DOWNLOAD_RATE_LIMIT, Config.DOWNLOAD_WORKERS) == (2, 16)
+
+def test_environment_list_options_take_one_item_per_line(monkeypatch):
+    monkeypatch.setenv("TIKTOK_CRAWLER_DRIVER_OPTION", "--window-size=1280,800\n--mute-audio\n")
+    monkeypatch.setenv("TIKTOK_CRAWLER_HEADLESS", "true")
+    args = parse_args(["foryou"])
+
+    assert args.driver_options == ["--window-size=1280,800", "--mute-audio", "--headless=new"]
+
+def test_unknown_config_constant_is_an_error():
+    with pytest.raises(SystemExit):
+        parse_args(["foryou", "--set", "NOT_A_CONSTANT=1"])
@@ -0,0 +1,54 @@
+from tiktok_crawler.network import MediaCapture
+
+import json
+
+class PerformanceLog:
+    """Stands in for a driver created with `capture_network=True`, replaying the given requests as its performance log.
+    """
+    def __init__(self) -> None:
+        self.entries = []
+
+    def request(self, *urls: str) -> None:
+        for url in urls:
+            message = dict(method="Network.requestWillBeSent", params=dict(type="Media", request=dict(url=url)))
+            self.entries.append(dict(message=json.dumps(dict(message=message))))
+
+    def get_log(self, name: str) -> list[dict]:
+        entries, self.entries = self.entries, []
+        return entries
+
+def test_take_matches_the_video_id():
+    driver = PerformanceLog()
+    capture = MediaCapture(driver)
+    driver.request("https://cdn.test/video/tos/1.mp4?item_id=7001", "https://cdn.test/video/tos/2.mp4?item_id=7002")
+
+    assert capture.take("7002") == "https://cdn.test/video/tos/2.mp4?item_id=7002"
+    assert capture.take("7001") == "https://cdn.test/video/tos/1.mp4?item_id=7001"
+    assert capture.take("7001") is None
+
+def test_take_never_guesses_between_several_videos():
+    driver = PerformanceLog()
+    capture = MediaCapture(driver)
+    driver.request("https://cdn.test/a.mp4", "https://cdn.test/b.mp4")
+
+    assert capture.take("7001") is None
+    assert capture.take() is None
+
+def test_take_the_only_video_since_reset():
+    driver = PerformanceLog()
+    capture = MediaCapture(driver)
+    driver.request("https://cdn.test/a.mp4")
+    capture.reset()
+    driver.request("https://cdn.test/b.mp4")
+
+    assert capture.take("7001") == "https://cdn.test/b.mp4"
+
+def test_reset_forgets_the_videos_seen():
+    driver = PerformanceLog()
+    capture = MediaCapture(driver)
+    driver.request("https://cdn.test/a.mp4")
+    assert capture.take() == "https://cdn.test/a.mp4"
+
+    capture.reset()
+    driver.request("https://cdn.test/a.mp4")
+    assert capture.take() == "https://cdn.test/a.mp4"
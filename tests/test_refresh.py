@@ -0,0 +1,24 @@
+from tests.conftest import read_fixture
+from tiktok_crawler import refresh
+from tiktok_crawler.refresh import MetricsRefresher, read_metrics
+from tiktok_crawler.timeseries import MetricsStore
+
+import pytest
+
+URL = "https://www.tiktok.com/@user0/video/7000000000000000000"
+
+def test_read_metrics_of_a_video_page():
+    metrics = read_metrics(read_fixture("video.html"), URL)
+    assert (metrics.likes, metrics.comments, metrics.shares) == ("17", "0", "0")
+
+def test_read_metrics_of_another_video_is_none():
+    assert read_metrics(read_fixture("video.html"), "https://www.tiktok.com/@user1/video/7000000000000000001") is None
+
+@pytest.mark.parametrize("page_source", ["", "   \n"])
+def test_read_metrics_of_an_empty_page_is_none(page_source):
+    assert read_metrics(page_source, URL) is None
+
+def test_refresh_of_an_empty_page_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(refresh, "fetch_page", lambda url, session=None: "")
+    with MetricsStore(str(tmp_path / "metrics.db")) as store, MetricsRefresher(store, rate=0) as refresher:
+        assert refresher._refresh(URL) is None
@@ -0,0 +1,61 @@
+from tiktok_crawler.driver import DriverPool
+from tiktok_crawler.exception import CaptchaDetectedException
+from tiktok_crawler.scheduler import SessionScheduler
+
+import time
+
+class Session:
+    """Stands in for a browser session of the pool.
+    """
+    def __init__(self) -> None:
+        self.quit_called = False
+
+    def find_element(self, *args) -> None:
+        pass
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+class Pool(DriverPool):
+    def _launch(self) -> Session:
+        session = Session()
+        with self._lock:
+            self._pages[session] = 0
+        return session
+
+def test_parked_session_frees_its_slot():
+    pool = Pool(size=1, timeout=0.1)
+    scheduler = SessionScheduler(pool, cooldown=60, max_blocks=3, pacing=0)
+    sessions = []
+
+    def task(driver):
+        sessions.append(driver)
+        if len(sessions) == 1:
+            raise CaptchaDetectedException("captcha")
+        return "done"
+
+    assert scheduler.run(task) == "done"
+    assert sessions[0] is not sessions[1]
+    assert scheduler.summary()["parked"] == 1
+
+    scheduler.close()
+    assert sessions[0].quit_called
+    assert pool.acquire() is sessions[1]
+
+def test_parked_session_returns_to_the_pool():
+    pool = Pool(size=2, timeout=0.1)
+    scheduler = SessionScheduler(pool, cooldown=0.05, max_blocks=3, pacing=0)
+    challenged = []
+
+    def task(driver):
+        if not challenged:
+            challenged.append(driver)
+            raise CaptchaDetectedException("captcha")
+        return driver
+
+    scheduler.run(task)
+    time.sleep(0.2)
+
+    assert scheduler.summary()["parked"] == 0
+    assert not challenged[0].quit_called
+    assert challenged[0] in [pool.acquire(), pool.acquire()]
@@ -0,0 +1,59 @@
+from tests.conftest import read_fixture
+from tests.fixtures.generate import URL
+
+from tiktok_crawler.dedup import stable_id
+from tiktok_crawler.extractor import build_tiktok
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+from tiktok_crawler.sink import JsonlSink, ParquetSink
+from tiktok_crawler.xpath import foryoupage
+
+import json
+
+import pytest
+
+@pytest.fixture(scope="module")
+def tiktoks():
+    records = HydrationExtractor(foryoupage).extract_html(
+        read_fixture("foryou_scrolled.html"), foryoupage.ContainerItem.CONTAINERS, base_url=f"{URL}/foryou"
+    )
+    tiktoks = [build_tiktok(record) for record in records]
+    for tiktok in tiktoks:
+        tiktok.id = stable_id(tiktok)
+    return tiktoks
+
+def write(sink, tiktoks) -> None:
+    with sink:
+        for tiktok in tiktoks:
+            sink.write(tiktok)
+
+def read_jsonl(path) -> list[str]:
+    with open(path) as file:
+        return [json.loads(line)["id"] for line in file]
+
+def test_jsonl_rotation(tiktoks, tmp_path):
+    write(JsonlSink(str(tmp_path), batch_size=2, max_records=3), tiktoks)
+
+    parts = sorted(tmp_path.iterdir())
+    assert [part.name for part in parts] == ["tiktoks-00000.jsonl", "tiktoks-00001.jsonl", "tiktoks-00002.jsonl"]
+    assert [read_jsonl(part) for part in parts] == [[tiktok.id for tiktok in tiktoks[i:i + 3]] for i in range(0, len(tiktoks), 3)]
+
+def test_jsonl_keeps_previous_runs(tiktoks, tmp_path):
+    write(JsonlSink(str(tmp_path), max_records=5), tiktoks[:5])
+    first = read_jsonl(tmp_path / "tiktoks-00000.jsonl")
+    write(JsonlSink(str(tmp_path), max_records=5), tiktoks[5:])
+
+    assert read_jsonl(tmp_path / "tiktoks-00000.jsonl") == first
+    assert read_jsonl(tmp_path / "tiktoks-00001.jsonl") == [tiktok.id for tiktok in tiktoks[5:]]
+
+def test_parquet_rotation(tiktoks, tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    write(ParquetSink(str(tmp_path), batch_size=2, max_records=3), tiktoks[:6])
+    write(ParquetSink(str(tmp_path), batch_size=2, max_records=3), tiktoks[6:])
+
+    parts = sorted(tmp_path.iterdir())
+    assert [part.name for part in parts] == ["tiktoks-00000.parquet", "tiktoks-00001.parquet", "tiktoks-00002.parquet"]
+    tables = [parquet.read_table(part) for part in parts]
+    assert [table.column("id").to_pylist() for table in tables] == [
+        [tiktok.id for tiktok in tiktoks[:3]], [tiktok.id for tiktok in tiktoks[3:6]], [tiktok.id for tiktok in tiktoks[6:]]
+    ]
+    assert tables[0].column("metrics_likes_count").to_pylist() == [17, 1017, 2017]
@@ -0,0 +1,19 @@
+from tiktok_crawler.entities import Metrics
+from tiktok_crawler.timeseries import MetricsStore
+
+import math
+
+URL = "https://www.tiktok.com/@user0/video/7000000000000000000"
+
+def test_append_skips_links_without_a_video_id(tmp_path):
+    with MetricsStore(str(tmp_path / "metrics.db")) as store:
+        store.append([
+            ("https://www.tiktok.com/@user0", Metrics("1", "2", "3", None)),
+            (URL, Metrics("1.2K", "2", "", None)),
+        ])
+
+        history = store.history(URL)
+        assert history["likes"].tolist() == [1200.0]
+        assert history["comments"].tolist() == [2.0]
+        assert math.isnan(history["shares"][0])
+        assert len(store.history("https://www.tiktok.com/@user0")["as_of"]) == 0
@@ -0,0 +1,10 @@
+from tiktok_crawler.wait import AdaptiveWait
+
+def test_durations_are_a_bounded_window():
+    wait = AdaptiveWait(window=3)
+    for ready in (False, True, True, True):
+        wait.until(lambda: ready, name="test", timeout=0)
+
+    summary = wait.summary()["test"]
+    assert summary["count"] == 3
+    assert summary["timeouts"] == 0
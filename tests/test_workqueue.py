@@ -0,0 +1,32 @@
+from tiktok_crawler.workqueue import WorkQueue
+
+import time
+
+def test_expired_lease_counts_as_an_attempt(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.db"), "test", lease_timeout=0.01, max_attempts=2) as work:
+        work.put(["a", "b"])
+
+        assert work.get() == "a"
+        time.sleep(0.02)
+        assert work.get() == "a"
+        time.sleep(0.02)
+        assert work.get() == "b"
+
+        work.ack("b")
+        work.finish()
+        assert work.summary() == dict(done=1, failed=1)
+        assert work.is_drained()
+
+def test_nack_then_expired_lease_fails_the_item(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.db"), "test", lease_timeout=0.01, max_attempts=2) as work:
+        work.put(["a"])
+        work.finish()
+
+        assert work.get() == "a"
+        work.nack("a", "error")
+        assert work.get() == "a"
+        time.sleep(0.02)
+
+        assert work.get() is None
+        assert work.is_drained()
+        assert list(work.consume()) == []
@@ -1,4 +1,32 @@
+import importlib
 import logging
 
 logging.basicConfig()
-logging.root.setLevel(level=logging.INFO)
\ No newline at end of file
+logging.root.setLevel(level=logging.INFO)
+
+# The public names are imported on first access, so that e.g. `tiktok_crawler.sink` or a worker process does not pay for the
+# Selenium stack and webdriver_manager until a crawler is actually created.
+_EXPORTS = {
+    "CrawlerForYouPage": "tiktok_crawler.crawler.foryoupage",
+    "SearchCrawler": "tiktok_crawler.crawler.search",
+    "AsyncSearchCrawler": "tiktok_crawler.crawler.cdp",
+    "ShardCoordinator": "tiktok_crawler.coordinator",
+    "Downloader": "tiktok_crawler.downloader",
+    "DriverPool": "tiktok_crawler.driver",
+    "CheckpointStore": "tiktok_crawler.checkpoint",
+    "SeenIndex": "tiktok_crawler.dedup",
+    "WorkQueue": "tiktok_crawler.workqueue",
+    "JsonlSink": "tiktok_crawler.sink",
+    "ParquetSink": "tiktok_crawler.sink",
+    "Tiktok": "tiktok_crawler.entities",
+    "TiktokRecord": "tiktok_crawler.records",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
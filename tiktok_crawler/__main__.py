@@ -0,0 +1,263 @@
+"""Runs a crawl from the command line.
+
+Usage:
+    python -m tiktok_crawler foryou --limit 50
+    python -m tiktok_crawler search --terms-file terms.txt --workers 4 --pool-size 2 --sink jsonl
+    python -m tiktok_crawler refresh --urls-file videos.txt
+
+Every option can also be given as an environment variable named `TIKTOK_CRAWLER_<OPTION>`, e.g. `TIKTOK_CRAWLER_WORKERS=4`, or as
+a key of a YAML or JSON `--config` file, e.g. `workers: 4`. The command line wins over the environment, which wins over the config
+file. Upper case keys of the config file and `--set KEY=VALUE` override the constants of `tiktok_crawler.config.Config`, e.g.
+`DOWNLOAD_RATE_LIMIT: 8`. An `--env-file` is loaded into the environment first, e.g. to set `TIKTOK_CRAWLER_ENV=prod`.
+
+Repeatable options take one item per line in the environment, since switches like `--window-size=1280,800` contain commas.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+ENV_PREFIX = "TIKTOK_CRAWLER_"
+MODES = ("foryou", "search", "refresh")
+TRUE = ("1", "true", "yes", "on")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tiktok_crawler", description="Crawls Tiktok videos.")
+    parser.add_argument("mode", choices=MODES, help="What to crawl.")
+    parser.add_argument("--config", help="A YAML or JSON file with the default options.")
+    parser.add_argument("--env-file", help="A .env file loaded into the environment before anything else.")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Overrides a constant of Config.")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", default="./output", help="The directory of the videos and the metadata.")
+    output.add_argument("--sink", choices=("json", "jsonl", "parquet"), default="json",
+                        help="Writes the metadata to one json file per video or to batched jsonl or parquet files.")
+    output.add_argument("--checkpoint-dir", help="The directory of the checkpoint, seen and cache databases. Defaults to --output.")
+    output.add_argument("--no-seen", action="store_true", help="Does not skip the videos crawled by previous runs.")
+    output.add_argument("--cache", action="store_true", help="Reuses the pages crawled recently, see tiktok_crawler.cache.")
+    output.add_argument("--metrics", help="Writes the instrumentation of the run to this JSON file. Defaults to --output/metrics.json.")
+
+    crawl = parser.add_argument_group("crawl")
+    crawl.add_argument("--limit", type=int, default=15, help="The number of videos per page or search term.")
+    crawl.add_argument("--term", action="append", default=[], help="A search term. Can be repeated.")
+    crawl.add_argument("--terms-file", help="A file of search terms, one per line.")
+    crawl.add_argument("--extractor", default="script", help="The extractor backend, see tiktok_crawler.crawler.EXTRACTORS.")
+    crawl.add_argument("--workers", type=int, default=1, help="The number of worker processes of a search crawl.")
+    crawl.add_argument("--pool-size", type=int, default=1, help="The number of browser sessions per worker.")
+    crawl.add_argument("--lean", action="store_true", help="Blocks images, media, fonts and trackers in the browser.")
+    crawl.add_argument("--headless", action="store_true", help="Runs the browser without a window.")
+    crawl.add_argument("--driver-option", action="append", default=[], help="A chromium command line switch. Can be repeated.")
+
+    download = parser.add_argument_group("download")
+    download.add_argument("--download-workers", type=int, help="The number of concurrent downloads. Defaults to Config.DOWNLOAD_WORKERS.")
+    download.add_argument("--no-download", action="store_true", help="Only saves the metadata, to a jsonl or parquet sink.")
+
+    refresh = parser.add_argument_group("refresh")
+    refresh.add_argument("--urls-file", help="A file of video links to track, one per line. Defaults to the links of the seen index.")
+    refresh.add_argument("--store", help="The metrics time series. Defaults to metrics.db in --checkpoint-dir.")
+    refresh.add_argument("--refresh-workers", type=int, help="The number of pages fetched concurrently. Defaults to Config.REFRESH_WORKERS.")
+    return parser
+
+def load_file(path: str) -> dict:
+    """Reads a YAML or JSON config file.
+
+    Args:
+        path (str): The path of the file. YAML if it ends with `.yml` or `.yaml`, JSON otherwise.
+
+    Returns:
+        dict: The options of the file.
+    """
+    with open(path) as file:
+        if path.endswith((".yml", ".yaml")):
+            import yaml
+            return yaml.safe_load(file) or {}
+        return json.load(file)
+
+def parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parses the command line on top of the environment and the config file, and applies the overrides of `Config`.
+
+    Args:
+        argv (list): The command line arguments. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The options.
+    """
+    parser = build_parser()
+    known, _ = parser.parse_known_args(argv)
+    if known.env_file:
+        from dotenv import load_dotenv
+        load_dotenv(known.env_file, override=False)
+
+    settings = load_file(known.config) if known.config else {}
+    overrides = {key: value for key, value in settings.items() if key.isupper()}
+    defaults = {key.replace("-", "_"): value for key, value in settings.items() if not key.isupper()}
+
+    for action in parser._actions:
+        value = os.environ.get(f"{ENV_PREFIX}{action.dest.upper()}")
+        if value is None or action.dest in ("help", "mode", "config", "env_file", "set"):
+            continue
+        if action.nargs == 0:
+            defaults[action.dest] = value.lower() in TRUE
+        elif isinstance(action.default, list):
+            defaults[action.dest] = [item for item in value.splitlines() if item]
+        else:
+            defaults[action.dest] = action.type(value) if action.type else value
+
+    unknown = set(defaults) - {action.dest for action in parser._actions}
+    if unknown:
+        parser.error(f"Unknown option(s) in the config file: {', '.join(sorted(unknown))}")
+    parser.set_defaults(**defaults)
+    args = parser.parse_args(argv)
+
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = parse_value(value)
+
+    from tiktok_crawler.config import Config
+    for key, value in overrides.items():
+        if not hasattr(Config, key):
+            parser.error(f"Unknown Config constant: {key}")
+        setattr(Config, key, value)
+
+    if args.no_download and args.sink == "json":
+        parser.error("--no-download needs a jsonl or parquet --sink")
+    if args.mode == "search" and not (args.term or args.terms_file):
+        parser.error("search needs --term or --terms-file")
+    if args.mode == "search" and args.workers > 1 and args.sink == "json":
+        parser.error("--workers needs a jsonl or parquet --sink")
+
+    args.checkpoint_dir = args.checkpoint_dir or args.output
+    args.metrics = args.metrics or os.path.join(args.output, "metrics.json")
+    args.driver_options = args.driver_option + (["--headless=new"] if args.headless else [])
+    return args
+
+def run_foryou(args: argparse.Namespace) -> int:
+    from tiktok_crawler.crawler.foryoupage import CrawlerForYouPage
+
+    with _seen(args) as seen:
+        crawler = CrawlerForYouPage(
+            limit=args.limit, driver_options=args.driver_options, extractor=args.extractor, seen=seen, lean=args.lean
+        )
+        _save(args, crawler.iter_tiktok_videos(), seen=seen)
+    return 0
+
+def run_search(args: argparse.Namespace) -> int:
+    from tiktok_crawler.coordinator import read_terms
+
+    terms = list(dict.fromkeys(args.term + (read_terms(args.terms_file) if args.terms_file else [])))
+    if args.workers > 1:
+        return _run_shards(args, terms)
+
+    from tiktok_crawler.cache import PageCache
+    from tiktok_crawler.checkpoint import CheckpointStore
+    from tiktok_crawler.crawler.search import SearchCrawler
+
+    cache = PageCache(os.path.join(args.checkpoint_dir, "cache.db")) if args.cache else None
+    with _seen(args) as seen:
+        for term in terms:
+            with CheckpointStore(os.path.join(args.checkpoint_dir, "checkpoint.db"), job=term) as checkpoint:
+                crawler = SearchCrawler(
+                    term,
+                    limit=args.limit,
+                    driver_options=args.driver_options,
+                    extractor=args.extractor,
+                    workers=args.pool_size,
+                    checkpoint=checkpoint,
+                    seen=seen,
+                    lean=args.lean,
+                    cache=cache
+                )
+                _save(args, crawler.iter_tiktok_videos(), checkpoint, seen)
+    if cache is not None:
+        cache.close()
+    return 0
+
+def run_refresh(args: argparse.Namespace) -> int:
+    from tiktok_crawler.dedup import SeenIndex
+    from tiktok_crawler.refresh import MetricsRefresher
+    from tiktok_crawler.timeseries import MetricsStore
+
+    store_path = args.store or os.path.join(args.checkpoint_dir, "metrics.db")
+    with MetricsStore(store_path) as store:
+        if args.urls_file:
+            with open(args.urls_file) as file:
+                urls = [line.strip() for line in file if line.strip()]
+        else:
+            with SeenIndex(os.path.join(args.checkpoint_dir, "seen.db")) as seen:
+                urls = seen.urls()
+        logging.info(f"Tracking {store.track(urls)} new Tiktok video(s), {len(store)} in total")
+
+        options = {} if args.refresh_workers is None else dict(workers=args.refresh_workers)
+        with MetricsRefresher(store, **options) as refresher:
+            summary = refresher.refresh()
+    print(json.dumps(summary))
+    return 0 if summary["refreshed"] or not summary["failed"] else 1
+
+def _run_shards(args: argparse.Namespace, terms: list[str]) -> int:
+    from tiktok_crawler.config import Config
+    from tiktok_crawler.coordinator import ShardCoordinator
+
+    coordinator = ShardCoordinator(
+        terms,
+        processes=args.workers,
+        limit=args.limit,
+        output=args.output,
+        sink=args.sink,
+        driver_options=args.driver_options,
+        extractor=args.extractor,
+        seen=None if args.no_seen else os.path.join(args.checkpoint_dir, "seen.db"),
+        lean=args.lean,
+        cache=os.path.join(args.checkpoint_dir, "cache.db") if args.cache else None,
+        checkpoint=os.path.join(args.checkpoint_dir, "checkpoint.db"),
+        pool_size=args.pool_size,
+        download_workers=args.download_workers or Config.DOWNLOAD_WORKERS,
+        download=not args.no_download
+    )
+    coordinator.run()
+    summary = coordinator.summary()
+    print(json.dumps(summary))
+    return 1 if summary.get("failed") else 0
+
+def _seen(args: argparse.Namespace):
+    from contextlib import nullcontext
+    from tiktok_crawler.dedup import SeenIndex
+
+    return nullcontext() if args.no_seen else SeenIndex(os.path.join(args.checkpoint_dir, "seen.db"))
+
+def _save(args: argparse.Namespace, tiktoks, checkpoint = None, seen = None) -> None:
+    from contextlib import nullcontext
+    from tiktok_crawler.downloader import Downloader
+    from tiktok_crawler.sink import SINKS
+
+    options = {} if args.download_workers is None else dict(workers=args.download_workers)
+    with (SINKS[args.sink](args.output) if args.sink in SINKS else nullcontext()) as sink, Downloader(**options) as downloader:
+        for tiktok in tiktoks:
+            if args.no_download:
+                sink.write(tiktok)
+                if checkpoint and tiktok.url:
+                    checkpoint.mark_saved(tiktok.url)
+                if seen is not None:
+                    seen.add(tiktok.id, tiktok.url)
+            else:
+                downloader.submit(tiktok, path=args.output, checkpoint=checkpoint, sink=sink, seen=seen)
+
+def main(argv: list = None) -> int:
+    args = parse_args(argv)
+    os.makedirs(args.output, exist_ok=True)
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+
+    from tiktok_crawler import instrumentation
+    try:
+        return dict(foryou=run_foryou, search=run_search, refresh=run_refresh)[args.mode](args)
+    finally:
+        instrumentation.registry.to_json(args.metrics)
+
+if __name__ == "__main__":
+    sys.exit(main())
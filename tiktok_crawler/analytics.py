@@ -0,0 +1,68 @@
+from tiktok_crawler.entities import Tiktok
+
+import numpy as np
+
+METRICS = ("likes", "comments", "shares")
+
+def to_arrays(tiktoks: list[Tiktok]) -> dict:
+    """Turns the metrics of a crawl into columnar NumPy arrays.
+
+    Args:
+        tiktoks (list[Tiktok]): list of `tiktok_crawler.entities.Tiktok`
+
+    Returns:
+        dict: The `id` array and one `float64` array per metric in `METRICS`. Counts which could not be parsed are `NaN`.
+    """
+    arrays = dict(id=np.array([tiktok.id for tiktok in tiktoks], dtype=object))
+    for name in METRICS:
+        arrays[name] = np.array(
+            [
+                np.nan if tiktok.metrics is None or getattr(tiktok.metrics, f"{name}_count") is None
+                else getattr(tiktok.metrics, f"{name}_count")
+                for tiktok in tiktoks
+            ],
+            dtype=np.float64
+        )
+    return arrays
+
+def summarize(arrays: dict, percentiles: tuple = (50, 90, 99)) -> dict:
+    """Computes the engagement statistics of every metric, ignoring the counts which could not be parsed.
+
+    Args:
+        arrays (dict): The arrays returned by `to_arrays()`.
+        percentiles (tuple): The percentiles to compute.
+
+    Returns:
+        dict: The count, total, mean and percentiles per metric.
+    """
+    summary = {}
+    for name in METRICS:
+        values = arrays[name][~np.isnan(arrays[name])]
+        points = np.percentile(values, percentiles).tolist() if values.size else [None] * len(percentiles)
+        summary[name] = dict(
+            count=int(values.size),
+            total=int(values.sum()),
+            mean=float(values.mean()) if values.size else None,
+            **{f"p{percentile}": point for percentile, point in zip(percentiles, points)}
+        )
+    return summary
+
+def top_k(arrays: dict, k: int = 10, by: str = "likes") -> list[tuple[str, int]]:
+    """Finds the `k` Tiktok videos with the highest count of a metric without sorting the whole crawl.
+
+    Args:
+        arrays (dict): The arrays returned by `to_arrays()`.
+        k (int): The number of Tiktok videos to return.
+        by (str): One of `METRICS`.
+
+    Returns:
+        list[tuple[str, int]]: The id and count of the top `k` Tiktok videos, highest first.
+    """
+    values = np.nan_to_num(arrays[by], nan=-1)
+    k = min(k, values.size)
+    if k == 0:
+        return []
+
+    indices = np.argpartition(-values, k - 1)[:k]
+    indices = indices[np.argsort(-values[indices])]
+    return [(arrays["id"][index], int(values[index])) for index in indices if values[index] >= 0]
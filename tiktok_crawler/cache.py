@@ -0,0 +1,172 @@
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+from tiktok_crawler.dedup import video_key
+
+from dataclasses import dataclass
+import logging
+import requests
+import sqlite3
+import threading
+import time
+import zlib
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+def fetch_page(url: str, session: requests.Session = None, timeout: float = Config.DOWNLOAD_TIMEOUT) -> str:
+    """Fetches the HTML of a page over plain HTTP, without a browser. The page of a Tiktok video embeds its hydration state,
+    which is enough to extract it, see `tiktok_crawler.extractor.hydration.HydrationExtractor.extract_html()`.
+
+    Args:
+        url (str): The url of the page.
+        session (requests.Session): The HTTP session to use, e.g. the session of a `tiktok_crawler.downloader.Downloader`.
+        timeout (float): The number of seconds to wait for the server.
+
+    Returns:
+        str: The HTML of the page.
+
+    Raises:
+        requests.RequestException: if the page could not be fetched.
+    """
+    with instrumentation.timer("cache.fetch"):
+        response = (session or requests).get(url, headers=HEADERS, timeout=timeout)
+        response.raise_for_status()
+    return response.text
+
+@dataclass(frozen=True)
+class CachedPage:
+    """A page read from a `PageCache`.
+
+    Args:
+        url (str): The url the page was stored under.
+        content (str): The captured HTML of the page, or any JSON document stored by the crawler, e.g. the links of search results.
+        stored_at (float): The UNIX time the page was stored.
+        ttl (float): The number of seconds the page is fresh for.
+    """
+    url: str
+    content: str
+    stored_at: float
+    ttl: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def is_stale(self) -> bool:
+        return self.age >= self.ttl
+
+class PageCache:
+    """An on-disk cache of captured pages in SQLite, so that repeated crawls of the same search terms do not navigate the browser
+    to pages which were crawled recently.
+
+    Pages are keyed by url, where the links of a Tiktok video share the key of the video, see `tiktok_crawler.dedup.video_key()`.
+    They are compressed with zlib and evicted least recently used first once the cache exceeds `max_bytes`. Pages older than
+    `ttl` are still returned, marked as stale, so the caller can decide how to refresh them.
+
+    Args:
+        path (str): The path of the SQLite database.
+        ttl (float): The number of seconds a page is fresh for. Keep it below the expiry of the signed media links of Tiktok.
+        max_bytes (int): The maximum compressed size of the cache.
+    """
+    def __init__(self, path: str, ttl: float = Config.CACHE_TTL, max_bytes: int = Config.CACHE_MAX_BYTES) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "key TEXT PRIMARY KEY, url TEXT NOT NULL, content BLOB NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+
+    def get(self, url: str) -> CachedPage:
+        """Reads a page and marks it as recently used.
+
+        Args:
+            url (str): The url of the page.
+
+        Returns:
+            CachedPage: The page, `None` if it is not cached.
+        """
+        key = self._key(url)
+        rows = self._execute("SELECT url, content, stored_at FROM pages WHERE key = ?", key)
+        if not rows:
+            instrumentation.count("cache.miss")
+            return None
+
+        self._execute("UPDATE pages SET accessed_at = ? WHERE key = ?", time.time(), key)
+        url, content, stored_at = rows[0]
+        page = CachedPage(url=url, content=zlib.decompress(content).decode(), stored_at=stored_at, ttl=self.ttl)
+        instrumentation.count("cache.stale" if page.is_stale else "cache.hit")
+        return page
+
+    def put(self, url: str, content: str) -> None:
+        """Stores a page, replacing the previous version, and evicts the least recently used pages beyond `max_bytes`.
+
+        Args:
+            url (str): The url of the page.
+            content (str): The HTML of the page or a JSON document.
+        """
+        data = zlib.compress(content.encode())
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO pages (key, url, content, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            self._key(url), url, data, len(data), now, now
+        )
+        self._evict()
+
+    def delete(self, url: str) -> None:
+        self._execute("DELETE FROM pages WHERE key = ?", self._key(url))
+
+    def size(self) -> int:
+        """Returns the compressed size of the cache in bytes.
+        """
+        return self._execute("SELECT COALESCE(SUM(size), 0) FROM pages")[0][0]
+
+    def __contains__(self, url: str) -> bool:
+        return bool(self._execute("SELECT 1 FROM pages WHERE key = ?", self._key(url)))
+
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM pages")[0][0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _evict(self) -> None:
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return
+
+        evicted = []
+        for key, size in self._execute("SELECT key, size FROM pages ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        with self._lock:
+            self._connection.executemany("DELETE FROM pages WHERE key = ?", evicted)
+        logging.info(f"Evicted {len(evicted)} page(s) from the cache")
+        instrumentation.count("cache.evicted", len(evicted))
+
+    @staticmethod
+    def _key(url: str) -> str:
+        key = video_key(url)
+        return f"video:{key}" if key else url
+
+    def _execute(self, sql: str, *params) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
@@ -0,0 +1,156 @@
+from tiktok_crawler.config import Config
+
+import datetime
+import logging
+import sqlite3
+import threading
+
+DISCOVERED = "discovered"
+EXTRACTED = "extracted"
+FAILED = "failed"
+SAVED = "saved"
+
+class CheckpointStore:
+    """Persists the progress of a crawl job in SQLite so that a restarted crawl skips the finished work and resumes at the frontier.
+
+    Every link discovered by the crawler is recorded with its position in the results and moves through the states
+    `discovered` -> `extracted` -> `saved`, or `failed`. A link is finished once it is `saved` or has failed `max_attempts` times.
+
+    Args:
+        path (str): The path of the SQLite database.
+        job (str): The name of the crawl job, e.g. the search term. Several jobs can share one database.
+        max_attempts (int): The number of failed attempts after which a link is no longer retried.
+    """
+    def __init__(self, path: str, job: str, max_attempts: int = Config.CHECKPOINT_MAX_ATTEMPTS) -> None:
+        self.path = path
+        self.job = job
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job TEXT PRIMARY KEY, discovered INTEGER NOT NULL DEFAULT 0, updated_at TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            "job TEXT NOT NULL, url TEXT NOT NULL, position INTEGER NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, updated_at TEXT, PRIMARY KEY (job, url))"
+        )
+        self._execute("INSERT OR IGNORE INTO jobs (job, updated_at) VALUES (?, ?)", self.job, self._now())
+
+    def is_discovered(self) -> bool:
+        """Checks if the discovery of the links of the job was completed by a previous run.
+
+        Returns:
+            bool: `True` if `mark_discovered()` was called for the job.
+        """
+        rows = self._execute("SELECT discovered FROM jobs WHERE job = ?", self.job)
+        return bool(rows and rows[0][0])
+
+    def mark_discovered(self) -> None:
+        """Records that all the links of the job were discovered.
+        """
+        self._execute("UPDATE jobs SET discovered = 1, updated_at = ? WHERE job = ?", self._now(), self.job)
+
+    def add_links(self, urls: list[str]) -> None:
+        """Records newly discovered links. Links which are already known keep their state.
+
+        Args:
+            urls (list[str]): The links in the order they were discovered.
+        """
+        with self._lock:
+            position = self._connection.execute("SELECT COUNT(*) FROM links WHERE job = ?", (self.job,)).fetchone()[0]
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO links (job, url, position, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(self.job, url, position + i, DISCOVERED, self._now()) for i, url in enumerate(urls)]
+            )
+
+    def frontier(self) -> list[str]:
+        """Lists the links which are not finished yet.
+
+        Returns:
+            list[str]: The unfinished links in the order they were discovered.
+        """
+        rows = self._execute(
+            "SELECT url FROM links WHERE job = ? AND status != ? AND attempts < ? ORDER BY position",
+            self.job, SAVED, self.max_attempts
+        )
+        return [url for url, in rows]
+
+    def is_pending(self, url: str) -> bool:
+        """Checks if a link still needs to be crawled.
+
+        Args:
+            url (str): The link of the Tiktok video.
+
+        Returns:
+            bool: `False` if the link is finished.
+        """
+        rows = self._execute("SELECT status, attempts FROM links WHERE job = ? AND url = ?", self.job, url)
+        return not rows or (rows[0][0] != SAVED and rows[0][1] < self.max_attempts)
+
+    def status(self, url: str) -> str:
+        """Returns the state of a link.
+
+        Args:
+            url (str): The link of the Tiktok video.
+
+        Returns:
+            str: One of `discovered`, `extracted`, `saved` or `failed`. `None` if the link is unknown.
+        """
+        rows = self._execute("SELECT status FROM links WHERE job = ? AND url = ?", self.job, url)
+        return rows[0][0] if rows else None
+
+    def mark_extracted(self, url: str) -> None:
+        """Records that the metadata of a link was extracted.
+        """
+        self._set_status(url, EXTRACTED)
+
+    def mark_saved(self, url: str) -> None:
+        """Records that the metadata and video of a link were saved. The link is finished.
+        """
+        self._set_status(url, SAVED)
+
+    def mark_failed(self, url: str, error: str) -> None:
+        """Records a failed attempt to crawl or save a link.
+
+        Args:
+            url (str): The link of the Tiktok video.
+            error (str): The reason of the failure.
+        """
+        logging.warning(f"Checkpoint: {url} failed: {error}")
+        self._execute(
+            "UPDATE links SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? WHERE job = ? AND url = ?",
+            FAILED, str(error), self._now(), self.job, url
+        )
+
+    def summary(self) -> dict:
+        """Counts the links of the job per state.
+
+        Returns:
+            dict: The number of links per state.
+        """
+        return dict(self._execute("SELECT status, COUNT(*) FROM links WHERE job = ? GROUP BY status", self.job))
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _set_status(self, url: str, status: str) -> None:
+        self._execute(
+            "UPDATE links SET status = ?, updated_at = ? WHERE job = ? AND url = ?",
+            status, self._now(), self.job, url
+        )
+
+    def _execute(self, sql: str, *params) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now().isoformat()
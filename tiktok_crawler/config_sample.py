@@ -6,5 +6,52 @@ class Dev:
 class Prod:
     CRAWL_SCROLL_PAUSE_TIME = 2
     
-class Config(Dev if 1==1 else Prod):
+class Config(Prod if os.environ.get("TIKTOK_CRAWLER_ENV", "dev").lower() == "prod" else Dev):
     CRAWL_ROOT_URL = "https://www.tiktok.com/foryou"
+    CRAWL_SEARCH_URL = "https://www.tiktok.com/search?"
+    CRAWL_MAX_IDLE_SCROLLS = 10
+    CRAWL_WAIT_INITIAL = 0.05
+    CRAWL_WAIT_FACTOR = 2
+    CRAWL_WAIT_TIMEOUT = 10
+    CRAWL_WAIT_WINDOW = 1000
+    CRAWL_POOL_SIZE = 4
+    CRAWL_POOL_MAX_PAGES = 50
+    CRAWL_POOL_TIMEOUT = 120
+    CRAWL_ASYNC_TABS = 8
+    CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+    CHROME_PROFILE_TEMPLATE = os.environ.get("TIKTOK_CRAWLER_PROFILE")
+    DRIVER_CACHE_PATH = os.path.expanduser("~/.cache/tiktok_crawler/driver.json")
+    DRIVER_CACHE_TTL = 7 * 24 * 60 * 60
+    LEAN_BLOCKED_URLS = (
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*.jpeg", "*.jpg", "*.png", "*.gif", "*.webp", "*.avif", "*.image*",
+        "*.mp4", "*.m4s", "*.webm", "*.mp3", "*/video/tos/*", "*mime_type=video*",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*",
+        "*analytics.tiktok.com*", "*mon.tiktokv.com*", "*mcs.tiktokw*", "*/web/report*", "*/slardar/*",
+    )
+    CRAWL_PROCESSES = os.cpu_count() or 1
+    CRAWL_RATE_LIMIT = 2
+    CRAWL_MAX_SHARD_ATTEMPTS = 3
+    DOWNLOAD_WORKERS = 8
+    DOWNLOAD_RATE_LIMIT = 4
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+    DOWNLOAD_TIMEOUT = 30
+    DOWNLOAD_RETRIES = 3
+    DOWNLOAD_MAX_PENDING = 32
+    CHECKPOINT_MAX_ATTEMPTS = 3
+    QUEUE_LEASE_TIMEOUT = 300
+    QUEUE_MAX_ATTEMPTS = 3
+    CAPTCHA_COOLDOWN = 60
+    CAPTCHA_MAX_COOLDOWN = 600
+    CAPTCHA_MAX_BLOCKS = 3
+    CAPTCHA_MAX_ATTEMPTS = 3
+    CAPTCHA_PACING = 2
+    CACHE_TTL = 6 * 60 * 60
+    CACHE_MAX_BYTES = 1024 * 1024 * 1024
+    REFRESH_WORKERS = 16
+    REFRESH_RATE_LIMIT = 20
+    REFRESH_BATCH_SIZE = 500
+    DEDUP_CAPACITY = 1_000_000
+    DEDUP_ERROR_RATE = 0.001
+    INSTRUMENTATION_TRACE = False
+    INSTRUMENTATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
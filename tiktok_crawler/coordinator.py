@@ -0,0 +1,251 @@
+from tiktok_crawler.cache import PageCache
+from tiktok_crawler.checkpoint import CheckpointStore
+from tiktok_crawler.config import Config
+from tiktok_crawler.dedup import SeenIndex
+from tiktok_crawler.downloader import Downloader, HostRateLimiter
+from tiktok_crawler.records import freeze
+from tiktok_crawler.sink import SINKS
+
+from concurrent.futures import wait
+import logging
+import multiprocessing
+import os
+import queue
+
+def read_terms(path: str) -> list[str]:
+    """Reads a list of search terms, one per line. Blank lines and lines starting with `#` are skipped.
+
+    Args:
+        path (str): The path of the term file.
+
+    Returns:
+        list[str]: The search terms, without duplicates, in the order of the file.
+    """
+    with open(path) as file:
+        terms = [line.strip() for line in file]
+    return list(dict.fromkeys(term for term in terms if term and not term.startswith("#")))
+
+class _QueueSink:
+    """Forwards the metadata saved by a worker to the sink of the coordinator.
+    """
+    def __init__(self, events, term: str) -> None:
+        self.events = events
+        self.term = term
+
+    def write(self, tiktok) -> None:
+        self.events.put(("tiktok", os.getpid(), self.term, freeze(tiktok)))
+
+def _work(tasks, events, limiter: HostRateLimiter, options: dict) -> None:
+    """The loop of a worker process. Every worker owns a single driver, which is reused for every term it takes from `tasks`.
+    """
+    from tiktok_crawler.crawler.search import SearchCrawler
+
+    pid = os.getpid()
+    os.makedirs(options["output"], exist_ok=True)
+    seen = SeenIndex(options["seen"]) if options["seen"] else None
+    cache = PageCache(options["cache"]) if options["cache"] else None
+    with Downloader(workers=options["download_workers"], limiter=limiter) as downloader:
+        while (term := tasks.get()) is not None:
+            events.put(("start", pid, term, None))
+            try:
+                with CheckpointStore(options["checkpoint"], job=term) as checkpoint:
+                    crawler = SearchCrawler(
+                        term,
+                        limit=options["limit"],
+                        driver_options=options["driver_options"],
+                        extractor=options["extractor"],
+                        workers=options["pool_size"],
+                        checkpoint=checkpoint,
+                        seen=seen,
+                        limiter=limiter,
+                        lean=options["lean"],
+                        cache=cache
+                    )
+                    futures, count, sink = [], 0, _QueueSink(events, term)
+                    for tiktok in crawler.iter_tiktok_videos():
+                        count += 1
+                        if options["download"]:
+                            futures.append(
+                                downloader.submit(tiktok, path=options["output"], checkpoint=checkpoint, sink=sink, seen=seen)
+                            )
+                        else:
+                            sink.write(tiktok)
+                            if tiktok.url:
+                                checkpoint.mark_saved(tiktok.url)
+                            if seen is not None:
+                                seen.add(tiktok.id, tiktok.url)
+                    wait(futures)
+                    events.put(("done", pid, term, count))
+            except Exception as e:
+                logging.exception(f"Shard failed: {term}")
+                events.put(("failed", pid, term, repr(e)))
+
+    if seen is not None:
+        seen.close()
+    if cache is not None:
+        cache.close()
+
+class ShardCoordinator:
+    """Crawls a list of search terms with a pool of worker processes. Every term is a shard which is crawled by a single
+    `tiktok_crawler.crawler.search.SearchCrawler` in one of the workers, and every worker owns its own driver.
+
+    The workers share one per host rate budget and send the metadata of the Tiktok videos to a single sink in the coordinator.
+    The progress of every shard is recorded in `progress`. When a worker dies, its shard is handed to a replacement worker,
+    which resumes it from the shared checkpoint database.
+
+    Args:
+        terms (list[str]): The search terms, see `read_terms()`.
+        processes (int): The number of worker processes.
+        limit (int): Defines how many videos to download per term.
+        output (str): The directory of the videos, the sink files and the checkpoint database.
+        sink (str): The output sink of the metadata, see `tiktok_crawler.sink.SINKS`.
+        rate (float): The maximum number of requests per second per host, shared by every worker.
+        driver_options (list): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+        extractor (str): The extractor backend, see `tiktok_crawler.crawler.EXTRACTORS`.
+        seen (str): The path of a `tiktok_crawler.dedup.SeenIndex` shared by the workers. No deduplication if `None`.
+        max_attempts (int): The number of times a shard is started before it is given up.
+        lean (bool): Crawls metadata only with lean browsers, see `tiktok_crawler.driver.make_lean()`.
+        cache (str): The path of a `tiktok_crawler.cache.PageCache` shared by the workers. No cache if `None`.
+        checkpoint (str): The path of the checkpoint database. Defaults to `checkpoint.db` in `output`.
+        pool_size (int): The number of browser sessions of every worker which visit the Tiktok videos in parallel.
+        download_workers (int): The number of concurrent downloads of every worker.
+        download (bool): Saves the videos. Only the metadata is sent to the sink if `False`.
+    """
+    def __init__(
+        self,
+        terms:list,
+        processes:int = Config.CRAWL_PROCESSES,
+        limit:int = 15,
+        output:str = "./output",
+        sink:str = "jsonl",
+        rate:float = Config.CRAWL_RATE_LIMIT,
+        driver_options:list = None,
+        extractor:str = "script",
+        seen:str = None,
+        max_attempts:int = Config.CRAWL_MAX_SHARD_ATTEMPTS,
+        lean:bool = False,
+        cache:str = None,
+        checkpoint:str = None,
+        pool_size:int = 1,
+        download_workers:int = Config.DOWNLOAD_WORKERS,
+        download:bool = True
+    ) -> None:
+        if sink not in SINKS:
+            raise ValueError(f"Unknown sink: {sink}. Choose from: {', '.join(SINKS)}")
+
+        self.terms = list(terms)
+        self.processes = max(1, min(processes, len(self.terms)))
+        self.output = output
+        self.sink = sink
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.options = dict(
+            limit=limit,
+            output=output,
+            driver_options=driver_options if isinstance(driver_options, list) else [],
+            extractor=extractor,
+            checkpoint=checkpoint or os.path.join(output, "checkpoint.db"),
+            seen=seen,
+            lean=lean,
+            cache=cache,
+            pool_size=pool_size,
+            download_workers=download_workers,
+            download=download,
+        )
+        self.progress = {term: dict(status="pending", attempts=0, tiktoks=0, error=None) for term in self.terms}
+
+    def run(self) -> dict:
+        """Crawls every shard and blocks until all of them are either done or failed `max_attempts` times.
+
+        Returns:
+            dict: The progress of every shard, see `progress`.
+        """
+        os.makedirs(self.output, exist_ok=True)
+        with multiprocessing.Manager() as manager:
+            limiter = HostRateLimiter(self.rate, state=manager.dict(), lock=manager.Lock())
+            tasks, events = manager.Queue(), manager.Queue()
+            for term in self.terms:
+                tasks.put(term)
+
+            workers, assigned = {}, {}
+            for _ in range(self.processes):
+                self._spawn(workers, tasks, events, limiter)
+
+            with SINKS[self.sink](self.output) as sink:
+                while self._remaining():
+                    self._recover(workers, assigned, tasks, events, limiter)
+                    try:
+                        kind, pid, term, value = events.get(timeout=1)
+                    except queue.Empty:
+                        continue
+
+                    shard = self.progress[term]
+                    if kind == "start":
+                        shard.update(status="running", attempts=shard["attempts"] + 1)
+                        if pid in workers:
+                            assigned[pid] = term
+                        else:
+                            self._retry(term, "Worker died", tasks)
+                    elif kind == "tiktok":
+                        sink.write(value)
+                        shard["tiktoks"] += 1
+                    elif kind == "done":
+                        assigned.pop(pid, None)
+                        shard["status"] = "done"
+                        logging.info(f"Shard done: {term} ({shard['tiktoks']} Tiktok video(s))")
+                    elif kind == "failed":
+                        assigned.pop(pid, None)
+                        self._retry(term, value, tasks)
+
+                for _ in workers:
+                    tasks.put(None)
+                for process in workers.values():
+                    process.join()
+
+        return self.progress
+
+    def summary(self) -> dict:
+        """Counts the shards per status.
+
+        Returns:
+            dict: The number of shards per status.
+        """
+        counts = {}
+        for shard in self.progress.values():
+            counts[shard["status"]] = counts.get(shard["status"], 0) + 1
+        return counts
+
+    def _remaining(self) -> bool:
+        return any(shard["status"] in ("pending", "running") for shard in self.progress.values())
+
+    def _spawn(self, workers: dict, tasks, events, limiter: HostRateLimiter) -> None:
+        process = multiprocessing.Process(target=_work, args=(tasks, events, limiter, self.options), daemon=True)
+        process.start()
+        workers[process.pid] = process
+        logging.info(f"Started worker {process.pid}")
+
+    def _retry(self, term: str, error: str, tasks) -> None:
+        shard = self.progress[term]
+        shard["error"] = error
+        if shard["attempts"] >= self.max_attempts:
+            shard["status"] = "failed"
+            logging.error(f"Shard failed {shard['attempts']} time(s), giving up: {term}")
+            return
+
+        shard["status"] = "pending"
+        tasks.put(term)
+
+    def _recover(self, workers: dict, assigned: dict, tasks, events, limiter: HostRateLimiter) -> None:
+        """Replaces the dead workers and hands their shards to the queue again.
+        """
+        for pid, process in list(workers.items()):
+            if process.is_alive():
+                continue
+
+            del workers[pid]
+            logging.error(f"Worker {pid} died with exit code {process.exitcode}")
+            term = assigned.pop(pid, None)
+            if term is not None:
+                self._retry(term, f"Worker died with exit code {process.exitcode}", tasks)
+            if self._remaining():
+                self._spawn(workers, tasks, events, limiter)
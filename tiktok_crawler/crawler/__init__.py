@@ -1,15 +1,59 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 
+from tiktok_crawler import instrumentation
+from tiktok_crawler.dedup import stable_id, video_key
 from tiktok_crawler.entities import Author, Caption, Media, Metrics, Music, Tag, Tiktok
+from tiktok_crawler.extractor import Extractor, build_tiktok
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+from tiktok_crawler.extractor.pagesource import PageSourceExtractor
+from tiktok_crawler.extractor.script import ScriptExtractor
+from tiktok_crawler.loader import IncrementalLoader
+from tiktok_crawler.network import MediaCapture
+from tiktok_crawler.records import TiktokRecord, freeze
 
 from abc import ABC, abstractmethod
+from typing import Iterator
 import logging
 
 from tiktok_crawler.exception import MediaNotFoundException
 
+EXTRACTORS = {
+    "webdriver": None,
+    "script": ScriptExtractor,
+    "pagesource": PageSourceExtractor,
+    "hydration": HydrationExtractor,
+}
+
 class Crawler(ABC):
-    @abstractmethod
+    XPATH = None
+    seen = None
+    captures = None
+    
     def get_tiktok_videos(self) -> list[Tiktok]:
+        """Crawls all the Tiktok videos at once. See `iter_tiktok_videos()` to process them as soon as they are extracted.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`
+        """
+        return list(self.iter_tiktok_videos())
+    
+    def iter_records(self, elements: dict = None) -> Iterator[TiktokRecord]:
+        """Crawls the Tiktok videos like `iter_tiktok_videos()`, yielding compact, immutable records without any web element,
+        so large crawls do not pin the elements of every page they touched.
+
+        Args:
+            elements (dict): An optional side table which receives the web element of every Tiktok video by id.
+
+        Yields:
+            TiktokRecord: `tiktok_crawler.records.TiktokRecord`
+        """
+        for tiktok in self.iter_tiktok_videos():
+            yield freeze(tiktok, elements)
+    
+    @abstractmethod
+    def iter_tiktok_videos(self) -> Iterator[Tiktok]:
         ...
         
     @abstractmethod
@@ -17,7 +61,7 @@ class Crawler(ABC):
         ...
         
     @abstractmethod
-    def _load_tiktok_videos(self) -> None:
+    def _load_tiktok_videos(self) -> IncrementalLoader:
         ...
         
     def _get_tiktok(self, element : WebElement) -> Tiktok:
@@ -34,11 +78,16 @@ class Crawler(ABC):
         """
         try:
             logging.info("Extracting")
-            author = self._get_author(element)
-            caption = self._get_caption(element)
-            media = self._get_media(element)
-            metrics = self._get_metrics(element)
-            music = self._get_music(element)
+            with instrumentation.timer("extract.author"):
+                author = self._get_author(element)
+            with instrumentation.timer("extract.caption"):
+                caption = self._get_caption(element)
+            with instrumentation.timer("extract.media"):
+                media = self._get_media(element)
+            with instrumentation.timer("extract.metrics"):
+                metrics = self._get_metrics(element)
+            with instrumentation.timer("extract.music"):
+                music = self._get_music(element)
                 
             tiktok = Tiktok(
                 id = element.id,
@@ -62,10 +111,147 @@ class Crawler(ABC):
                 element=element,
                 status="MediaNotFoundException"
             )
+            instrumentation.count("tiktoks.media_not_found")
                 
         logging.info("DONE Extracting element")
         return tiktok
     
+    def _get_extractor(self, name: str) -> Extractor:
+        """Creates the extractor backend to be used by the crawler from the `tiktok_crawler.xpath` module in `self.XPATH`.
+
+        Args:
+            name (str): Name of the extractor backend, see `EXTRACTORS`. `webdriver` queries every field with a separate WebDriver call.
+
+        Returns:
+            Extractor: Returns a `tiktok_crawler.extractor.Extractor` instance or `None` for the `webdriver` backend.
+        """
+        if name not in EXTRACTORS:
+            raise ValueError(f"Unknown extractor: {name}. Choose from: {', '.join(EXTRACTORS)}")
+        
+        extractor = EXTRACTORS[name]
+        return extractor(self.XPATH) if extractor else None
+    
+    def _extract_tiktoks(
+        self, containers: str, start: int = 0, stop: int = None, driver: WebDriver = None, elements: list[WebElement] = None
+    ) -> list[Tiktok]:
+        """Extracts the Tiktok videos matched by `containers` using the extractor backend of the crawler.
+
+        Args:
+            containers (str): The XPath which matches the Tiktok video containers.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+            driver (WebDriver): The Selenium web driver which holds the page. Defaults to `self.driver`.
+            elements (list[WebElement]): The containers of the window `start:stop` if they were already fetched, e.g. by
+                `tiktok_crawler.loader.IncrementalLoader.elements()`, so `containers` is not matched against the whole page again.
+                Ignored by the `BATCH` extractors.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`. Missing media links are taken from the network capture of the driver
+            by video id, see `tiktok_crawler.network.MediaCapture.take()`, then from `_get_media()`.
+        """
+        driver = driver or self.driver
+        if self.extractor is None:
+            if elements is None:
+                elements = driver.find_elements(By.XPATH, containers)[start:stop]
+            tiktoks = []
+            for element in elements:
+                with instrumentation.timer("crawler.get_tiktok"):
+                    tiktoks.append(self._get_tiktok(element))
+            instrumentation.count("tiktoks.extracted", len(tiktoks))
+            return tiktoks
+        
+        capture = self._get_capture(driver)
+        page_key = video_key(driver.current_url) if capture is not None else None
+        with instrumentation.timer(f"extractor.{type(self.extractor).__name__}"):
+            records = self.extractor.extract(
+                driver, containers if elements is None or self.extractor.BATCH else elements, start, stop
+            )
+        
+        tiktoks = []
+        for record in records:
+            element = record.get("element")
+            if not record["media"]["link"] and capture is not None:
+                record["media"]["link"] = capture.take(video_key(record.get("url")) or page_key)
+            if not record["media"]["link"] and element is not None:
+                try:
+                    with instrumentation.timer("extract.media"):
+                        record["media"]["link"] = self._get_media(element).link
+                except MediaNotFoundException as e:
+                    logging.warning(e)
+                    instrumentation.count("tiktoks.media_not_found")
+            
+            tiktoks.append(build_tiktok(record))
+        
+        instrumentation.count("tiktoks.extracted", len(tiktoks))
+        return tiktoks
+    
+    def _get_capture(self, driver: WebDriver) -> MediaCapture:
+        """Returns the `tiktok_crawler.network.MediaCapture` of a driver, creating it on first use.
+
+        Args:
+            driver (WebDriver): The Selenium web driver, created with `capture_network=True`.
+
+        Returns:
+            MediaCapture: The capture of the driver, `None` if the crawler does not capture the network.
+        """
+        if self.captures is None:
+            return None
+        if driver not in self.captures:
+            self.captures[driver] = MediaCapture(driver)
+        return self.captures[driver]
+    
+    def _wait_for_media(self, media_container: WebElement, links: str) -> str:
+        """Waits for the link of a Tiktok video, checking the `src` of the video element and the video urls captured from the
+        network on every poll, so the wait ends on the first of both.
+
+        Args:
+            media_container (WebElement): The container of the video element.
+            links (str): The XPath of the video element, relative to `media_container`.
+
+        Returns:
+            str: The link of the Tiktok video.
+
+        Raises:
+            MediaNotFoundException: if no link was found within `Config.CRAWL_WAIT_TIMEOUT`.
+        """
+        capture = self._get_capture(media_container.parent)
+        key = video_key(media_container.parent.current_url) if capture is not None else None
+        
+        def _link() -> str:
+            for video in media_container.find_elements(By.XPATH, links):
+                src = video.get_attribute("src")
+                if src:
+                    return src
+            return capture.take(key) if capture is not None else None
+        
+        link = self.wait.until(_link, name="media")
+        if not link:
+            raise MediaNotFoundException("Unable to find Media")
+        
+        return link
+    
+    def _filter_seen(self, tiktoks: list[Tiktok]) -> list[Tiktok]:
+        """Assigns a stable id to the Tiktok videos and drops the ones already recorded in `self.seen` by a previous run.
+        
+        The Tiktok videos are only recorded in `self.seen` once they are saved, see `tiktok_crawler.entities.save_tiktok()`.
+
+        Args:
+            tiktoks (list[Tiktok]): list of `tiktok_crawler.entities.Tiktok`
+
+        Returns:
+            list[Tiktok]: The Tiktok videos which were not seen before.
+        """
+        unseen = []
+        for tiktok in tiktoks:
+            tiktok.id = stable_id(tiktok)
+            if self.seen is not None and tiktok.id in self.seen:
+                logging.info(f"Skipping seen Tiktok: {tiktok.id}")
+                instrumentation.count("tiktoks.seen")
+                continue
+            unseen.append(tiktok)
+            
+        return unseen
+    
     @abstractmethod
     def _get_author(self, item_container: WebElement) -> Author:
         ...
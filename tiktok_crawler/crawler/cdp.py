@@ -0,0 +1,234 @@
+from pyppeteer import launch
+from pyppeteer.browser import Browser
+from pyppeteer.errors import PyppeteerError, TimeoutError as PageTimeoutError
+from pyppeteer.page import Page
+
+from tiktok_crawler.config import Config
+from tiktok_crawler.dedup import stable_id
+from tiktok_crawler.entities import Tiktok
+from tiktok_crawler.exception import CaptchaTimeoutException
+from tiktok_crawler.extractor import build_tiktok, compile_spec
+from tiktok_crawler.extractor.script import EXTRACT_SCRIPT
+from tiktok_crawler.loader import COUNT_SCRIPT, SLICE_SCRIPT
+from tiktok_crawler.xpath import search
+
+from typing import AsyncIterator
+import asyncio
+import logging
+from urllib.parse import quote_plus
+
+def _function(script: str) -> str:
+    """Wraps a Selenium style script, which reads its parameters from `arguments`, into a function for `page.evaluate()`.
+    """
+    return f"function () {{ {script} }}"
+
+ASYNC_EXTRACT_SCRIPT = _function(
+    f"var records = (function () {{ {EXTRACT_SCRIPT} }}).apply(null, arguments);"
+    "records.forEach(function (record) { record.element = null; });"
+    "return records;"
+)
+ASYNC_COUNT_SCRIPT = _function(COUNT_SCRIPT)
+ASYNC_SLICE_SCRIPT = _function(SLICE_SCRIPT)
+ASYNC_CLICK_SCRIPT = _function("""
+var node = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (node) node.click();
+return !!node;
+""")
+
+_DONE = object()
+
+class AsyncCrawler:
+    """Crawls the pages of Tiktok videos in many tabs concurrently over the Chrome DevTools Protocol, from a single event loop.
+
+    Every tab loads a page and extracts the Tiktok video with a single `page.evaluate()` of the same script as
+    `tiktok_crawler.extractor.script.ScriptExtractor`.
+
+    Args:
+        urls (list[str]): The links of the pages of the Tiktok videos, e.g. locally served fixture pages.
+        tabs (int): The number of tabs which load pages concurrently.
+        launch_options (dict): The options passed to `pyppeteer.launch()`. Defaults to a headless Chromium.
+        xpath (module): The `tiktok_crawler.xpath` module which matches the pages. Defaults to `tiktok_crawler.xpath.search`.
+    """
+    def __init__(
+        self,
+        urls:list = None,
+        tabs:int = Config.CRAWL_ASYNC_TABS,
+        launch_options:dict = None,
+        xpath = search
+    ) -> None:
+        self.urls = urls if isinstance(urls, list) else []
+        self.tabs = tabs
+        self.launch_options = launch_options if isinstance(launch_options, dict) else dict(headless=True)
+        self.xpath = xpath
+        self.spec = compile_spec(xpath)
+
+    async def stream(self) -> AsyncIterator[Tiktok]:
+        """Crawls the Tiktok videos, yielding every one of them as soon as its tab has extracted it.
+
+        Yields:
+            Tiktok: `tiktok_crawler.entities.Tiktok`
+        """
+        browser = await launch(**self.launch_options)
+        links = asyncio.Queue(maxsize=self.tabs * 2)
+        results = asyncio.Queue()
+
+        async def _produce() -> None:
+            try:
+                async for link in self._get_links(browser):
+                    await links.put(link)
+            except (PyppeteerError, CaptchaTimeoutException) as e:
+                logging.error(f"Link discovery failed: {e}")
+            finally:
+                for _ in range(self.tabs):
+                    await links.put(None)
+
+        async def _consume() -> None:
+            page = await browser.newPage()
+            try:
+                while (link := await links.get()) is not None:
+                    try:
+                        for tiktok in await self._get_tiktok_from_link(page, link):
+                            await results.put(tiktok)
+                    except (PyppeteerError, PageTimeoutError, CaptchaTimeoutException) as e:
+                        logging.error(f"Unable to crawl {link}: {e}")
+            finally:
+                await page.close()
+                await results.put(_DONE)
+
+        tasks = [asyncio.ensure_future(_produce())] + [asyncio.ensure_future(_consume()) for _ in range(self.tabs)]
+        try:
+            done = 0
+            while done < self.tabs:
+                tiktok = await results.get()
+                if tiktok is _DONE:
+                    done += 1
+                else:
+                    yield tiktok
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await browser.close()
+
+    async def _get_links(self, browser: Browser) -> AsyncIterator[str]:
+        for url in self.urls:
+            yield url
+
+    async def _get_tiktok_from_link(self, page: Page, link: str) -> list[Tiktok]:
+        """Loads the page of a Tiktok video in a tab and extracts it, polling again while the video `src` is not set yet.
+
+        Args:
+            page (Page): The tab which loads the page.
+            link (str): The link of the page of the Tiktok video.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`
+        """
+        containers = self.xpath.TiktokVideo.CONTAINER
+        await page.goto(link, waitUntil="domcontentloaded")
+        try:
+            await page.waitForXPath(containers, timeout=Config.CRAWL_WAIT_TIMEOUT * 1000)
+        except PageTimeoutError:
+            logging.warning(f"No Tiktok video found in {link}")
+            return []
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + Config.CRAWL_WAIT_TIMEOUT
+        delay = Config.CRAWL_WAIT_INITIAL
+        records = await page.evaluate(ASYNC_EXTRACT_SCRIPT, self.spec, containers, 0, 1)
+        while records and not all(record["media"]["link"] for record in records) and loop.time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * Config.CRAWL_WAIT_FACTOR, Config.CRAWL_SCROLL_PAUSE_TIME)
+            records = await page.evaluate(ASYNC_EXTRACT_SCRIPT, self.spec, containers, 0, 1)
+
+        tiktoks = []
+        for record in records:
+            tiktok = build_tiktok(record)
+            tiktok.url = link
+            tiktok.id = stable_id(tiktok)
+            tiktoks.append(tiktok)
+
+        return tiktoks
+
+class AsyncSearchCrawler(AsyncCrawler):
+    """Discovers the Tiktok videos of a **Search results** page in one tab and crawls them in many tabs concurrently.
+
+    Args:
+        search (str): The raw search term.
+        limit (int): Defines how many videos to download.
+        tabs (int): The number of tabs which load pages concurrently.
+        launch_options (dict): The options passed to `pyppeteer.launch()`. Defaults to a headless Chromium.
+        search_url (str): The url of the search results page. Defaults to `Config.CRAWL_SEARCH_URL` with the search term.
+    """
+    def __init__(
+        self,
+        search:str,
+        limit:int = 15,
+        tabs:int = Config.CRAWL_ASYNC_TABS,
+        launch_options:dict = None,
+        search_url:str = None
+    ) -> None:
+        super().__init__(tabs=tabs, launch_options=launch_options)
+        self.limit = limit
+        self.search_url = search_url or f"{Config.CRAWL_SEARCH_URL}q={quote_plus(search)}"
+
+    async def _get_links(self, browser: Browser) -> AsyncIterator[str]:
+        """Loads the search results incrementally and yields the links as soon as they are appended.
+
+        Yields:
+            str: The link of a Tiktok video.
+        """
+        page = await browser.newPage()
+        try:
+            logging.info(f"Loading: {self.search_url}")
+            await page.goto(self.search_url, waitUntil="domcontentloaded")
+            await self._wait_for_captcha(page)
+
+            cursor, idle = 0, 0
+            count = await self._count(page)
+            while cursor < self.limit and idle < Config.CRAWL_MAX_IDLE_SCROLLS:
+                count = min(count, self.limit)
+                if count > cursor:
+                    for link in await page.evaluate(ASYNC_SLICE_SCRIPT, search.ContainerItem.TIKTOK_VIDEOS, cursor, count, "href"):
+                        yield link
+                    cursor, idle = count, 0
+                    continue
+
+                await page.evaluate("function () { window.scrollTo(0, document.body.scrollHeight); }")
+                if not await page.evaluate(ASYNC_CLICK_SCRIPT, search.ContainerItem.LOAD_MORE_BUTTON):
+                    logging.warning(f"No more elements to load after {cursor} element(s)")
+                    return
+                
+                count = await self._wait_for_more(page, cursor)
+                idle += count <= cursor
+        finally:
+            await page.close()
+
+    async def _count(self, page: Page) -> int:
+        return int(await page.evaluate(ASYNC_COUNT_SCRIPT, search.ContainerItem.TIKTOK_VIDEOS))
+
+    async def _wait_for_more(self, page: Page, cursor: int) -> int:
+        """Polls the number of search results with exponential backoff until it exceeds `cursor` or `Config.CRAWL_WAIT_TIMEOUT` is reached.
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + Config.CRAWL_WAIT_TIMEOUT
+        delay = Config.CRAWL_WAIT_INITIAL
+        count = await self._count(page)
+        while count <= cursor and loop.time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * Config.CRAWL_WAIT_FACTOR, Config.CRAWL_SCROLL_PAUSE_TIME)
+            count = await self._count(page)
+        return count
+
+    async def _wait_for_captcha(self, page: Page) -> None:
+        """Waits for the user to solve a captcha, if present.
+        """
+        if not await page.xpath(search.ContainerItem.CAPTCHA):
+            return
+        
+        logging.warning("Process will timeout in 60 seconds if captcha is not solved.")
+        logging.warning("Waiting for user to solve captcha...")
+        try:
+            await page.waitForXPath(search.ContainerItem.TIKTOK_VIDEOS, timeout=60 * 1000)
+        except PageTimeoutError:
+            raise CaptchaTimeoutException("Captcha needs to be solved within 60 seconds")
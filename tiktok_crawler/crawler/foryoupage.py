@@ -1,18 +1,19 @@
-from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+from tiktok_crawler import instrumentation
 from tiktok_crawler.crawler import Crawler
-from tiktok_crawler import exception
+from tiktok_crawler.dedup import SeenIndex
 from tiktok_crawler.config import Config
 from tiktok_crawler.driver import Driver
 from tiktok_crawler.entities import Author, Caption, Media, Metrics, Music, Tag, Tiktok
+from tiktok_crawler.loader import IncrementalLoader
+from tiktok_crawler.wait import AdaptiveWait
 from tiktok_crawler.xpath import foryoupage
 
+from typing import Iterator
 import logging
-import time
+import weakref
 from urllib.parse import quote_plus
 
 class CrawlerForYouPage(Crawler):
@@ -21,34 +22,65 @@ class CrawlerForYouPage(Crawler):
     Args:
         limit (int): Defines how many videos to download.
         driver_options (list): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+        extractor (str): The extractor backend, see `tiktok_crawler.crawler.EXTRACTORS`. Defaults to `script`.
+        seen (SeenIndex): A `tiktok_crawler.dedup.SeenIndex` of the Tiktok videos saved by previous runs, which are skipped.
+        capture_network (bool): Resolves the media links from the video requests in the performance log instead of polling the DOM,
+            see `tiktok_crawler.network.MediaCapture`.
+        lean (bool): Crawls metadata only with a browser which does not load images, media, fonts and trackers and does not
+            play the videos, see `tiktok_crawler.driver.make_lean()`. The media links are still read from the DOM.
     """
+    XPATH = foryoupage
+    
     def __init__(
         self, 
         limit:int = 15,
-        driver_options:list = None
+        driver_options:list = None,
+        extractor:str = "script",
+        seen:SeenIndex = None,
+        capture_network:bool = False,
+        lean:bool = False
     ) -> None:
+        if lean and capture_network:
+            logging.warning("Lean browsers do not request the videos, resolving the media links from the DOM instead")
+            capture_network = False
         options = driver_options if isinstance(driver_options, list) else []
-        self.driver = Driver(*options).get_driver()
+        self.driver = Driver(*options, capture_network=capture_network, lean=lean).get_driver()
         self.limit = limit
+        self.extractor = self._get_extractor(extractor)
+        self.wait = AdaptiveWait()
+        self.seen = seen
+        self.captures = weakref.WeakKeyDictionary() if capture_network else None
         self.root = self._get_root(Config.CRAWL_ROOT_URL)
     
-    def get_tiktok_videos(self) -> list[Tiktok]:
-        """Downloads videos and metadata from the **for you** page of Tiktok.
+    def iter_tiktok_videos(self) -> Iterator[Tiktok]:
+        """Downloads videos and metadata from the **for you** page of Tiktok, yielding every Tiktok video as soon as it is extracted.
 
-        Returns:
-            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`
+        Yields:
+            Tiktok: `tiktok_crawler.entities.Tiktok`
         """
-        self._load_tiktok_videos()
-        tiktoks = []
-                
-        for element in self.root.find_elements(By.XPATH, foryoupage.ContainerItem.CONTAINERS)[:self.limit]:
-            logging.info("Scrolling to Element...")
-            self.driver.execute_script("arguments[0].scrollIntoView()", element)
-            time.sleep(Config.CRAWL_SCROLL_PAUSE_TIME)
-            tiktok = self._get_tiktok(element)
-            tiktoks.append(tiktok)
+        loader = self._load_tiktok_videos()
+        capture = self._get_capture(self.driver)
+        
+        for start, stop in loader:
+            for index, element in enumerate(loader.elements(start, stop), start):
+                logging.info("Scrolling to Element...")
+                if capture is not None:
+                    capture.reset()
+                with instrumentation.timer("crawler.scroll"):
+                    self.driver.execute_script("arguments[0].scrollIntoView()", element)
+                if capture is not None:
+                    self.wait.until(capture.poll, name="capture")
+                else:
+                    self.wait.until_attribute(
+                        self.driver, element, [foryoupage.Media.CONTAINER, f"{foryoupage.Media.LINK}|{foryoupage.Media.LINK_ALT}"], "src"
+                    )
+                if not (self.extractor and self.extractor.BATCH):
+                    yield from self._filter_seen(
+                        self._extract_tiktoks(foryoupage.ContainerItem.CONTAINERS, index, index + 1, elements=[element])
+                    )
             
-        return tiktoks
+            if self.extractor and self.extractor.BATCH:
+                yield from self._filter_seen(self._extract_tiktoks(foryoupage.ContainerItem.CONTAINERS, start, stop))
     
     def _get_root(self, url:str) -> WebElement:
         """Extracts the root element of the page. This is done to remove unnecessary HTML elements such as the *head*, *script* and *style*.
@@ -59,28 +91,24 @@ class CrawlerForYouPage(Crawler):
         Returns:
             WebElement:  Returns a Selenium web element which is the extracted root element of the page.
         """
-        self.driver.get(url)
+        with instrumentation.timer("driver.get"):
+            self.driver.get(url)
         root = self.driver.find_element(By.XPATH, foryoupage.Root.ROOT)
         
         return root
     
-    def _load_tiktok_videos(self) -> None:
-        """Pre-loads tiktok videos by scrolling down until `self.limit` is exceeded or reached.
+    def _load_tiktok_videos(self) -> IncrementalLoader:
+        """Loads tiktok videos incrementally by scrolling down until `self.limit` is reached.
+
+        Returns:
+            IncrementalLoader: Yields the `start` and `stop` index of the newly loaded elements in `xpath.ContainerItem.CONTAINERS`.
         """
-        def _is_limit_reached() -> bool:
-            """Checks if the number of elements in `xpath.ContainerItem.CONTAINERS` has reached or exceeded `self.limit`
-
-            Returns:
-                bool: `self.limit` <= the number of elements in `xpath.ContainerItem.CONTAINERS`
-            """
-            element_count = len([element for element in self.root.find_elements(By.XPATH, foryoupage.ContainerItem.CONTAINERS)])
-            logging.info(f"Element count: {element_count}")
-            return self.limit <= element_count
-        
-        while not _is_limit_reached():
+        def _scroll() -> bool:
             logging.info("Scrolling...")
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(Config.CRAWL_SCROLL_PAUSE_TIME)
+            return True
+        
+        return IncrementalLoader(self.driver, foryoupage.ContainerItem.CONTAINERS, self.limit, _scroll, wait=self.wait)
 
     ### Get entities
       
@@ -143,17 +171,7 @@ class CrawlerForYouPage(Crawler):
             MediaNotFoundException: if the crawler was unable to download the Tiktok video.
         """
         media_container = item_container.find_element(By.XPATH, foryoupage.Media.CONTAINER)
-        try:
-            link = WebDriverWait(media_container, 10).until(
-                EC.presence_of_element_located((By.XPATH, f"{foryoupage.Media.LINK}|{foryoupage.Media.LINK_ALT}"))
-            ).get_attribute("src")
-        except TimeoutException:
-            try:
-                link = WebDriverWait(media_container, 10).until(
-                    EC.presence_of_element_located((By.XPATH, f"{foryoupage.Media.LINK}|{foryoupage.Media.LINK_ALT}"))
-                ).get_attribute("src")
-            except TimeoutException:  
-                raise exception.MediaNotFoundException("Unable to find Media")
+        link = self._wait_for_media(media_container, f"{foryoupage.Media.LINK}|{foryoupage.Media.LINK_ALT}")
         
         media = Media(
             link=link,
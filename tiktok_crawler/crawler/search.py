@@ -1,105 +1,454 @@
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from lxml import etree
 
+from tiktok_crawler import instrumentation
+from tiktok_crawler.cache import PageCache, fetch_page
+from tiktok_crawler.checkpoint import CheckpointStore
 from tiktok_crawler.crawler import Crawler
-from tiktok_crawler.exception import CaptchaTimeoutException, MediaNotFoundException, NoElementsFound
+from tiktok_crawler.dedup import SeenIndex, video_key
+from tiktok_crawler.exception import CaptchaDetectedException, CaptchaTimeoutException, NoElementsFound
 from tiktok_crawler.config import Config
-from tiktok_crawler.driver import Driver
+from tiktok_crawler.downloader import HostRateLimiter, get_downloader
+from tiktok_crawler.driver import Driver, DriverPool
 from tiktok_crawler.entities import Author, Caption, Media, Metrics, Music, Tag, Tiktok
+from tiktok_crawler.extractor import build_tiktok
+from tiktok_crawler.extractor.hydration import HydrationExtractor
+from tiktok_crawler.loader import IncrementalLoader
+from tiktok_crawler.scheduler import SessionScheduler, detect_captcha
+from tiktok_crawler.wait import AdaptiveWait
+from tiktok_crawler.workqueue import WorkQueue
 from tiktok_crawler.xpath import search
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+import json
 import logging
+import queue
 import random
-import time
+import requests
+import threading
+import weakref
 from urllib.parse import quote_plus
 
 class SearchCrawler(Crawler):
     """Handles the web crawling of videos from the **Search results** page.
     
     Args:
-        search (str): The raw search term.
+        search (str): The raw search term. `None` for a crawler which only extracts the links of a `WorkQueue`, see `iter_from_queue()`.
+            With a pool, such a crawler does not launch a browser session of its own.
         limit (int): Defines how many videos to download.
         driver_options (list): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+        extractor (str): The extractor backend, see `tiktok_crawler.crawler.EXTRACTORS`. Defaults to `script`.
+        workers (int): The number of browser sessions which visit the Tiktok videos in parallel. Defaults to a single session.
+        pool (DriverPool): A `tiktok_crawler.driver.DriverPool` to check out the browser sessions from. Created from `workers` if not given.
+            The sessions are scheduled by a `tiktok_crawler.scheduler.SessionScheduler`, which parks the sessions hitting a captcha.
+        checkpoint (CheckpointStore): A `tiktok_crawler.checkpoint.CheckpointStore` which records the progress of the crawl, so that a restarted
+            crawl skips the finished links.
+        seen (SeenIndex): A `tiktok_crawler.dedup.SeenIndex` of the Tiktok videos saved by previous runs, which are skipped before visiting them.
+        capture_network (bool): Resolves the media links from the video requests in the performance log instead of polling the DOM,
+            see `tiktok_crawler.network.MediaCapture`.
+        limiter (HostRateLimiter): A `tiktok_crawler.downloader.HostRateLimiter` which spaces out the visits of the Tiktok videos,
+            e.g. to share a rate budget between processes.
+        lean (bool): Crawls metadata only with a browser which does not load images, media, fonts and trackers and does not
+            play the videos, see `tiktok_crawler.driver.make_lean()`. The media links are still read from the DOM.
+        cache (PageCache): A `tiktok_crawler.cache.PageCache` of the search results and of the pages of the Tiktok videos. Fresh
+            pages are extracted without navigating the browser, stale pages are refreshed over plain HTTP.
     """
+    XPATH = search
     
     def __init__(
         self, 
         search,
         limit:int = 15,
-        driver_options:list = None
+        driver_options:list = None,
+        extractor:str = "script",
+        workers:int = 1,
+        pool:DriverPool = None,
+        checkpoint:CheckpointStore = None,
+        seen:SeenIndex = None,
+        capture_network:bool = False,
+        limiter:HostRateLimiter = None,
+        lean:bool = False,
+        cache:PageCache = None
     ) -> None:
+        if lean and capture_network:
+            logging.warning("Lean browsers do not request the videos, resolving the media links from the DOM instead")
+            capture_network = False
         options = driver_options if isinstance(driver_options, list) else []
-        self.driver = Driver(*options).get_driver()
+        self._driver = None
+        self._driver_args = (options, capture_network, lean)
         self.limit = limit
-        self.search = quote_plus(search)
-        search_url = f"{Config.CRAWL_SEARCH_URL}q={self.search}"
-        self.root = self._get_root(search_url)     
+        self.extractor = self._get_extractor(extractor)
+        self.wait = AdaptiveWait()
+        self.checkpoint = checkpoint
+        self.seen = seen
+        self.captures = weakref.WeakKeyDictionary() if capture_network else None
+        self.limiter = limiter
+        self.pool = pool
+        self._owns_pool = pool is None and workers > 1
+        if self._owns_pool:
+            self.pool = DriverPool(size=workers, driver_options=options, capture_network=capture_network, lean=lean)
+        self.scheduler = SessionScheduler(self.pool) if self.pool is not None else None
+        self.cache = cache
+        self._cache_extractor = HydrationExtractor(self.XPATH) if cache is not None else None
+        self.search = quote_plus(search) if search is not None else None
+        self.search_url = f"{Config.CRAWL_SEARCH_URL}q={self.search}" if search is not None else None
+        self._cached_links = self._get_cached_links()
+        self.root = None
+        if search is not None and self._cached_links is None:
+            self.root = self._get_root(self.search_url)
+    
+    @property
+    def driver(self) -> WebDriver:
+        """The browser session which loads the search results, and visits the Tiktok videos without a pool. It is launched on
+        first use, so a crawler which only extracts the links of a `WorkQueue` with a pool never launches it.
+        """
+        if self._driver is None:
+            options, capture_network, lean = self._driver_args
+            self._driver = Driver(*options, capture_network=capture_network, lean=lean).get_driver()
+        return self._driver
+        
+    def iter_tiktok_videos(self) -> Iterator[Tiktok]:
+        """Downloads videos and metadata from the **search results** page of Tiktok, yielding every Tiktok video as soon as it is extracted.
+        
+        When the crawler has a `DriverPool`, the links are handed to the pool as soon as they are discovered and the Tiktok videos
+        are yielded in the order they finish rather than in the order of the search results.
+
+        Yields:
+            Tiktok: `tiktok_crawler.entities.Tiktok`
+        """
+        if self.pool is None:
+            for tiktok_link in list(self._get_tiktok_links()):
+                yield from self._get_tiktok_from_link(tiktok_link, self.driver)
+            return
         
-    def get_tiktok_videos(self) -> list[Tiktok]:
-        """Downloads videos and metadata from the **search results** page of Tiktok.
+        def _crawl(tiktok_link: str) -> list[Tiktok]:
+            try:
+                return self._visit(tiktok_link)
+            except (WebDriverException, TimeoutError, CaptchaTimeoutException) as e:
+                logging.error(f"Giving up {tiktok_link}: {e}")
+                if self.checkpoint:
+                    self.checkpoint.mark_failed(tiktok_link, e)
+                return []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+                futures = [executor.submit(_crawl, tiktok_link) for tiktok_link in self._get_tiktok_links()]
+                try:
+                    for future in as_completed(futures):
+                        yield from future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            if self._owns_pool:
+                self.scheduler.close()
+                self.pool.close()
+    
+    def discover(self, work: WorkQueue) -> int:
+        """Runs the discovery stage of the crawl: puts the links of the Tiktok videos in the search results into a durable queue,
+        from which any number of extraction workers consume them, see `iter_from_queue()`.
+        
+        A queue which was finished by a previous run is not discovered again.
+
+        Args:
+            work (WorkQueue): The `tiktok_crawler.workqueue.WorkQueue` of the links.
 
         Returns:
-            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`
+            int: The number of new links.
         """
-        self._wait_for_captcha()
-        self._load_tiktok_videos()
-        tiktok_links = self._get_tiktok_links()
-        tiktoks = []
-        for tiktok_link in tiktok_links:
+        if work.is_finished():
+            logging.info(f"Discovery already finished: {work.summary()}")
+            return 0
+        
+        count = 0
+        for tiktok_link in self._get_tiktok_links():
+            count += work.put([tiktok_link])
+        work.finish()
+        logging.info(f"Discovered {count} new link(s)")
+        
+        return count
+    
+    def iter_from_queue(self, work: WorkQueue) -> Iterator[Tiktok]:
+        """Runs the extraction stage of the crawl: consumes the links of a durable queue filled by `discover()`, possibly in another
+        process, until the queue is drained. With a `DriverPool`, every session of the pool consumes the queue in its own thread.
+
+        Args:
+            work (WorkQueue): The `tiktok_crawler.workqueue.WorkQueue` of the links.
+
+        Yields:
+            Tiktok: `tiktok_crawler.entities.Tiktok`
+        """
+        if self.pool is None:
+            yield from self._consume(work, self.driver)
+            return
+        
+        results, stop = queue.Queue(), threading.Event()
+        
+        def _worker() -> None:
+            try:
+                for tiktok in self._consume(work, stop=stop):
+                    results.put(tiktok)
+            finally:
+                results.put(None)
+        
+        threads = [threading.Thread(target=_worker, daemon=True) for _ in range(self.pool.size)]
+        for thread in threads:
+            thread.start()
+        try:
+            done = 0
+            while done < len(threads):
+                tiktok = results.get()
+                if tiktok is None:
+                    done += 1
+                else:
+                    yield tiktok
+        finally:
+            stop.set()
+            if self._owns_pool:
+                for thread in threads:
+                    thread.join()
+                self.scheduler.close()
+                self.pool.close()
+    
+    def _consume(self, work: WorkQueue, driver: WebDriver = None, stop: threading.Event = None) -> Iterator[Tiktok]:
+        for tiktok_link in work.consume(AdaptiveWait(), stop):
+            try:
+                tiktoks = self._visit(tiktok_link, driver)
+            except (WebDriverException, TimeoutError, CaptchaTimeoutException) as e:
+                work.nack(tiktok_link, e)
+                continue
+            
+            work.ack(tiktok_link)
+            yield from tiktoks
+    
+    def _visit(self, tiktok_link: str, driver: WebDriver = None) -> list[Tiktok]:
+        """Extracts a Tiktok video with the given driver or else with a healthy session of `self.scheduler`, which moves the link
+        to another session if the page shows a captcha.
+
+        Args:
+            tiktok_link (str): The link of the Tiktok video.
+            driver (WebDriver): The Selenium web driver used to visit the link. Defaults to a session of `self.scheduler`.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`, see `_get_tiktok_from_link()`.
+
+        Raises:
+            CaptchaTimeoutException: if every session tried was challenged.
+        """
+        if driver is not None:
+            return self._get_tiktok_from_link(tiktok_link, driver)
+        return self.scheduler.run(lambda driver: self._get_tiktok_from_link(tiktok_link, driver))
+    
+    def _get_tiktok_from_link(self, tiktok_link: str, driver: WebDriver) -> list[Tiktok]:
+        """Visits the page of a single Tiktok video, unless it is cached, and extracts it.
+
+        Args:
+            tiktok_link (str): The link of the Tiktok video.
+            driver (WebDriver): The Selenium web driver used to visit the link.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`, empty if the page went stale or the Tiktok video was seen before.
+            
+        Raises:
+            CaptchaDetectedException: if the page of a pooled session shows a captcha, see `tiktok_crawler.scheduler.SessionScheduler`.
+        """
+        if self.seen is not None and video_key(tiktok_link) in self.seen:
+            logging.info(f"Skipping seen Tiktok: {tiktok_link}")
+            if self.checkpoint:
+                self.checkpoint.mark_saved(tiktok_link)
+            return []
+        
+        tiktoks = self._get_cached_tiktoks(tiktok_link) if self.cache is not None else None
+        if tiktoks is not None:
+            if self.checkpoint:
+                self.checkpoint.mark_extracted(tiktok_link)
+            return self._filter_seen(tiktoks)
+        
+        capture = self._get_capture(driver)
+        if capture is not None:
+            capture.reset()
+        
+        if self.limiter is not None:
+            self.limiter.wait(tiktok_link)
+        
+        try:
+            with instrumentation.timer("driver.get"):
+                driver.get(tiktok_link)
+            if driver is not self._driver and detect_captcha(driver):
+                raise CaptchaDetectedException(f"Captcha on {tiktok_link}")
+            tiktoks = self._extract_tiktoks(search.TiktokVideo.CONTAINER, 0, 1, driver=driver)
+            if self.cache is not None:
+                self.cache.put(tiktok_link, driver.page_source)
+        except StaleElementReferenceException as e:
+            logging.error("Stale Element")
+            if self.checkpoint:
+                self.checkpoint.mark_failed(tiktok_link, e)
+            return []
+        
+        for tiktok in tiktoks:
+            tiktok.url = tiktok_link
+        if self.checkpoint:
+            self.checkpoint.mark_extracted(tiktok_link)
+        
+        return self._filter_seen(tiktoks)
+    
+    def _get_cached_tiktoks(self, tiktok_link: str) -> list[Tiktok]:
+        """Extracts a Tiktok video from its cached page, without navigating the browser. A stale page is fetched again over plain
+        HTTP, which refreshes its metrics and its signed media link.
+
+        Args:
+            tiktok_link (str): The link of the Tiktok video.
+
+        Returns:
+            list[Tiktok]: list of `tiktok_crawler.entities.Tiktok`, `None` if the page has to be visited with the browser.
+        """
+        cached = self.cache.get(tiktok_link)
+        if cached is None:
+            return None
+        
+        page_source = cached.content
+        if cached.is_stale:
+            if self.limiter is not None:
+                self.limiter.wait(tiktok_link)
             try:
-                self.driver.get(tiktok_link)
-                tiktok_container = self.driver.find_element(By.XPATH, search.TiktokVideo.CONTAINER)
-                tiktoks.append(self._get_tiktok(tiktok_container))
-            except StaleElementReferenceException:
-                logging.error("Stale Element")
+                page_source = fetch_page(tiktok_link, session=get_downloader().session)
+            except requests.RequestException as e:
+                logging.warning(f"Unable to refresh {tiktok_link}: {e}")
+                return None
+        
+        try:
+            with instrumentation.timer("extractor.cache"):
+                records = self._cache_extractor.extract_html(page_source, search.TiktokVideo.CONTAINER, 0, 1, base_url=tiktok_link)
+        except (etree.ParserError, ValueError) as e:
+            logging.warning(f"Unable to parse the cached page of {tiktok_link}: {e}")
+            return None
+        if not records or not records[0]["media"]["link"]:
+            return None
+        
+        if cached.is_stale:
+            self.cache.put(tiktok_link, page_source)
         
+        tiktoks = [build_tiktok(record) for record in records]
+        for tiktok in tiktoks:
+            tiktok.url = tiktok_link
+        instrumentation.count("tiktoks.extracted", len(tiktoks))
         return tiktoks
     
-    def _get_tiktok_links(self) -> list[WebElement]:
-        return [element.get_attribute("href") for element in self.root.find_elements(By.XPATH, search.ContainerItem.TIKTOK_VIDEOS)][:self.limit]
+    def _get_cached_links(self) -> list[str]:
+        """Reads the links of the search results from the cache, if they were discovered recently.
+
+        Returns:
+            list[str]: The links of the Tiktok videos, `None` if they have to be discovered with the browser.
+        """
+        if self.cache is None or self.search_url is None:
+            return None
+        
+        cached = self.cache.get(self.search_url)
+        if cached is None or cached.is_stale:
+            return None
+        
+        return json.loads(cached.content)
+    
+    def _get_tiktok_links(self) -> Iterator[str]:
+        """Discovers the links of the Tiktok videos in the search results, reading only the links which were loaded since the last batch.
+        
+        With a checkpoint, the finished links are skipped and a completed discovery is not repeated: the unfinished links of the
+        previous run are yielded instead.
+
+        Yields:
+            str: The link of a Tiktok video.
+
+        Raises:
+            NoElementsFound: if no elements are found using the XPATH specified in `search.ContainerItem.TIKTOK_VIDEOS`.
+        """
+        if self.checkpoint and self.checkpoint.is_discovered():
+            logging.info(f"Resuming from checkpoint: {self.checkpoint.summary()}")
+            yield from self.checkpoint.frontier()
+            return
+        
+        discovered = []
+        for tiktok_links in self._iter_link_batches():
+            discovered += tiktok_links
+            if self.checkpoint:
+                self.checkpoint.add_links(tiktok_links)
+                tiktok_links = [tiktok_link for tiktok_link in tiktok_links if self.checkpoint.is_pending(tiktok_link)]
+            yield from tiktok_links
+        
+        if not discovered:
+            raise NoElementsFound(f"No elements found from given XPATH: {search.ContainerItem.TIKTOK_VIDEOS}")
+        if self.cache is not None and self._cached_links is None:
+            self.cache.put(self.search_url, json.dumps(discovered))
+        if self.checkpoint:
+            self.checkpoint.mark_discovered()
+    
+    def _iter_link_batches(self) -> Iterator[list[str]]:
+        """Yields the links of the search results batch by batch, from the cache or else from the browser.
+
+        Yields:
+            list[str]: The links of the Tiktok videos loaded by one batch.
+        """
+        if self._cached_links is not None:
+            logging.info(f"Using {len(self._cached_links)} cached link(s) of the search results")
+            yield self._cached_links
+            return
+        
+        self._wait_for_captcha()
+        loader = self._load_tiktok_videos()
+        for start, stop in loader:
+            yield loader.attributes("href", start, stop)
     
     def _get_root(self, url: str) -> WebElement:
         logging.info(f"Loading: {url}")
-        self.driver.get(url)
+        with instrumentation.timer("driver.get"):
+            self.driver.get(url)
         root = self.driver.find_element(By.XPATH, search.Root.ROOT)
         
         return root
     
-    def _load_tiktok_videos(self) -> None:   
-        """Loads TikTok videos by scrolling and clicking the 'Load More' button.
+    def _load_tiktok_videos(self) -> IncrementalLoader:
+        """Loads TikTok videos incrementally by scrolling and clicking the 'Load More' button.
     
-        The function will keep scrolling and loading more TikTok videos until it has reached the limit specified in the `self.limit` attribute. 
-        If no elements are found using the XPATH specified in `search.ContainerItem.TIKTOK_VIDEOS`, a `NoElementsFound` exception is raised.
+        The loader will keep scrolling and loading more TikTok videos until it has reached the limit specified in the `self.limit` attribute,
+        or until the 'Load More' button disappears.
+
+        Returns:
+            IncrementalLoader: Yields the `start` and `stop` index of the newly loaded elements in `search.ContainerItem.TIKTOK_VIDEOS`.
         """
-        tiktok_links = []
-        while len(tiktok_links) < self.limit:
+        def _load_more() -> bool:
             logging.info("Scrolling...")
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                load_more_button = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, search.ContainerItem.LOAD_MORE_BUTTON))
+                )
+            except TimeoutException:
+                return False
             
-            tiktok_links = tiktok_links + self.root.find_elements(By.XPATH, search.ContainerItem.TIKTOK_VIDEOS)
-            if len(tiktok_links) == 0:
-                raise NoElementsFound(f"No elements found from given XPATH: {search.ContainerItem.TIKTOK_VIDEOS}")
-            
-            logging.info(f"Element count: {len(tiktok_links)}")
-            load_more_button = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, search.ContainerItem.LOAD_MORE_BUTTON))
-            )
             load_more_button.click()
-            time.sleep(Config.CRAWL_SCROLL_PAUSE_TIME)
+            return True
+        
+        return IncrementalLoader(self.driver, search.ContainerItem.TIKTOK_VIDEOS, self.limit, _load_more, wait=self.wait)
             
     def _wait_for_captcha(self):
-        """Waits for the user to solve a captcha, if present.
+        """Waits for the user to solve a captcha, if present. The page is polled until either the search results or a captcha
+        show up, so a page without captcha is not delayed.
         """
+        def _settled() -> bool:
+            return detect_captcha(self.driver) or bool(self.driver.find_elements(By.XPATH, search.ContainerItem.TIKTOK_VIDEOS))
+        
+        self.wait.until(_settled, name="results")
+        if not detect_captcha(self.driver):
+            return
+        
         try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, search.ContainerItem.CAPTCHA))
-            )
-            
             logging.warning("Process will timeout in 60 seconds if captcha is not solved.")
             logging.warning("Waiting for user to solve captcha...")
             
@@ -108,7 +457,10 @@ class SearchCrawler(Crawler):
             )
             
             logging.info("Captcha Solved. Proceeding to crawl...")
-            time.sleep(5)
+            self.wait.until(
+                lambda: self.driver.find_elements(By.XPATH, search.ContainerItem.TIKTOK_VIDEOS),
+                name="captcha"
+            )
         except TimeoutException:
             raise CaptchaTimeoutException("Captcha needs to be solved within 60 seconds")
 
@@ -173,17 +525,7 @@ class SearchCrawler(Crawler):
             MediaNotFoundException: if the crawler was unable to download the Tiktok video.
         """
         media_container = item_container.find_element(By.XPATH, search.Media.CONTAINER)
-        try:
-            link = WebDriverWait(media_container, 10).until(
-                EC.presence_of_element_located((By.XPATH, f"{search.Media.LINK}|{search.Media.LINK_ALT}"))
-            ).get_attribute("src")
-        except TimeoutException:
-            try:
-                link = WebDriverWait(media_container, 10).until(
-                    EC.presence_of_element_located((By.XPATH, f"{search.Media.LINK}|{search.Media.LINK_ALT}"))
-                ).get_attribute("src")
-            except TimeoutException:  
-                raise MediaNotFoundException("Unable to find Media")
+        link = self._wait_for_media(media_container, f"{search.Media.LINK}|{search.Media.LINK_ALT}")
         
         media = Media(
             link=link,
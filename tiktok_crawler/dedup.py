@@ -0,0 +1,131 @@
+from tiktok_crawler.config import Config
+
+import datetime
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+
+VIDEO_ID_PATTERN = re.compile(r"/video/(\d+)")
+
+def video_key(url: str) -> str:
+    """Parses the stable id of a Tiktok video from the link of its page, e.g. `https://www.tiktok.com/@user/video/7182437371232209690`.
+
+    Args:
+        url (str): The link of the page of the Tiktok video.
+
+    Returns:
+        str: The id of the Tiktok video, `None` if the link does not contain one.
+    """
+    match = VIDEO_ID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+def stable_id(tiktok) -> str:
+    """Returns an id of a Tiktok video which stays the same across runs, unlike the Selenium `element.id`.
+
+    The id parsed from `tiktok.url` is used when available. Otherwise the id is derived from the author, caption and music.
+
+    Args:
+        tiktok (Tiktok): A `tiktok_crawler.entities.Tiktok` instance.
+
+    Returns:
+        str: The stable id of the Tiktok video.
+    """
+    key = video_key(tiktok.url)
+    if key:
+        return key
+
+    digest = hashlib.sha1(
+        "\n".join([tiktok.author.link, tiktok.caption.text, tiktok.music.link if tiktok.music else ""]).encode()
+    ).hexdigest()[:16]
+    return f"{tiktok.author.uniqueid}-{digest}"
+
+class BloomFilter:
+    """A fixed size, in-memory set which answers "definitely not seen" without false negatives.
+
+    Args:
+        capacity (int): The expected number of keys.
+        error_rate (float): The false positive rate at `capacity` keys.
+    """
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+class SeenIndex:
+    """An on-disk index of the Tiktok videos crawled by previous runs, fronted by a `BloomFilter` so that the lookup of a new video
+    never touches the disk.
+
+    Args:
+        path (str): The path of the SQLite database.
+        capacity (int): The expected number of videos, used to size the `BloomFilter`.
+        error_rate (float): The false positive rate of the `BloomFilter`. False positives are resolved against the database.
+    """
+    def __init__(
+        self,
+        path: str,
+        capacity: int = Config.DEDUP_CAPACITY,
+        error_rate: float = Config.DEDUP_ERROR_RATE
+    ) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, url TEXT, first_seen TEXT)")
+        self._bloom = BloomFilter(capacity, error_rate)
+        for key, in self._connection.execute("SELECT key FROM seen"):
+            self._bloom.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        if key is None or key not in self._bloom:
+            return False
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, key: str, url: str = None) -> None:
+        """Records a Tiktok video as seen.
+
+        Args:
+            key (str): The stable id of the Tiktok video, see `stable_id()`.
+            url (str): The link of the page of the Tiktok video, if known.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO seen (key, url, first_seen) VALUES (?, ?, ?)",
+                (key, url, datetime.datetime.now().isoformat())
+            )
+            self._bloom.add(key)
+
+    def urls(self) -> list[str]:
+        """Lists the links of the pages of the Tiktok videos seen so far, e.g. to refresh their metrics, see `tiktok_crawler.refresh`.
+
+        Returns:
+            list[str]: The links which were recorded with `add()`.
+        """
+        with self._lock:
+            return [url for url, in self._connection.execute("SELECT url FROM seen WHERE url IS NOT NULL")]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
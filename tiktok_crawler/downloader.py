@@ -0,0 +1,178 @@
+from requests.adapters import HTTPAdapter
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import os
+import requests
+import threading
+import time
+from urllib.parse import urlparse
+
+class HostRateLimiter:
+    """Spaces out the requests sent to the same host so that at most `rate` requests per second are started.
+
+    The budget can be shared between processes by passing the `state` and `lock` of a `multiprocessing.Manager`,
+    see `tiktok_crawler.coordinator.ShardCoordinator`.
+
+    Args:
+        rate (float): The maximum number of requests per second per host. No limit if `None` or 0.
+        state (dict): The time at which the next request may start, per host. Defaults to a local dictionary.
+        lock (Lock): The lock which guards `state`. Defaults to a local `threading.Lock`.
+    """
+    def __init__(self, rate: float, state: dict = None, lock = None) -> None:
+        self.interval = 1 / rate if rate else 0
+        self._next = state if state is not None else {}
+        self._lock = lock or threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+
+        if start > now:
+            time.sleep(start - now)
+
+class Downloader:
+    """Downloads Tiktok videos concurrently over a shared, pooled HTTP session.
+
+    Videos are streamed to disk in chunks so memory use does not depend on the size of the video. Partial downloads are kept
+    in a `.part` file and resumed with an HTTP `Range` request.
+
+    Args:
+        workers (int): The number of concurrent downloads.
+        rate (float): The maximum number of requests per second per host. No limit if `None` or 0.
+        chunk_size (int): The number of bytes written to disk at a time.
+        timeout (float): The connect and read timeout of every request in seconds.
+        session (requests.Session): The HTTP session to use. A pooled session is created if not given.
+        limiter (HostRateLimiter): The rate limiter to share with other downloaders or crawlers. Created from `rate` if not given.
+        max_pending (int): The number of submitted Tiktok videos which may wait for a free worker. `submit()` blocks beyond that,
+            so a crawl which extracts faster than it downloads does not queue up videos whose signed media links expire.
+    """
+    def __init__(
+        self,
+        workers:int = Config.DOWNLOAD_WORKERS,
+        rate:float = Config.DOWNLOAD_RATE_LIMIT,
+        chunk_size:int = Config.DOWNLOAD_CHUNK_SIZE,
+        timeout:float = Config.DOWNLOAD_TIMEOUT,
+        session:requests.Session = None,
+        limiter:HostRateLimiter = None,
+        max_pending:int = Config.DOWNLOAD_MAX_PENDING
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or self._create_session(workers)
+        self._limiter = limiter or HostRateLimiter(rate)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="downloader")
+        self._pending = threading.BoundedSemaphore(workers + max_pending)
+
+    def download(self, url: str, file_path: str) -> str:
+        """Streams `url` to `file_path`, resuming a previous partial download if there is one.
+
+        Args:
+            url (str): The link of the video.
+            file_path (str): The destination of the video.
+
+        Returns:
+            str: Returns `file_path`.
+
+        Raises:
+            requests.HTTPError: if the server responds with an error status.
+        """
+        if os.path.exists(file_path):
+            logging.info(f"Already downloaded: {file_path}")
+            return file_path
+
+        part_path = f"{file_path}.part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with instrumentation.timer("download.rate_limit"):
+            self._limiter.wait(url)
+        with instrumentation.timer("download.transfer"), self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                logging.info(f"Download already complete: {part_path}")
+            else:
+                response.raise_for_status()
+                mode = "ab" if offset and response.status_code == 206 else "wb"
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        file.write(chunk)
+                        instrumentation.count("download.bytes", len(chunk))
+
+        os.replace(part_path, file_path)
+        return file_path
+
+    def submit(self, tiktok, path: str = "./", checkpoint = None, sink = None, seen = None) -> Future:
+        """Schedules `tiktok.save()` on the worker pool of the downloader, waiting while `max_pending` Tiktok videos are queued.
+
+        Args:
+            tiktok (Tiktok): The `tiktok_crawler.entities.Tiktok` to save.
+            path (str): The directory where the metadata and video are saved.
+            checkpoint (CheckpointStore): The `tiktok_crawler.checkpoint.CheckpointStore` which records the save status.
+            sink (Sink): A `tiktok_crawler.sink.Sink` which receives the metadata instead of a json file per video.
+            seen (SeenIndex): The `tiktok_crawler.dedup.SeenIndex` which records the Tiktok video once it is saved.
+
+        Returns:
+            Future: Resolves once the Tiktok video is saved.
+        """
+        with instrumentation.timer("download.backpressure"):
+            self._pending.acquire()
+        try:
+            future = self._executor.submit(tiktok.save, path, self, checkpoint, sink, seen)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def close(self, wait: bool = True) -> None:
+        """Shuts down the worker pool and closes the HTTP session.
+
+        Args:
+            wait (bool): Waits for the pending downloads to finish if `True`.
+        """
+        self._executor.shutdown(wait=wait)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _done(self, future: Future) -> None:
+        self._pending.release()
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"Download failed: {future.exception()}")
+
+    @staticmethod
+    def _create_session(workers: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=Config.DOWNLOAD_RETRIES)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+_default_downloader = None
+_default_lock = threading.Lock()
+
+def get_downloader() -> Downloader:
+    """Returns the process wide `Downloader` which shares its HTTP session between all the Tiktok videos saved without an explicit downloader.
+
+    Returns:
+        Downloader: The shared `Downloader` instance.
+    """
+    global _default_downloader
+    with _default_lock:
+        if _default_downloader is None:
+            _default_downloader = Downloader()
+        return _default_downloader
@@ -1,26 +1,342 @@
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.remote.webdriver import WebDriver
 
 from tiktok_crawler.config import Config
 
+from contextlib import contextmanager
+import atexit
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+_UNRESOLVED = object()
+_driver_path = _UNRESOLVED
+_driver_lock = threading.Lock()
+
+def resolve_driver_path() -> str:
+    """Resolves the chromedriver binary offline first, so that a process start does not need the network.
+
+    The pinned `Config.CHROMEDRIVER_PATH` wins. Otherwise the path cached in `Config.DRIVER_CACHE_PATH` is reused until it is older
+    than `Config.DRIVER_CACHE_TTL`, and only then `webdriver_manager` is asked again. If `webdriver_manager` fails, e.g. without
+    network, a stale cached path is still used. The result, including the fallback to Selenium Manager, is memoized for the
+    lifetime of the process.
+
+    Returns:
+        str: The path of the chromedriver binary, `None` to let Selenium Manager resolve it.
+    """
+    global _driver_path
+    with _driver_lock:
+        if _driver_path is _UNRESOLVED:
+            _driver_path = _resolve_driver_path()
+        return _driver_path
+
+def _resolve_driver_path() -> str:
+    if Config.CHROMEDRIVER_PATH:
+        return Config.CHROMEDRIVER_PATH
+
+    cached = None
+    try:
+        with open(Config.DRIVER_CACHE_PATH) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        pass
+
+    if cached and os.path.exists(cached["path"]):
+        if time.time() - cached["resolved_at"] < Config.DRIVER_CACHE_TTL:
+            return cached["path"]
+    else:
+        cached = None
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    except Exception as e:
+        if cached:
+            logging.warning(f"Unable to update chromedriver, using the cached one: {e}")
+            return cached["path"]
+        logging.warning(f"Unable to resolve chromedriver, falling back to Selenium Manager: {e}")
+        return None
+
+    os.makedirs(os.path.dirname(Config.DRIVER_CACHE_PATH), exist_ok=True)
+    with open(Config.DRIVER_CACHE_PATH, "w") as file:
+        json.dump(dict(path=path, resolved_at=time.time()), file)
+    return path
+
+def copy_profile(template: str) -> str:
+    """Copies a warmed profile template (see `warm_profile()`) into a private user data directory, since Chrome locks the
+    directory of a running instance. The copy is removed when the process exits.
+
+    Args:
+        template (str): The user data directory to copy.
+
+    Returns:
+        str: The path of the copy.
+    """
+    profile = tempfile.mkdtemp(prefix="tiktok-crawler-profile-")
+    shutil.copytree(template, profile, dirs_exist_ok=True, ignore=shutil.ignore_patterns("Singleton*", "*.lock"))
+    atexit.register(shutil.rmtree, profile, ignore_errors=True)
+    return profile
+
+def warm_profile(path: str = None, url: str = Config.CRAWL_ROOT_URL, *args) -> str:
+    """Creates a profile template by visiting `url` once, so that later sessions start with a warm cache, cookies and
+    first-run state instead of a fresh profile.
+
+    Args:
+        path (str): The user data directory of the template, `Config.CHROME_PROFILE_TEMPLATE` by default.
+        url (str): The page to warm the profile with.
+        args (str): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+
+    Returns:
+        str: Returns `path`.
+    """
+    path = path or Config.CHROME_PROFILE_TEMPLATE
+    os.makedirs(path, exist_ok=True)
+    driver = create_driver(*args, f"--user-data-dir={os.path.abspath(path)}", profile=False)
+    try:
+        driver.get(url)
+    finally:
+        driver.quit()
+    return path
+
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+LEAN_ARGS = ["--autoplay-policy=user-gesture-required", "--mute-audio", "--disable-background-networking"]
+LEAN_SCRIPT = """
+HTMLMediaElement.prototype.play = function () { return Promise.resolve(); };
+"""
+
+def make_lean(driver: WebDriver, blocked_urls: tuple = Config.LEAN_BLOCKED_URLS) -> WebDriver:
+    """Blocks the images, media streams, fonts and trackers of every page through the Chrome DevTools Protocol, and stops the
+    videos from playing. The pages keep their markup, so the `src` attributes of the videos are still read from the DOM, but the
+    browser never downloads or decodes them.
+
+    Args:
+        driver (WebDriver): A Selenium web driver of a Chrome instance.
+        blocked_urls (tuple): The url patterns to block, `*` being a wildcard.
+
+    Returns:
+        WebDriver: Returns `driver`.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LEAN_SCRIPT})
+    return driver
+
+def create_driver(*args, capture_network: bool = False, profile: bool = True, lean: bool = False) -> WebDriver:
+    """Launches a new Chrome instance.
+
+    Args:
+        args (str): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+        capture_network (bool): Enables the performance log read by `tiktok_crawler.network.MediaCapture`.
+        profile (bool): Starts from a copy of `Config.CHROME_PROFILE_TEMPLATE`, if it exists.
+        lean (bool): Launches a browser for metadata-only crawls, which does not load images, media, fonts and trackers and
+            does not play the videos, see `make_lean()`.
+
+    Returns:
+        WebDriver: Returns a new Selenium web driver.
+    """
+    options = Options()
+    for arg in args:
+        options.add_argument(arg)
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if profile and Config.CHROME_PROFILE_TEMPLATE and os.path.isdir(Config.CHROME_PROFILE_TEMPLATE):
+        options.add_argument(f"--user-data-dir={copy_profile(Config.CHROME_PROFILE_TEMPLATE)}")
+    if lean:
+        for arg in LEAN_ARGS:
+            options.add_argument(arg)
+        options.add_experimental_option("prefs", LEAN_PREFS)
+
+    path = resolve_driver_path()
+    service = Service(path) if path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    return make_lean(driver) if lean else driver
+
 class _Singleton(type):
     _instances = {}
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
             cls._instances[cls] = super(_Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
-    
+
 class Driver(metaclass=_Singleton):
-    def __init__(self, *args) -> None:
-        options = Options()
-        for arg in args:
-            options.add_argument(arg)
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    def __init__(self, *args, capture_network: bool = False, lean: bool = False) -> None:
+        self.driver = create_driver(*args, capture_network=capture_network, lean=lean)
 
     def get_driver(self):
         return self.driver
-        
 
+class DriverPool:
+    """Owns up to `size` reusable browser sessions which can be checked out by concurrent workers.
+
+    Sessions are launched lazily, health checked on checkout and recycled after `max_pages` checkouts.
+
+    Args:
+        size (int): The maximum number of browser sessions.
+        driver_options (list): Implements the chromium command line switches. See here: https://peter.sh/experiments/chromium-command-line-switches/
+        max_pages (int): The number of checkouts after which a session is quit and replaced by a fresh one.
+        timeout (float): The maximum number of seconds `acquire()` waits for a free session.
+        capture_network (bool): Enables the performance log read by `tiktok_crawler.network.MediaCapture`.
+        lean (bool): Launches lean browser sessions for metadata-only crawls, see `make_lean()`.
+    """
+    def __init__(
+        self,
+        size:int = Config.CRAWL_POOL_SIZE,
+        driver_options:list = None,
+        max_pages:int = Config.CRAWL_POOL_MAX_PAGES,
+        timeout:float = Config.CRAWL_POOL_TIMEOUT,
+        capture_network:bool = False,
+        lean:bool = False
+    ) -> None:
+        self.size = size
+        self.options = driver_options if isinstance(driver_options, list) else []
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.capture_network = capture_network
+        self.lean = lean
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def acquire(self) -> WebDriver:
+        """Checks out a healthy browser session, launching one if no idle session is available.
+
+        Returns:
+            WebDriver: Returns a Selenium web driver which is exclusively owned by the caller until `release()`.
+
+        Raises:
+            TimeoutError: if no session is released within `self.timeout` seconds.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No browser session was released within {self.timeout} seconds")
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._launch()
+
+                if self._is_healthy(driver):
+                    return driver
+
+                logging.warning("Replacing unhealthy browser session")
+                self._quit(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver: WebDriver) -> None:
+        """Returns a browser session to the pool. The session is quit if it has reached `self.max_pages` checkouts.
+
+        Args:
+            driver (WebDriver): A Selenium web driver checked out with `acquire()`.
+        """
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+            recycle = self._pages[driver] >= self.max_pages
+
+        if recycle:
+            logging.info("Recycling browser session")
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+        self._slots.release()
+
+    def discard(self, driver: WebDriver, parked: bool = False) -> None:
+        """Quits a checked out browser session instead of returning it, e.g. because it was challenged. A fresh session is
+        launched on a later `acquire()`.
+
+        Args:
+            driver (WebDriver): A Selenium web driver checked out with `acquire()`.
+            parked (bool): `True` if the session was taken out of rotation with `park()` and no longer holds a slot.
+        """
+        self._quit(driver)
+        if not parked:
+            self._slots.release()
+
+    def park(self, driver: WebDriver) -> None:
+        """Takes a checked out browser session out of rotation, e.g. while it cools down after a captcha, and frees its slot,
+        so other workers can check out or launch another session meanwhile.
+
+        Args:
+            driver (WebDriver): A Selenium web driver checked out with `acquire()`.
+        """
+        self._slots.release()
+
+    def unpark(self, driver: WebDriver) -> None:
+        """Returns a parked browser session to the idle sessions. It is quit instead if the pool already has `self.size` idle
+        sessions, e.g. because fresh sessions were launched while it was parked.
+
+        Args:
+            driver (WebDriver): A Selenium web driver taken out of rotation with `park()`.
+        """
+        if self._idle.qsize() >= self.size:
+            logging.info("Quitting a parked browser session, the pool is full")
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def session(self):
+        """Checks out a browser session for the duration of a `with` block.
+
+        Yields:
+            WebDriver: A Selenium web driver checked out with `acquire()`.
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Quits every idle browser session. The pool stays usable and launches new sessions on the next `acquire()`.
+        """
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _launch(self) -> WebDriver:
+        logging.info("Launching browser session")
+        driver = create_driver(*self.options, capture_network=self.capture_network, lean=self.lean)
+        with self._lock:
+            self._pages[driver] = 0
+        return driver
+
+    def _quit(self, driver: WebDriver) -> None:
+        with self._lock:
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logging.warning(e)
+
+    @staticmethod
+    def _is_healthy(driver: WebDriver) -> bool:
+        try:
+            driver.find_element(By.XPATH, "/html")
+            return True
+        except WebDriverException:
+            return False
@@ -1,12 +1,36 @@
-from selenium.webdriver.remote.webelement import WebElement
+from tiktok_crawler import instrumentation
+from tiktok_crawler.downloader import get_downloader
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 import datetime
 import json
 import logging
 import os
-import requests
+import re
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
+COUNT_SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+COUNT_PATTERN = re.compile(r"^([0-9]+(?:\.[0-9]+)?)([KMB]?)$")
+
+def parse_count(text: str) -> int:
+    """Parses a count as displayed by Tiktok, e.g. `1.2M`, `34.5K` or `1,234`, into an integer.
+
+    Args:
+        text (str): The raw count.
+
+    Returns:
+        int: The parsed count, `None` if the text is not a count.
+    """
+    match = COUNT_PATTERN.match((text or "").replace(",", "").strip().upper())
+    if not match:
+        return None
+    
+    number, suffix = match.groups()
+    return round(float(number) * COUNT_SUFFIXES.get(suffix, 1))
 
 class TiktokEntity(ABC):
     @abstractmethod
@@ -36,7 +60,7 @@ class Author(TiktokEntity):
     avatar: str
     link: str
     nickname: str
-    element: WebElement
+    element: "WebElement"
     
     def __post_init__(self):
         self.uniqueid = self.uniqueid.strip()
@@ -71,7 +95,7 @@ class Tag(TiktokEntity):
     
     link: str
     text: str
-    element: WebElement
+    element: "WebElement"
     
     def __post_init__(self):
         self.link = self.link.strip()
@@ -101,7 +125,7 @@ class Caption(TiktokEntity):
     """
     text: str
     tags: list[Tag]
-    element: WebElement
+    element: "WebElement"
 
     def __post_init__(self):
         self.text = self.text.strip()
@@ -127,7 +151,7 @@ class Music(TiktokEntity):
     """
     title: str
     link: str
-    element: WebElement
+    element: "WebElement"
     
     def __post_init__(self):
         self.title = self.title.strip()
@@ -156,7 +180,7 @@ class Media(TiktokEntity):
         element (WebElement): The Selenium web element which contains the details of the video. 
     """
     link: str
-    element: WebElement
+    element: "WebElement"
     
     def __post_init__(self):
         self.link = self.link.strip()
@@ -180,17 +204,26 @@ class Metrics(TiktokEntity):
         shares (str): The raw number of shares extracted.
         element (WebElement): The Selenium web element which contains the metrics.
         as_of (str): The date time when the metrics are extracted in iso 8601 format. Defaults to the current date time.
+        likes_count (int): The number of likes parsed from `likes`, `None` if it could not be parsed.
+        comments_count (int): The number of comments parsed from `comments`, `None` if it could not be parsed.
+        shares_count (int): The number of shares parsed from `shares`, `None` if it could not be parsed.
     """
     likes: str
     comments: str
     shares: str
-    element: WebElement
-    as_of: str = datetime.datetime.now().isoformat()
+    element: "WebElement"
+    as_of: str = field(default_factory=lambda: datetime.datetime.now().isoformat())
+    likes_count: int = field(init=False)
+    comments_count: int = field(init=False)
+    shares_count: int = field(init=False)
     
     def __post_init__(self):
         self.likes = self.likes.strip()
         self.comments = self.comments.strip()
         self.shares = self.shares.strip()
+        self.likes_count = parse_count(self.likes)
+        self.comments_count = parse_count(self.comments)
+        self.shares_count = parse_count(self.shares)
     
     def __repr__(self):
         return f"Metrics(likes={self.likes}, comments={self.comments},shares={self.shares}, as_of={self.as_of} )"
@@ -200,6 +233,9 @@ class Metrics(TiktokEntity):
             likes=self.likes,
             comments=self.comments,
             shares=self.shares,
+            likes_count=self.likes_count,
+            comments_count=self.comments_count,
+            shares_count=self.shares_count,
             as_of=self.as_of,
             
         )
@@ -209,7 +245,7 @@ class Tiktok:
     """Model class representation of the Tiktok video to be extracted. This class utilizes all the other `entities` dataclasses.
 
     Args:
-        id (str): Unique internal id of the Tiktok video.
+        id (str): Unique id of the Tiktok video. Crawlers assign the stable id from `tiktok_crawler.dedup.stable_id()`.
         author (Author): `entities.Author` instance of the Tiktok video.
         caption (Caption): `entities.Caption` instance of the Tiktok video.
         music (Music): `entities.Music` instance of the Tiktok video.
@@ -217,6 +253,7 @@ class Tiktok:
         metrics (Metrics): `entities.Metrics` instance of the Tiktok video.
         element (WebElement): The Selenium web element which contains the Tiktok video.
         status (str): A tag to signify if the scrape was sucessful. 
+        url (str): The link of the page of the Tiktok video, if known.
     """
     
     id: str
@@ -225,27 +262,21 @@ class Tiktok:
     music: Music
     media: Media
     metrics: Metrics
-    element: WebElement
+    element: "WebElement"
     status: str = None
+    url: str = None
     
-    def save(self, path:str = "./"):
-        def _save_metadata(path):
-            file_path = os.path.join(path, f"{self.id}.json")
-            with open(file_path, 'w+') as file:
-                json.dump(self.to_dict(), file)
-                
-        def _save_video(path):
-            file_path = os.path.join(path, f"{self.id}.mp4")
-            response = requests.get(self.media.link)
-            with open(file_path, "wb") as file:
-                file.write(response.content)
-        
-        if self.media.link:
-            logging.info("Saving Tiktok...")
-            _save_metadata(path)
-            _save_video(path)
-        else:
-            logging.error("Media is NULL")
+    def save(self, path:str = "./", downloader = None, checkpoint = None, sink = None, seen = None):
+        """Saves the metadata as a json file and the video as an mp4 file, both named after `self.id`.
+
+        Args:
+            path (str): The directory where the metadata and video are saved.
+            downloader (Downloader): The `tiktok_crawler.downloader.Downloader` which streams the video to disk. Defaults to the shared downloader.
+            checkpoint (CheckpointStore): The `tiktok_crawler.checkpoint.CheckpointStore` which records the save status of `self.url`.
+            sink (Sink): A `tiktok_crawler.sink.Sink` which receives the metadata instead of a json file per video.
+            seen (SeenIndex): The `tiktok_crawler.dedup.SeenIndex` which records the Tiktok video once it is saved.
+        """
+        save_tiktok(self, path, downloader, checkpoint, sink, seen)
     
     def to_dict(self):
         return dict(
@@ -255,7 +286,8 @@ class Tiktok:
             Music=self.music.to_dict(),
             Media=self.media.to_dict(),
             Metrics=self.metrics.to_dict(),
-            Status=self.status
+            Status=self.status,
+            Url=self.url
         )
 
     def __eq__(self, obj) -> bool:
@@ -263,3 +295,51 @@ class Tiktok:
     
     def __repr__(self) -> str:
         return f"Tiktok(id={self.id}, {self.status}, {self.author}, {self.caption}, {self.music}, {self.media}, {self.metrics})"
+
+@instrumentation.timed("tiktok.save")
+def save_tiktok(tiktok, path:str = "./", downloader = None, checkpoint = None, sink = None, seen = None):
+    """Saves the metadata as a json file and the video as an mp4 file, both named after `tiktok.id`.
+
+    Args:
+        tiktok (Tiktok): A `Tiktok` or a `tiktok_crawler.records.TiktokRecord`.
+        path (str): The directory where the metadata and video are saved.
+        downloader (Downloader): The `tiktok_crawler.downloader.Downloader` which streams the video to disk. Defaults to the shared downloader.
+        checkpoint (CheckpointStore): The `tiktok_crawler.checkpoint.CheckpointStore` which records the save status of `tiktok.url`.
+        sink (Sink): A `tiktok_crawler.sink.Sink` which receives the metadata instead of a json file per video.
+        seen (SeenIndex): The `tiktok_crawler.dedup.SeenIndex` which records the Tiktok video once it is saved, so a failed save
+            is retried by the next run.
+    """
+    def _save_metadata(path):
+        if sink is not None:
+            sink.write(tiktok)
+            return
+        
+        file_path = os.path.join(path, f"{tiktok.id}.json")
+        with open(file_path, 'w+') as file:
+            json.dump(tiktok.to_dict(), file)
+            
+    def _save_video(path):
+        file_path = os.path.join(path, f"{tiktok.id}.mp4")
+        (downloader or get_downloader()).download(tiktok.media.link, file_path)
+    
+    if tiktok.media.link:
+        logging.info("Saving Tiktok...")
+        try:
+            with instrumentation.timer("tiktok.save_metadata"):
+                _save_metadata(path)
+            with instrumentation.timer("tiktok.save_video"):
+                _save_video(path)
+        except Exception as e:
+            if checkpoint and tiktok.url:
+                checkpoint.mark_failed(tiktok.url, e)
+            raise
+        
+        if checkpoint and tiktok.url:
+            checkpoint.mark_saved(tiktok.url)
+        if seen is not None:
+            seen.add(tiktok.id, tiktok.url)
+    else:
+        logging.error("Media is NULL")
+        instrumentation.count("tiktoks.media_null")
+        if checkpoint and tiktok.url:
+            checkpoint.mark_failed(tiktok.url, "Media is NULL")
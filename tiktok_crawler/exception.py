@@ -1,4 +1,7 @@
 
+class CaptchaDetectedException(Exception):
+    ...
+
 class CaptchaTimeoutException(Exception):
     ...
 
@@ -0,0 +1,135 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tiktok_crawler.entities import Author, Caption, Media, Metrics, Music, Tag, Tiktok
+
+from abc import ABC, abstractmethod
+import uuid
+
+VIDEO_LINK = """descendant-or-self::*[contains(@href, "/video/")]"""
+
+def compile_spec(xpath) -> dict:
+    """Compiles the XPath classes of a `tiktok_crawler.xpath` module into a plain, JSON serializable dictionary.
+
+    The same specification is shared by every extractor backend so that the `xpath` modules remain the single source of truth.
+
+    Args:
+        xpath (module): Either `tiktok_crawler.xpath.foryoupage` or `tiktok_crawler.xpath.search`.
+
+    Returns:
+        dict: The XPaths of every field of a Tiktok video grouped by entity, and the XPath of the link to the page of the Tiktok
+        video under `url`.
+    """
+    return dict(
+        url=VIDEO_LINK,
+        author=dict(
+            uniqueid=xpath.Author.UNIQUEID,
+            avatar=xpath.Author.AVATAR,
+            link=xpath.Author.LINK,
+            nickname=xpath.Author.NICKNAME,
+        ),
+        caption=dict(
+            container=xpath.Caption.CONTAINER,
+            text=xpath.Caption.TEXT,
+            tags=xpath.Caption.TAGS,
+        ),
+        tag=dict(
+            text=xpath.Tag.TEXT,
+        ),
+        media=dict(
+            container=xpath.Media.CONTAINER,
+            link=f"{xpath.Media.LINK}|{xpath.Media.LINK_ALT}",
+        ),
+        metrics=dict(
+            container=xpath.Metrics.CONTAINER,
+            likes=xpath.Metrics.LIKES,
+            comments=xpath.Metrics.COMMENTS,
+            shares=xpath.Metrics.SHARES,
+        ),
+        music=dict(
+            container=xpath.Music.CONTAINER,
+            title=xpath.Music.TITLE,
+            link=xpath.Music.LINK,
+        ),
+    )
+
+def build_tiktok(record: dict) -> Tiktok:
+    """Maps a record returned by an `Extractor` into the `tiktok_crawler.entities` dataclasses.
+
+    Args:
+        record (dict): A single record returned by `Extractor.extract()`.
+
+    Returns:
+        Tiktok: Returns a `tiktok_crawler.entities.Tiktok` instance.
+    """
+    element = record.get("element")
+    author = record["author"]
+    caption = record["caption"]
+    media = record["media"]
+    metrics = record["metrics"]
+    music = record["music"]
+
+    tiktok = Tiktok(
+        id=element.id if element is not None else str(uuid.uuid4()),
+        author=Author(
+            uniqueid=author["uniqueid"] or "",
+            avatar=author["avatar"] or "",
+            link=author["link"] or "",
+            nickname=author["nickname"] or "",
+            element=element
+        ),
+        caption=Caption(
+            text=caption["text"] or "",
+            tags=[
+                Tag(
+                    link=tag["link"] or "",
+                    text=tag["text"] or "",
+                    element=element
+                )
+                for tag in caption["tags"]
+            ],
+            element=element
+        ),
+        media=Media(
+            link=media["link"] or "",
+            element=element
+        ),
+        metrics=Metrics(
+            likes=metrics["likes"] or "",
+            comments=metrics["comments"] or "",
+            shares=metrics["shares"] or "",
+            element=element
+        ),
+        music=Music(
+            title=music["title"] or "",
+            link=music["link"] or "",
+            element=element
+        ),
+        element=element,
+        status=None if media["link"] else "MediaNotFoundException",
+        url=record.get("url")
+    )
+
+    return tiktok
+
+class Extractor(ABC):
+    """Base class of the extractor backends. An extractor evaluates the compiled `xpath` specification (see `compile_spec()`)
+    against every Tiktok video container matched by an XPath and returns one record per container.
+
+    A record is a dictionary with the keys `index`, `element`, `url`, `author`, `caption`, `media`, `metrics` and `music`, where
+    `url` is the link to the page of the Tiktok video, if the container has one. Missing fields are set to `None`.
+
+    Extractors which set `BATCH` to `True` work on a snapshot of the page and should be called once per loaded batch
+    rather than once per container. The others also accept the containers themselves, as Selenium web elements, instead of
+    the XPath, so a crawler which already holds the containers of a window does not make the browser match the whole page again.
+
+    Args:
+        xpath (module): Either `tiktok_crawler.xpath.foryoupage` or `tiktok_crawler.xpath.search`.
+    """
+    BATCH = False
+
+    def __init__(self, xpath) -> None:
+        self.spec = compile_spec(xpath)
+
+    @abstractmethod
+    def extract(self, driver: WebDriver, containers: str, start: int = 0, stop: int = None) -> list[dict]:
+        ...
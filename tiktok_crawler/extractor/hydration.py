@@ -0,0 +1,177 @@
+from lxml import html as lxml_html
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tiktok_crawler.dedup import video_key
+from tiktok_crawler.extractor import VIDEO_LINK, Extractor
+from tiktok_crawler.extractor.pagesource import PageSourceExtractor
+
+import json
+import logging
+from urllib.parse import quote
+
+TIKTOK_URL = "https://www.tiktok.com"
+STATE_SCRIPTS = """//script[@id="__UNIVERSAL_DATA_FOR_REHYDRATION__" or @id="SIGI_STATE" or @id="__NEXT_DATA__"]"""
+
+def find_items(state) -> list[dict]:
+    """Walks a hydration state and collects every item struct, i.e. every object with an `id`, an `author` and a `video` object.
+
+    Args:
+        state (dict): The parsed hydration JSON.
+
+    Returns:
+        list[dict]: The item structs in document order, without duplicates.
+    """
+    items, ids, stack = [], set(), [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "id" in node and "author" in node and isinstance(node.get("video"), dict):
+                if node["id"] not in ids:
+                    ids.add(node["id"])
+                    items.append(node)
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return items
+
+def parse_state(document) -> dict:
+    """Parses the hydration state embedded in a page.
+
+    Args:
+        document (HtmlElement): The page parsed with `lxml.html`.
+
+    Returns:
+        dict: The parsed hydration JSON, `None` if the page has none.
+    """
+    for script in document.xpath(STATE_SCRIPTS):
+        try:
+            return json.loads(script.text or "")
+        except ValueError as e:
+            logging.warning(f"Unable to parse the hydration state in #{script.get('id')}: {e}")
+    return None
+
+class HydrationExtractor(Extractor):
+    """Extracts the Tiktok videos from the JSON state embedded in the page for hydration (`__UNIVERSAL_DATA_FOR_REHYDRATION__`,
+    `SIGI_STATE` or `__NEXT_DATA__`), without evaluating any XPath against the rendered DOM.
+
+    The state is parsed once per call to `extract()` and holds every item of the page load, which makes the backend best suited
+    to extract a whole loaded batch at once. The state only covers the items of the initial page load: containers appended by
+    scrolling afterwards are extracted from the page source, see `tiktok_crawler.extractor.pagesource.PageSourceExtractor`.
+    Since the records are not bound to a live `WebElement`, the `element` key of every record is `None`.
+
+    Args:
+        xpath (module): Either `tiktok_crawler.xpath.foryoupage` or `tiktok_crawler.xpath.search`.
+    """
+    BATCH = True
+
+    def __init__(self, xpath) -> None:
+        super().__init__(xpath)
+        self.fallback = PageSourceExtractor(xpath)
+
+    def extract(self, driver: WebDriver, containers: str, start: int = 0, stop: int = None) -> list[dict]:
+        """Fetches the page source of the driver once and extracts the Tiktok videos from its hydration state.
+
+        Args:
+            driver (WebDriver): The Selenium web driver which holds the page.
+            containers (str): The XPath which matches the Tiktok video containers.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+
+        Returns:
+            list[dict]: One record per extracted container.
+        """
+        return self.extract_html(driver.page_source, containers, start, stop, base_url=driver.current_url)
+
+    def extract_html(self, page_source: str, containers: str, start: int = 0, stop: int = None, base_url: str = None) -> list[dict]:
+        """Extracts the Tiktok videos from the hydration state of a raw HTML document, e.g. a saved HTML fixture. No browser is needed.
+
+        Every container is matched to the item of the state with the id of the video it links to. On the page of a single Tiktok
+        video, a container without such a link is the video of the page. The containers which are not covered by the state are
+        extracted from the DOM of the same document. A document without any container, e.g. a page fetched over plain HTTP
+        before it was rendered, is extracted from the state alone, the item of the page first.
+
+        Args:
+            page_source (str): The HTML document.
+            containers (str): The XPath which matches the Tiktok video containers.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+            base_url (str): The url of the page.
+
+        Returns:
+            list[dict]: One record per extracted container.
+        """
+        document = lxml_html.fromstring(page_source)
+        state = parse_state(document)
+        if state is None:
+            logging.warning("No hydration state found, extracting from the page source")
+            return self.fallback.extract_html(page_source, containers, start, stop, base_url=base_url)
+
+        items = {str(item["id"]): item for item in find_items(state)}
+        key = video_key(base_url)
+        elements = document.xpath(containers)
+        if not elements:
+            ordered = sorted(items.values(), key=lambda item: str(item["id"]) != key)
+            records = [self._get_record(item, index, state) for index, item in enumerate(ordered[start:stop], start)]
+            logging.info(f"Extracted {len(records)} element(s) from the hydration state")
+            return records
+
+        records, matched = [], set()
+        for index, container in enumerate(elements[start:stop], start):
+            links = container.xpath(VIDEO_LINK)
+            item_key = video_key(links[0].get("href")) if links else key
+            if item_key in items and item_key not in matched:
+                matched.add(item_key)
+                records.append(self._get_record(items[item_key], index, state))
+            else:
+                records.append(self.fallback._get_record(container, index, base_url))
+
+        logging.info(f"Extracted {len(matched)} of {len(records)} element(s) from the hydration state")
+        return records
+
+    def _get_record(self, item: dict, index: int, state: dict) -> dict:
+        author = item.get("author")
+        if not isinstance(author, dict):
+            author = state.get("UserModule", {}).get("users", {}).get(author) or dict(uniqueId=author)
+        video = item.get("video") or {}
+        music = item.get("music") or {}
+        stats = item.get("stats") or {}
+        uniqueid = author.get("uniqueId")
+
+        def count(name: str) -> str:
+            return str(stats[name]) if stats.get(name) is not None else None
+
+        return dict(
+            index=index,
+            element=None,
+            url=f"{TIKTOK_URL}/@{uniqueid}/video/{item['id']}" if uniqueid else None,
+            author=dict(
+                uniqueid=uniqueid,
+                avatar=author.get("avatarThumb") or author.get("avatarMedium"),
+                link=f"{TIKTOK_URL}/@{uniqueid}" if uniqueid else None,
+                nickname=author.get("nickname"),
+            ),
+            caption=dict(
+                text=item.get("desc"),
+                tags=[
+                    dict(
+                        link=f"{TIKTOK_URL}/tag/{quote(extra['hashtagName'])}",
+                        text=f"#{extra['hashtagName']}",
+                    )
+                    for extra in item.get("textExtra") or []
+                    if extra.get("hashtagName")
+                ],
+            ),
+            media=dict(
+                link=video.get("playAddr") or video.get("downloadAddr"),
+            ),
+            metrics=dict(
+                likes=count("diggCount"),
+                comments=count("commentCount"),
+                shares=count("shareCount"),
+            ),
+            music=dict(
+                title=music.get("title"),
+                link=f"{TIKTOK_URL}/music/{quote((music.get('title') or '').replace(' ', '-'))}-{music['id']}" if music.get("id") else None,
+            ),
+        )
@@ -0,0 +1,109 @@
+from lxml import html as lxml_html
+from lxml.etree import _Element
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tiktok_crawler.extractor import Extractor
+
+import logging
+from urllib.parse import urljoin
+
+class PageSourceExtractor(Extractor):
+    """Extracts the Tiktok video containers from `driver.page_source` with lxml, in-process and without any WebDriver call per field.
+
+    The page source is fetched once per call to `extract()`, which makes the backend best suited to extract a whole loaded batch at once.
+    Since the records are not bound to a live `WebElement`, the `element` key of every record is `None`.
+
+    Args:
+        xpath (module): Either `tiktok_crawler.xpath.foryoupage` or `tiktok_crawler.xpath.search`.
+    """
+    BATCH = True
+
+    def extract(self, driver: WebDriver, containers: str, start: int = 0, stop: int = None) -> list[dict]:
+        """Fetches the page source of the driver once and extracts the Tiktok video containers from it.
+
+        Args:
+            driver (WebDriver): The Selenium web driver which holds the page.
+            containers (str): The XPath which matches the Tiktok video containers.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+
+        Returns:
+            list[dict]: One record per extracted container.
+        """
+        return self.extract_html(driver.page_source, containers, start, stop, base_url=driver.current_url)
+
+    def extract_html(self, page_source: str, containers: str, start: int = 0, stop: int = None, base_url: str = None) -> list[dict]:
+        """Extracts the Tiktok video containers from a raw HTML document, e.g. a saved HTML fixture. No browser is needed.
+
+        Args:
+            page_source (str): The HTML document.
+            containers (str): The XPath which matches the Tiktok video containers.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+            base_url (str): The url of the page. Relative `src` and `href` attributes are resolved against it.
+
+        Returns:
+            list[dict]: One record per extracted container.
+        """
+        document = lxml_html.fromstring(page_source)
+        records = [
+            self._get_record(container, index, base_url)
+            for index, container in enumerate(document.xpath(containers)[start:stop], start)
+        ]
+        logging.info(f"Extracted {len(records)} element(s) from the page source")
+        return records
+
+    def _get_record(self, container: _Element, index: int, base_url: str) -> dict:
+        def first(xpath: str, context: _Element) -> _Element:
+            if context is None:
+                return None
+            nodes = context.xpath(xpath)
+            return nodes[0] if nodes else None
+
+        def text(node: _Element) -> str:
+            return node.text_content() if node is not None else None
+
+        def attr(node: _Element, name: str) -> str:
+            if node is None or node.get(name) is None:
+                return None
+            return urljoin(base_url, node.get(name)) if base_url else node.get(name)
+
+        spec = self.spec
+        caption = first(spec["caption"]["container"], container)
+        media = first(spec["media"]["container"], container)
+        metrics = first(spec["metrics"]["container"], container)
+        music = first(spec["music"]["container"], container)
+
+        return dict(
+            index=index,
+            element=None,
+            url=attr(first(spec["url"], container), "href"),
+            author=dict(
+                uniqueid=text(first(spec["author"]["uniqueid"], container)),
+                avatar=attr(first(spec["author"]["avatar"], container), "src"),
+                link=attr(first(spec["author"]["link"], container), "href"),
+                nickname=text(first(spec["author"]["nickname"], container)),
+            ),
+            caption=dict(
+                text=text(first(spec["caption"]["text"], caption)),
+                tags=[
+                    dict(
+                        link=attr(tag, "href"),
+                        text=text(first(spec["tag"]["text"], tag)),
+                    )
+                    for tag in (caption.xpath(spec["caption"]["tags"]) if caption is not None else [])
+                ],
+            ),
+            media=dict(
+                link=attr(first(spec["media"]["link"], media), "src"),
+            ),
+            metrics=dict(
+                likes=text(first(spec["metrics"]["likes"], metrics)),
+                comments=text(first(spec["metrics"]["comments"], metrics)),
+                shares=text(first(spec["metrics"]["shares"], metrics)),
+            ),
+            music=dict(
+                title=text(first(spec["music"]["title"], music)),
+                link=attr(first(spec["music"]["link"], music), "href"),
+            ),
+        )
@@ -0,0 +1,99 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from tiktok_crawler.extractor import Extractor
+
+from typing import Union
+import logging
+
+EXTRACT_SCRIPT = """
+var spec = arguments[0], containers = arguments[1], start = arguments[2], stop = arguments[3];
+
+function first(xpath, context) {
+    if (!context) return null;
+    return document.evaluate(xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function all(xpath, context) {
+    var nodes = [];
+    if (!context) return nodes;
+    var result = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+
+function text(node) {
+    return node ? node.innerText : null;
+}
+
+function attr(node, name) {
+    if (!node) return null;
+    var value = node[name];
+    return (typeof value === "string" && value) ? value : node.getAttribute(name);
+}
+
+var items = Array.isArray(containers)
+    ? containers
+    : all(containers, document).slice(start, stop === null ? undefined : stop);
+
+return items.map(function (container, i) {
+    var caption = first(spec.caption.container, container);
+    var media = first(spec.media.container, container);
+    var metrics = first(spec.metrics.container, container);
+    var music = first(spec.music.container, container);
+
+    return {
+        index: start + i,
+        element: container,
+        url: attr(first(spec.url, container), "href"),
+        author: {
+            uniqueid: text(first(spec.author.uniqueid, container)),
+            avatar: attr(first(spec.author.avatar, container), "src"),
+            link: attr(first(spec.author.link, container), "href"),
+            nickname: text(first(spec.author.nickname, container))
+        },
+        caption: {
+            text: text(first(spec.caption.text, caption)),
+            tags: all(spec.caption.tags, caption).map(function (tag) {
+                return {link: attr(tag, "href"), text: text(first(spec.tag.text, tag))};
+            })
+        },
+        media: {
+            link: attr(first(spec.media.link, media), "src")
+        },
+        metrics: {
+            likes: text(first(spec.metrics.likes, metrics)),
+            comments: text(first(spec.metrics.comments, metrics)),
+            shares: text(first(spec.metrics.shares, metrics))
+        },
+        music: {
+            title: text(first(spec.music.title, music)),
+            link: attr(first(spec.music.link, music), "href")
+        }
+    };
+});
+"""
+
+class ScriptExtractor(Extractor):
+    """Extracts every field of one or more Tiktok video containers with a single `execute_script` round-trip,
+    instead of one WebDriver call per `find_element`, `.text` and `get_attribute`.
+
+    Args:
+        xpath (module): Either `tiktok_crawler.xpath.foryoupage` or `tiktok_crawler.xpath.search`.
+    """
+    def extract(self, driver: WebDriver, containers: Union[str, list[WebElement]], start: int = 0, stop: int = None) -> list[dict]:
+        """Evaluates the compiled `xpath` specification inside the browser.
+
+        Args:
+            driver (WebDriver): The Selenium web driver which holds the page.
+            containers (Union[str, list[WebElement]]): The XPath which matches the Tiktok video containers, or the containers of the
+                window `start:stop` themselves, e.g. from `tiktok_crawler.loader.IncrementalLoader.elements()`.
+            start (int): Index of the first container to extract.
+            stop (int): Index after the last container to extract. Extracts up to the last container if `None`.
+
+        Returns:
+            list[dict]: One record per extracted container. The `element` key holds the container as a `WebElement`.
+        """
+        records = driver.execute_script(EXTRACT_SCRIPT, self.spec, containers, start, stop)
+        logging.info(f"Extracted {len(records)} element(s) in a single script call")
+        return records
@@ -0,0 +1,214 @@
+from tiktok_crawler.config import Config
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import functools
+import json
+import math
+import re
+import threading
+import time
+
+class Histogram:
+    """Counts observed values, e.g. durations in seconds, into fixed cumulative buckets.
+
+    Args:
+        buckets (tuple): The upper bounds of the buckets, in increasing order.
+    """
+    def __init__(self, buckets: tuple = Config.INSTRUMENTATION_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile: float) -> float:
+        """Estimates a percentile by linear interpolation within its bucket.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The estimated value, `None` if nothing was observed.
+        """
+        if not self.count:
+            return None
+
+        rank = percentile / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - cumulative) / count
+                return min(max(value, self.min), self.max)
+            cumulative += count
+        return self.max
+
+    def summary(self) -> dict:
+        return dict(
+            count=self.count,
+            total=self.total,
+            mean=self.total / self.count if self.count else None,
+            min=self.min if self.count else None,
+            max=self.max if self.count else None,
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+        )
+
+class Registry:
+    """Collects the counters, histograms and, if `trace` is enabled, the trace spans of a run.
+
+    Timers are histograms of durations in seconds. The registry is thread safe and can be exported at the end of a run with
+    `to_json()` or `to_prometheus()`.
+
+    Args:
+        trace (bool): Records every timed block as a span with its parent, start and duration.
+        buckets (tuple): The upper bounds of the buckets of the histograms.
+    """
+    def __init__(self, trace: bool = Config.INSTRUMENTATION_TRACE, buckets: tuple = Config.INSTRUMENTATION_BUCKETS) -> None:
+        self.trace = trace
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.spans = []
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increments a counter.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Records a value in a histogram.
+        """
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(self.buckets)
+            self.histograms[name].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **attributes) -> Iterator[None]:
+        """Times a block into the histogram `name` and records it as a span if tracing is enabled.
+
+        Args:
+            name (str): The name of the timer, e.g. `driver.get`.
+            attributes: Attached to the span, e.g. the url.
+        """
+        stack = self._local.__dict__.setdefault("stack", [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            self.observe(name, elapsed)
+            if self.trace:
+                with self._lock:
+                    self.spans.append(dict(
+                        name=name,
+                        parent=parent,
+                        thread=threading.current_thread().name,
+                        start=time.time() - elapsed - self._started,
+                        duration=elapsed,
+                        **attributes
+                    ))
+
+    def timed(self, name: str) -> Callable:
+        """Decorates a function so that every call is timed, see `timer()`.
+        """
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self) -> dict:
+        """Summarizes the run.
+
+        Returns:
+            dict: The counters, and the count, total, mean, min, max and estimated percentiles of every histogram.
+        """
+        with self._lock:
+            return dict(
+                elapsed=time.time() - self._started,
+                counters=dict(self.counters),
+                histograms={name: histogram.summary() for name, histogram in self.histograms.items()},
+            )
+
+    def to_json(self, path: str = None) -> str:
+        """Exports the summary, and the spans if tracing is enabled, as JSON.
+
+        Args:
+            path (str): The file to write the JSON to, if given.
+
+        Returns:
+            str: The JSON document.
+        """
+        document = self.summary()
+        if self.trace:
+            with self._lock:
+                document["spans"] = list(self.spans)
+
+        text = json.dumps(document, indent=4)
+        if path:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    def to_prometheus(self, prefix: str = "tiktok_crawler") -> str:
+        """Exports the counters and histograms in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        def metric(name: str) -> str:
+            return f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE {metric(name)}_total counter", f"{metric(name)}_total {value}"]
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {metric(name)} histogram")
+                cumulative = 0
+                for bound, count in zip([*histogram.buckets, "+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric(name)}_bucket{{le="{bound}"}} {cumulative}')
+                lines += [f"{metric(name)}_sum {histogram.total}", f"{metric(name)}_count {histogram.count}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.spans.clear()
+            self._started = time.time()
+
+registry = Registry()
+"""The process wide registry used by the crawlers, loaders, waits, downloader and entities."""
+
+count = registry.count
+observe = registry.observe
+timer = registry.timer
+timed = registry.timed
@@ -0,0 +1,118 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+from tiktok_crawler.wait import AdaptiveWait
+
+from typing import Callable, Iterator
+import logging
+
+COUNT_SCRIPT = """
+return document.evaluate("count(" + arguments[0] + ")", document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+"""
+
+SLICE_SCRIPT = """
+var result = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var nodes = [];
+for (var i = arguments[1]; i < Math.min(arguments[2], result.snapshotLength); i++) {
+    var node = result.snapshotItem(i);
+    nodes.push(arguments[3] ? node[arguments[3]] || node.getAttribute(arguments[3]) : node);
+}
+return nodes;
+"""
+
+class IncrementalLoader:
+    """Loads the containers of an infinite-scroll page incrementally, handing out only the containers appended since the last window.
+
+    The loader keeps a cursor over the containers which were already handed out, so every scroll costs a single `count()`
+    round-trip instead of re-fetching the whole feed, and crawls stay linear in `limit`.
+
+    Args:
+        driver (WebDriver): The Selenium web driver which holds the page.
+        containers (str): The XPath which matches the containers.
+        limit (int): The number of containers to load.
+        load_more (Callable[[], bool]): Loads more containers, e.g. by scrolling. Returns `False` if there is nothing more to load.
+        max_idle (int): The number of consecutive `load_more` calls without any new container after which the loader gives up.
+        wait (AdaptiveWait): Polls for new containers after every `load_more` call. A new `tiktok_crawler.wait.AdaptiveWait` if not given.
+    """
+    def __init__(
+        self,
+        driver: WebDriver,
+        containers: str,
+        limit: int,
+        load_more: Callable[[], bool],
+        max_idle: int = Config.CRAWL_MAX_IDLE_SCROLLS,
+        wait: AdaptiveWait = None
+    ) -> None:
+        self.driver = driver
+        self.containers = containers
+        self.limit = limit
+        self.load_more = load_more
+        self.max_idle = max_idle
+        self.wait = wait or AdaptiveWait()
+        self.cursor = 0
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """Loads containers until `self.limit` is reached.
+
+        Yields:
+            tuple[int, int]: The `start` and `stop` index of the newly appended containers.
+        """
+        idle = 0
+        count = self.count()
+        while self.cursor < self.limit:
+            count = min(count, self.limit)
+            logging.info(f"Element count: {count}")
+            if count > self.cursor:
+                start, self.cursor = self.cursor, count
+                idle = 0
+                yield start, count
+                continue
+
+            if idle >= self.max_idle or not self._load_more():
+                logging.warning(f"No more elements to load after {self.cursor} element(s)")
+                return
+            idle += 1
+            count = self.wait.until(self._count_new, name="load") or self.cursor
+
+    def count(self) -> int:
+        """Counts the containers currently in the page with a single round-trip.
+
+        Returns:
+            int: The number of containers matched by `self.containers`.
+        """
+        return int(self.driver.execute_script(COUNT_SCRIPT, self.containers))
+
+    def elements(self, start: int, stop: int) -> list[WebElement]:
+        """Fetches only the containers in the window `start:stop`.
+
+        Args:
+            start (int): Index of the first container.
+            stop (int): Index after the last container.
+
+        Returns:
+            list[WebElement]: The containers as Selenium web elements.
+        """
+        return self.driver.execute_script(SLICE_SCRIPT, self.containers, start, stop, None)
+
+    def attributes(self, name: str, start: int, stop: int) -> list[str]:
+        """Fetches an attribute of the containers in the window `start:stop` without transferring the elements themselves.
+
+        Args:
+            name (str): The name of the attribute, e.g. `href`.
+            start (int): Index of the first container.
+            stop (int): Index after the last container.
+
+        Returns:
+            list[str]: The attribute of every container.
+        """
+        return self.driver.execute_script(SLICE_SCRIPT, self.containers, start, stop, name)
+
+    def _count_new(self) -> int:
+        count = self.count()
+        return count if count > self.cursor else 0
+
+    def _load_more(self) -> bool:
+        with instrumentation.timer("loader.load_more"):
+            return self.load_more()
@@ -0,0 +1,75 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import json
+import logging
+
+class MediaCapture:
+    """Captures the video urls requested by the page from the Chrome performance log, so media links are known as soon as
+    the browser requests them, without polling the DOM for the `<video>` element.
+
+    The driver must be created with the performance log enabled, see `tiktok_crawler.driver.create_driver()`.
+    Call `reset()` right before the navigation or scroll which loads a video, then `take()` returns the video requested since
+    whose url holds the id of the Tiktok video, or else the only video requested since. Pages which preload several videos
+    are never matched by order, since the preloaded video may belong to another container.
+
+    Args:
+        driver (WebDriver): The Selenium web driver to capture the requests of.
+    """
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver = driver
+        self._urls = []
+        self._seen = set()
+
+    def reset(self) -> None:
+        """Drops the urls captured so far and everything still pending in the performance log.
+        """
+        self.driver.get_log("performance")
+        self._urls.clear()
+        self._seen.clear()
+
+    def poll(self) -> list[str]:
+        """Reads the new entries of the performance log.
+
+        Returns:
+            list[str]: The video urls captured since the last `reset()` which were not taken yet, oldest first.
+        """
+        for entry in self.driver.get_log("performance"):
+            url = self._get_video_url(json.loads(entry["message"])["message"])
+            if url and url not in self._seen:
+                logging.debug(f"Captured video: {url}")
+                self._seen.add(url)
+                self._urls.append(url)
+        return list(self._urls)
+
+    def take(self, key: str = None) -> str:
+        """Returns the captured video url of a Tiktok video which was not taken yet.
+
+        Args:
+            key (str): The id of the Tiktok video, see `tiktok_crawler.dedup.video_key()`.
+
+        Returns:
+            str: The video url which contains `key`, or else the only video url captured since the last `reset()`. `None` if no
+            video was requested or if several were and none of them contains `key`.
+        """
+        self.poll()
+        url = next((url for url in self._urls if key and key in url), None)
+        if url is None and len(self._urls) == 1:
+            url = self._urls[0]
+        if url is None:
+            if self._urls:
+                logging.debug(f"Unable to match one of {len(self._urls)} captured video(s) to {key}")
+            return None
+
+        self._urls.remove(url)
+        return url
+
+    @staticmethod
+    def _get_video_url(message: dict) -> str:
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent" and params.get("type") == "Media":
+            return params["request"]["url"]
+        if message.get("method") == "Network.responseReceived":
+            response = params.get("response", {})
+            if response.get("mimeType", "").startswith("video/") or "mime_type=video" in response.get("url", ""):
+                return response["url"]
+        return None
@@ -0,0 +1,171 @@
+from tiktok_crawler.entities import Tiktok, save_tiktok
+
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class AuthorRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Author` without the web element.
+    """
+    uniqueid: str
+    nickname: str
+    link: str
+    avatar: str
+
+    def to_dict(self):
+        return dict(
+            uniqueid=self.uniqueid,
+            nickname=self.nickname,
+            link=self.link,
+            avatar=self.avatar,
+        )
+
+@dataclass(frozen=True, slots=True)
+class TagRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Tag` without the web element.
+    """
+    link: str
+    text: str
+
+    def to_dict(self):
+        return dict(
+            link=self.link,
+            text=self.text
+        )
+
+@dataclass(frozen=True, slots=True)
+class CaptionRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Caption` without the web element.
+    """
+    text: str
+    tags: tuple[TagRecord, ...]
+
+    def to_dict(self):
+        return dict(
+            tags=[tag.to_dict() for tag in self.tags],
+            text=self.text,
+        )
+
+@dataclass(frozen=True, slots=True)
+class MusicRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Music` without the web element.
+    """
+    title: str
+    link: str
+
+    def to_dict(self):
+        return dict(
+            title=self.title,
+            link=self.link,
+        )
+
+@dataclass(frozen=True, slots=True)
+class MediaRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Media` without the web element.
+    """
+    link: str
+
+    def to_dict(self):
+        return dict(
+            link=self.link,
+        )
+
+@dataclass(frozen=True, slots=True)
+class MetricsRecord:
+    """Immutable, slotted counterpart of `tiktok_crawler.entities.Metrics` without the web element.
+    """
+    likes: str
+    comments: str
+    shares: str
+    as_of: str
+    likes_count: int
+    comments_count: int
+    shares_count: int
+
+    def to_dict(self):
+        return dict(
+            likes=self.likes,
+            comments=self.comments,
+            shares=self.shares,
+            likes_count=self.likes_count,
+            comments_count=self.comments_count,
+            shares_count=self.shares_count,
+            as_of=self.as_of,
+        )
+
+@dataclass(frozen=True, slots=True)
+class TiktokRecord:
+    """Immutable, slotted record of a crawled Tiktok video, see `freeze()`.
+
+    Records hold no Selenium web element, so a finished crawl does not pin any driver-side handle, and records can be pickled
+    and sent between processes. They can be written to a `tiktok_crawler.sink.Sink` and passed to `tiktok_crawler.analytics`
+    like `tiktok_crawler.entities.Tiktok`.
+
+    Args:
+        id (str): Unique id of the Tiktok video.
+        author (AuthorRecord): The author of the Tiktok video.
+        caption (CaptionRecord): The caption of the Tiktok video.
+        music (MusicRecord): The music of the Tiktok video, `None` if it was not extracted.
+        media (MediaRecord): The video of the Tiktok video.
+        metrics (MetricsRecord): The metrics of the Tiktok video, `None` if they were not extracted.
+        status (str): A tag to signify if the scrape was sucessful.
+        url (str): The link of the page of the Tiktok video, if known.
+    """
+    id: str
+    author: AuthorRecord
+    caption: CaptionRecord
+    music: MusicRecord
+    media: MediaRecord
+    metrics: MetricsRecord
+    status: str = None
+    url: str = None
+
+    def save(self, path: str = "./", downloader = None, checkpoint = None, sink = None, seen = None):
+        """Saves the metadata and the video, see `tiktok_crawler.entities.Tiktok.save()`.
+        """
+        save_tiktok(self, path, downloader, checkpoint, sink, seen)
+
+    def to_dict(self):
+        return dict(
+            id=self.id,
+            Author=self.author.to_dict(),
+            Caption=self.caption.to_dict(),
+            Music=self.music.to_dict() if self.music else None,
+            Media=self.media.to_dict(),
+            Metrics=self.metrics.to_dict() if self.metrics else None,
+            Status=self.status,
+            Url=self.url
+        )
+
+def freeze(tiktok: Tiktok, elements: dict = None) -> TiktokRecord:
+    """Copies a Tiktok video into an immutable `TiktokRecord`, dropping its web elements.
+
+    Args:
+        tiktok (Tiktok): A `tiktok_crawler.entities.Tiktok` instance.
+        elements (dict): An optional side table which receives the web element of the Tiktok video by id, for the callers which
+            still need to act on the page.
+
+    Returns:
+        TiktokRecord: The record of the Tiktok video.
+    """
+    if elements is not None and tiktok.element is not None:
+        elements[tiktok.id] = tiktok.element
+
+    author, caption, music, media, metrics = tiktok.author, tiktok.caption, tiktok.music, tiktok.media, tiktok.metrics
+    return TiktokRecord(
+        id=tiktok.id,
+        author=AuthorRecord(uniqueid=author.uniqueid, nickname=author.nickname, link=author.link, avatar=author.avatar),
+        caption=CaptionRecord(text=caption.text, tags=tuple(TagRecord(link=tag.link, text=tag.text) for tag in caption.tags)),
+        music=MusicRecord(title=music.title, link=music.link) if music else None,
+        media=MediaRecord(link=media.link),
+        metrics=MetricsRecord(
+            likes=metrics.likes,
+            comments=metrics.comments,
+            shares=metrics.shares,
+            as_of=metrics.as_of,
+            likes_count=metrics.likes_count,
+            comments_count=metrics.comments_count,
+            shares_count=metrics.shares_count,
+        ) if metrics else None,
+        status=tiktok.status,
+        url=tiktok.url,
+    )
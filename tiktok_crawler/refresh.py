@@ -0,0 +1,147 @@
+from lxml import etree, html as lxml_html
+from requests.adapters import HTTPAdapter
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.cache import fetch_page
+from tiktok_crawler.config import Config
+from tiktok_crawler.dedup import video_key
+from tiktok_crawler.downloader import HostRateLimiter
+from tiktok_crawler.entities import Metrics
+from tiktok_crawler.extractor.hydration import find_items, parse_state
+from tiktok_crawler.timeseries import MetricsStore
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable
+import logging
+import requests
+
+if TYPE_CHECKING:
+    from tiktok_crawler.driver import DriverPool
+
+def read_metrics(page_source: str, url: str) -> Metrics:
+    """Reads only the metrics of a Tiktok video from the hydration state of its page.
+
+    Args:
+        page_source (str): The HTML of the page of the Tiktok video.
+        url (str): The link of the page of the Tiktok video.
+
+    Returns:
+        Metrics: The `tiktok_crawler.entities.Metrics` of the Tiktok video, `None` if the page is empty or holds no stats of it.
+    """
+    try:
+        document = lxml_html.fromstring(page_source)
+    except (etree.ParserError, ValueError):
+        return None
+    state = parse_state(document)
+    if state is None:
+        return None
+
+    key = video_key(url)
+    item = next((item for item in find_items(state) if str(item["id"]) == key), None)
+    stats = item.get("stats") if item is not None else None
+    if not stats:
+        return None
+
+    def count(name: str) -> str:
+        return str(stats[name]) if stats.get(name) is not None else ""
+
+    return Metrics(likes=count("diggCount"), comments=count("commentCount"), shares=count("shareCount"), element=None)
+
+class MetricsRefresher:
+    """Polls the metrics of already known Tiktok videos and appends them to a `tiktok_crawler.timeseries.MetricsStore`, without
+    extracting the author, caption, music and media again.
+
+    Every page is fetched over plain HTTP and only the stats of its hydration state are read, which needs no browser. If a page
+    has no stats, e.g. because Tiktok served a challenge, it is opened in a browser session of `pool`, if given.
+
+    Args:
+        store (MetricsStore): The time series to append the snapshots to. Its tracked videos are refreshed by default.
+        workers (int): The number of pages fetched concurrently.
+        rate (float): The maximum number of requests per second per host. Ignored if `limiter` is given.
+        limiter (HostRateLimiter): A `tiktok_crawler.downloader.HostRateLimiter`, e.g. shared with a running crawl.
+        pool (DriverPool): A `tiktok_crawler.driver.DriverPool` for the pages which cannot be read over HTTP. No fallback if `None`.
+        batch_size (int): The number of snapshots appended to the store per transaction.
+    """
+    def __init__(
+        self,
+        store: MetricsStore,
+        workers: int = Config.REFRESH_WORKERS,
+        rate: float = Config.REFRESH_RATE_LIMIT,
+        limiter: HostRateLimiter = None,
+        pool: "DriverPool" = None,
+        batch_size: int = Config.REFRESH_BATCH_SIZE
+    ) -> None:
+        self.store = store
+        self.workers = workers
+        self.limiter = limiter or HostRateLimiter(rate)
+        self.pool = pool
+        self.batch_size = batch_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def refresh(self, urls: Iterable[str] = None) -> dict:
+        """Takes one metrics snapshot of every Tiktok video.
+
+        Args:
+            urls (Iterable[str]): The links of the pages of the Tiktok videos. Defaults to the tracked videos of the store.
+
+        Returns:
+            dict: The number of `refreshed` and `failed` Tiktok videos.
+        """
+        urls = iter(self.store.urls() if urls is None else urls)
+        summary = dict(refreshed=0, failed=0)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while batch := list(islice(urls, self.batch_size)):
+                snapshots = [
+                    (url, metrics) for url, metrics in zip(batch, executor.map(self._refresh, batch)) if metrics is not None
+                ]
+                self.store.append(snapshots)
+                summary["refreshed"] += len(snapshots)
+                summary["failed"] += len(batch) - len(snapshots)
+                logging.info(f"Refreshed {summary['refreshed']} Tiktok video(s), {summary['failed']} failed")
+        return summary
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @instrumentation.timed("refresh.video")
+    def _refresh(self, url: str) -> Metrics:
+        metrics = None
+        self.limiter.wait(url)
+        try:
+            metrics = read_metrics(fetch_page(url, session=self.session), url)
+        except requests.RequestException as e:
+            logging.warning(f"Unable to fetch {url}: {e}")
+
+        if metrics is None and self.pool is not None:
+            metrics = self._refresh_in_browser(url)
+            if metrics is not None:
+                instrumentation.count("refresh.browser")
+        elif metrics is not None:
+            instrumentation.count("refresh.http")
+
+        if metrics is None:
+            instrumentation.count("refresh.failed")
+        return metrics
+
+    def _refresh_in_browser(self, url: str) -> Metrics:
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            with self.pool.session() as driver:
+                self.limiter.wait(url)
+                with instrumentation.timer("driver.get"):
+                    driver.get(url)
+                return read_metrics(driver.page_source, url)
+        except (WebDriverException, TimeoutError) as e:
+            logging.warning(f"Unable to refresh {url} in the browser: {e}")
+            return None
@@ -0,0 +1,197 @@
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+from tiktok_crawler.driver import DriverPool
+from tiktok_crawler.exception import CaptchaDetectedException, CaptchaTimeoutException
+from tiktok_crawler.xpath import search
+
+from dataclasses import dataclass
+from typing import Any, Callable
+import logging
+import threading
+import time
+import weakref
+
+def detect_captcha(driver: WebDriver, xpath: str = search.ContainerItem.CAPTCHA) -> bool:
+    """Checks once, without waiting, if the page of a driver shows a captcha or verification challenge.
+
+    Args:
+        driver (WebDriver): The Selenium web driver.
+        xpath (str): The XPath of the challenge.
+
+    Returns:
+        bool: `True` if the challenge is displayed.
+    """
+    try:
+        return bool(driver.find_elements(By.XPATH, xpath))
+    except WebDriverException:
+        return False
+
+@dataclass
+class SessionStats:
+    """The challenge statistics of a browser session.
+
+    Args:
+        requests (int): The number of tasks the session ran.
+        blocks (int): The number of tasks which hit a challenge.
+        consecutive (int): The number of challenges since the last successful task.
+        interval (float): The current pause between two tasks of the session, in seconds.
+        next_at (float): The `time.monotonic()` at which the next task may start.
+    """
+    requests: int = 0
+    blocks: int = 0
+    consecutive: int = 0
+    interval: float = 0.0
+    next_at: float = 0.0
+
+    @property
+    def block_rate(self) -> float:
+        return self.blocks / self.requests if self.requests else 0.0
+
+class SessionScheduler:
+    """Hands the tasks of a crawl to the healthy sessions of a `tiktok_crawler.driver.DriverPool` and parks the sessions which hit a
+    captcha, so one challenged browser does not stall the others.
+
+    A task raises `tiktok_crawler.exception.CaptchaDetectedException` when it finds a challenge, see `detect_captcha()`. Its session
+    is then parked for a cooldown which doubles with every consecutive challenge, up to `max_cooldown`, and the task is retried
+    on another session. A parked session frees its slot of the pool, so the retry never waits for the cooldown. A session which was challenged `max_blocks` times in a row is quit and replaced by a fresh one.
+
+    The pace of every session adapts to its block rate: every challenge doubles the pause between its tasks, starting at `pacing`,
+    and every successful task halves it.
+
+    Args:
+        pool (DriverPool): The pool of the browser sessions.
+        cooldown (float): The number of seconds a session is parked after its first challenge.
+        max_cooldown (float): The maximum number of seconds a session is parked.
+        max_blocks (int): The number of consecutive challenges after which a session is replaced.
+        max_attempts (int): The number of sessions a task is tried on before `CaptchaTimeoutException` is raised.
+        pacing (float): The pause between two tasks of a session after its first challenge, in seconds.
+    """
+    def __init__(
+        self,
+        pool: DriverPool,
+        cooldown: float = Config.CAPTCHA_COOLDOWN,
+        max_cooldown: float = Config.CAPTCHA_MAX_COOLDOWN,
+        max_blocks: int = Config.CAPTCHA_MAX_BLOCKS,
+        max_attempts: int = Config.CAPTCHA_MAX_ATTEMPTS,
+        pacing: float = Config.CAPTCHA_PACING
+    ) -> None:
+        self.pool = pool
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_blocks = max_blocks
+        self.max_attempts = max_attempts
+        self.pacing = pacing
+        self.stats = weakref.WeakKeyDictionary()
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def run(self, task: Callable[[WebDriver], Any]) -> Any:
+        """Runs a task on a healthy session, moving it to another session whenever it hits a challenge.
+
+        Args:
+            task (Callable[[WebDriver], Any]): Visits a page with the given driver, raising `CaptchaDetectedException` on a challenge.
+
+        Returns:
+            Any: The value returned by the task.
+
+        Raises:
+            CaptchaTimeoutException: if the task hit a challenge on `max_attempts` sessions.
+            TimeoutError: if no session was free within the timeout of the pool, see `tiktok_crawler.driver.DriverPool.acquire()`.
+        """
+        for _ in range(self.max_attempts):
+            driver = self.pool.acquire()
+            self._pace(driver)
+            try:
+                value = task(driver)
+            except CaptchaDetectedException as e:
+                self._park(driver, e)
+                continue
+            except BaseException:
+                self.pool.release(driver)
+                raise
+
+            self._succeed(driver)
+            self.pool.release(driver)
+            return value
+
+        raise CaptchaTimeoutException(f"Challenged on {self.max_attempts} session(s)")
+
+    def summary(self) -> dict:
+        """Summarizes the challenges of the live sessions.
+
+        Returns:
+            dict: The number of sessions, parked sessions, requests and challenges, and the block rate of every session.
+        """
+        with self._lock:
+            stats = list(self.stats.values())
+            return dict(
+                sessions=len(stats),
+                parked=len(self._timers),
+                requests=sum(stat.requests for stat in stats),
+                blocks=sum(stat.blocks for stat in stats),
+                block_rates=[round(stat.block_rate, 3) for stat in stats],
+            )
+
+    def close(self) -> None:
+        """Quits the parked sessions right away instead of returning them to the pool after their cooldown.
+        """
+        with self._lock:
+            timers = list(self._timers.items())
+            self._timers.clear()
+        for driver, timer in timers:
+            timer.cancel()
+            self.pool.discard(driver, parked=True)
+
+    def _pace(self, driver: WebDriver) -> None:
+        with self._lock:
+            stat = self.stats.setdefault(driver, SessionStats())
+            stat.requests += 1
+            now = time.monotonic()
+            start = max(now, stat.next_at)
+            stat.next_at = start + stat.interval
+
+        if start > now:
+            with instrumentation.timer("scheduler.pace"):
+                time.sleep(start - now)
+
+    def _succeed(self, driver: WebDriver) -> None:
+        with self._lock:
+            stat = self.stats[driver]
+            stat.consecutive = 0
+            stat.interval = stat.interval / 2 if stat.interval >= self.pacing / 8 else 0.0
+
+    def _park(self, driver: WebDriver, error: Exception) -> None:
+        with self._lock:
+            stat = self.stats[driver]
+            stat.blocks += 1
+            stat.consecutive += 1
+            stat.interval = min(max(stat.interval * 2, self.pacing), self.max_cooldown)
+            consecutive = stat.consecutive
+        instrumentation.count("captcha.detected")
+
+        if consecutive >= self.max_blocks:
+            logging.warning(f"Replacing a session challenged {consecutive} time(s) in a row: {error}")
+            instrumentation.count("captcha.replaced")
+            self.pool.discard(driver)
+            return
+
+        cooldown = min(self.cooldown * 2 ** (consecutive - 1), self.max_cooldown)
+        logging.warning(f"Parking a challenged session for {cooldown} seconds: {error}")
+        instrumentation.count("captcha.parked")
+        timer = threading.Timer(cooldown, self._unpark, (driver,))
+        timer.daemon = True
+        with self._lock:
+            self._timers[driver] = timer
+        self.pool.park(driver)
+        timer.start()
+
+    def _unpark(self, driver: WebDriver) -> None:
+        with self._lock:
+            if self._timers.pop(driver, None) is None:
+                return
+        logging.info("Returning a parked session to the pool")
+        self.pool.unpark(driver)
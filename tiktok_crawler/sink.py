@@ -0,0 +1,230 @@
+from abc import ABC, abstractmethod
+import json
+import logging
+import os
+import re
+import threading
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+COLUMNS = {
+    "id": str,
+    "url": str,
+    "status": str,
+    "author_uniqueid": str,
+    "author_nickname": str,
+    "author_link": str,
+    "author_avatar": str,
+    "caption_text": str,
+    "caption_tags": list,
+    "music_title": str,
+    "music_link": str,
+    "media_link": str,
+    "metrics_likes": str,
+    "metrics_comments": str,
+    "metrics_shares": str,
+    "metrics_likes_count": int,
+    "metrics_comments_count": int,
+    "metrics_shares_count": int,
+    "metrics_as_of": str,
+}
+
+def flatten(tiktok) -> dict:
+    """Flattens the nested `to_dict()` of a Tiktok video into the typed columns of `COLUMNS`.
+
+    Args:
+        tiktok (Tiktok): A `tiktok_crawler.entities.Tiktok` instance.
+
+    Returns:
+        dict: One value per column, `None` for the entities which were not extracted.
+    """
+    author, caption, music, media, metrics = tiktok.author, tiktok.caption, tiktok.music, tiktok.media, tiktok.metrics
+    return dict(
+        id=tiktok.id,
+        url=tiktok.url,
+        status=tiktok.status,
+        author_uniqueid=author.uniqueid if author else None,
+        author_nickname=author.nickname if author else None,
+        author_link=author.link if author else None,
+        author_avatar=author.avatar if author else None,
+        caption_text=caption.text if caption else None,
+        caption_tags=[tag.text for tag in caption.tags] if caption else [],
+        music_title=music.title if music else None,
+        music_link=music.link if music else None,
+        media_link=media.link if media else None,
+        metrics_likes=metrics.likes if metrics else None,
+        metrics_comments=metrics.comments if metrics else None,
+        metrics_shares=metrics.shares if metrics else None,
+        metrics_likes_count=metrics.likes_count if metrics else None,
+        metrics_comments_count=metrics.comments_count if metrics else None,
+        metrics_shares_count=metrics.shares_count if metrics else None,
+        metrics_as_of=metrics.as_of if metrics else None,
+    )
+
+class Sink(ABC):
+    """Base class of the output sinks. A sink buffers the metadata of the Tiktok videos and writes it in batches,
+    rotating to a new file every `max_records` records.
+
+    The files are numbered parts, e.g. `tiktoks-00000.jsonl`. Every new file takes the number after the highest part already in
+    `path`, so a sink never appends to or overwrites the files of a previous run.
+
+    Sinks are thread safe, so the workers of a `tiktok_crawler.downloader.Downloader` can share one.
+
+    Args:
+        path (str): The directory where the files are written.
+        prefix (str): The prefix of the file names.
+        batch_size (int): The number of records buffered before they are written.
+        max_records (int): The number of records after which the sink rotates to a new file.
+    """
+    EXTENSION = None
+
+    def __init__(self, path: str, prefix: str = "tiktoks", batch_size: int = 1000, max_records: int = 100_000) -> None:
+        self.path = path
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.max_records = max_records
+        self._buffer = []
+        self._part = 0
+        self._written = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, tiktok) -> None:
+        """Buffers the metadata of a Tiktok video and writes the batch once it is full.
+
+        Args:
+            tiktok (Tiktok): A `tiktok_crawler.entities.Tiktok` instance.
+        """
+        with self._lock:
+            self._buffer.append(self._to_record(tiktok))
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Writes the buffered records.
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """Writes the buffered records and closes the current file.
+        """
+        with self._lock:
+            self._flush()
+            self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _flush(self) -> None:
+        while self._buffer:
+            if self._written >= self.max_records:
+                self._close_file()
+                self._written = 0
+
+            batch = self._buffer[:self.max_records - self._written]
+            self._buffer = self._buffer[len(batch):]
+            self._write_batch(batch)
+            self._written += len(batch)
+            logging.info(f"Wrote {len(batch)} record(s) to {self._file_path()}")
+
+    def _file_path(self) -> str:
+        return os.path.join(self.path, f"{self.prefix}-{self._part:05d}.{self.EXTENSION}")
+
+    def _new_file_path(self) -> str:
+        """Moves on to the part after the highest part in `self.path`.
+
+        Returns:
+            str: The path of the new file, which does not exist yet.
+        """
+        pattern = re.compile(rf"{re.escape(self.prefix)}-(\d+)\.{self.EXTENSION}")
+        parts = [int(match.group(1)) for name in os.listdir(self.path) if (match := pattern.fullmatch(name))]
+        self._part = max(parts, default=-1) + 1
+        return self._file_path()
+
+    @abstractmethod
+    def _to_record(self, tiktok) -> dict:
+        ...
+
+    @abstractmethod
+    def _write_batch(self, records: list[dict]) -> None:
+        ...
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        ...
+
+class JsonlSink(Sink):
+    """Appends the nested `to_dict()` of every Tiktok video as one line of a JSON Lines file.
+
+    Args:
+        path (str): The directory where the files are written.
+        prefix (str): The prefix of the file names.
+        batch_size (int): The number of records buffered before they are written.
+        max_records (int): The number of records after which the sink rotates to a new file.
+    """
+    EXTENSION = "jsonl"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._file = None
+
+    def _to_record(self, tiktok) -> dict:
+        return tiktok.to_dict()
+
+    def _write_batch(self, records: list[dict]) -> None:
+        if self._file is None:
+            self._file = open(self._new_file_path(), "x")
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ParquetSink(Sink):
+    """Writes the flattened Tiktok videos (see `flatten()`) as typed columns of a Parquet file, one row group per batch.
+    Requires `pyarrow`.
+
+    Args:
+        path (str): The directory where the files are written.
+        prefix (str): The prefix of the file names.
+        batch_size (int): The number of records buffered before they are written.
+        max_records (int): The number of records after which the sink rotates to a new file.
+    """
+    EXTENSION = "parquet"
+
+    def __init__(self, *args, **kwargs) -> None:
+        if pyarrow is None:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow")
+
+        super().__init__(*args, **kwargs)
+        self._writer = None
+        types = {str: pyarrow.string(), int: pyarrow.int64(), list: pyarrow.list_(pyarrow.string())}
+        self._schema = pyarrow.schema([(name, types[kind]) for name, kind in COLUMNS.items()])
+
+    def _to_record(self, tiktok) -> dict:
+        return flatten(tiktok)
+
+    def _write_batch(self, records: list[dict]) -> None:
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._new_file_path(), self._schema)
+        self._writer.write_table(pyarrow.Table.from_pylist(records, schema=self._schema))
+
+    def _close_file(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+SINKS = {
+    "jsonl": JsonlSink,
+    "parquet": ParquetSink,
+}
@@ -0,0 +1,117 @@
+from tiktok_crawler.analytics import METRICS
+from tiktok_crawler.dedup import video_key
+from tiktok_crawler.entities import Metrics
+
+import datetime
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+class MetricsStore:
+    """A compact time series of the metrics of the tracked Tiktok videos in SQLite.
+
+    Every snapshot is a single row of integers, the numeric id of the video, the UNIX time of `Metrics.as_of` and the parsed counts,
+    in a table clustered by video and time, so the history of a video is read with a single range scan.
+
+    Args:
+        path (str): The path of the SQLite database.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS videos (id INTEGER PRIMARY KEY, url TEXT NOT NULL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "id INTEGER NOT NULL, as_of INTEGER NOT NULL, likes INTEGER, comments INTEGER, shares INTEGER, "
+            "PRIMARY KEY (id, as_of)) WITHOUT ROWID"
+        )
+
+    def track(self, urls: list[str]) -> int:
+        """Adds Tiktok videos to the tracked set. Links without the id of a video are ignored.
+
+        Args:
+            urls (list[str]): The links of the pages of the Tiktok videos, e.g. from `tiktok_crawler.dedup.SeenIndex.urls()`.
+
+        Returns:
+            int: The number of newly tracked Tiktok videos.
+        """
+        rows = [(int(key), url) for url in urls if (key := video_key(url))]
+        with self._lock:
+            changes = self._connection.total_changes
+            self._connection.executemany("INSERT OR IGNORE INTO videos (id, url) VALUES (?, ?)", rows)
+            return self._connection.total_changes - changes
+
+    def urls(self) -> list[str]:
+        """Lists the links of the tracked Tiktok videos.
+        """
+        return [url for url, in self._execute("SELECT url FROM videos ORDER BY id")]
+
+    def append(self, snapshots: list[tuple[str, Metrics]]) -> None:
+        """Appends metrics snapshots in a single transaction. A second snapshot of a video within the same second replaces the first.
+        Snapshots of links without the id of a video are skipped.
+
+        Args:
+            snapshots (list[tuple[str, Metrics]]): The link of the Tiktok video and its `tiktok_crawler.entities.Metrics`.
+        """
+        rows = []
+        for url, metrics in snapshots:
+            key = video_key(url)
+            if not key:
+                logging.warning(f"Skipping the metrics of a link without a video id: {url}")
+                continue
+            rows.append((
+                int(key),
+                int(datetime.datetime.fromisoformat(metrics.as_of).timestamp()),
+                metrics.likes_count,
+                metrics.comments_count,
+                metrics.shares_count,
+            ))
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO snapshots (id, as_of, likes, comments, shares) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def history(self, url: str) -> dict:
+        """Reads the time series of a Tiktok video as columnar NumPy arrays, like `tiktok_crawler.analytics.to_arrays()`.
+
+        Args:
+            url (str): The link of the page of the Tiktok video.
+
+        Returns:
+            dict: The `as_of` array of `datetime64[s]` and one `float64` array per metric in `tiktok_crawler.analytics.METRICS`,
+            oldest first. Counts which could not be parsed are `NaN`. The arrays are empty if the link holds no video id.
+        """
+        key = video_key(url)
+        rows = self._execute(
+            "SELECT as_of, likes, comments, shares FROM snapshots WHERE id = ? ORDER BY as_of", int(key)
+        ) if key else []
+        arrays = dict(as_of=np.array([row[0] for row in rows], dtype="datetime64[s]"))
+        for index, name in enumerate(METRICS, 1):
+            arrays[name] = np.array([np.nan if row[index] is None else row[index] for row in rows], dtype=np.float64)
+        return arrays
+
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM videos")[0][0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _execute(self, sql: str, *params) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
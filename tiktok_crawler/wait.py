@@ -0,0 +1,118 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from tiktok_crawler import instrumentation
+from tiktok_crawler.config import Config
+
+from collections import deque
+from typing import Any, Callable
+import logging
+import time
+
+NODE_READY_SCRIPT = """
+var node = arguments[0], xpaths = arguments[1], name = arguments[2];
+for (var i = 0; node && i < xpaths.length; i++) {
+    node = document.evaluate(xpaths[i], node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+return !!node && !!(node[name] || node.getAttribute(name));
+"""
+
+class AdaptiveWait:
+    """Polls for a readiness condition with exponential backoff instead of sleeping for a fixed amount of time.
+
+    The first poll happens right away, then the interval grows from `initial` by `factor` up to `ceiling` until the condition
+    holds or `timeout` is exceeded. The time the last `window` waits actually took is recorded per name, see `summary()`, so
+    a long crawl keeps a bounded amount of history.
+
+    Args:
+        initial (float): The first poll interval in seconds.
+        factor (float): The growth factor of the poll interval.
+        ceiling (float): The maximum poll interval in seconds.
+        timeout (float): The default maximum number of seconds to wait.
+        window (int): The number of waits recorded per name.
+    """
+    def __init__(
+        self,
+        initial:float = Config.CRAWL_WAIT_INITIAL,
+        factor:float = Config.CRAWL_WAIT_FACTOR,
+        ceiling:float = Config.CRAWL_SCROLL_PAUSE_TIME,
+        timeout:float = Config.CRAWL_WAIT_TIMEOUT,
+        window:int = Config.CRAWL_WAIT_WINDOW
+    ) -> None:
+        self.initial = initial
+        self.factor = factor
+        self.ceiling = ceiling
+        self.timeout = timeout
+        self.window = window
+        self.durations = {}
+
+    def until(self, condition: Callable[[], Any], name: str = "wait", timeout: float = None) -> Any:
+        """Polls `condition` until it returns a truthy value.
+
+        Args:
+            condition (Callable[[], Any]): The readiness condition.
+            name (str): The name under which the duration of the wait is recorded.
+            timeout (float): The maximum number of seconds to wait. Defaults to `self.timeout`.
+
+        Returns:
+            Any: The last value returned by `condition`, falsy if the wait timed out.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        delay = self.initial
+        while True:
+            value = condition()
+            elapsed = time.monotonic() - started
+            if value or elapsed >= timeout:
+                self._record(name, elapsed, bool(value))
+                return value
+
+            time.sleep(min(delay, self.ceiling, timeout - elapsed))
+            delay *= self.factor
+
+    def until_attribute(self, driver: WebDriver, element: WebElement, xpaths: list[str], name: str, timeout: float = None) -> bool:
+        """Waits until the node reached by following `xpaths` from `element` has the attribute `name`, e.g. the `src` of a video.
+        Every poll is a single script round-trip.
+
+        Args:
+            driver (WebDriver): The Selenium web driver which holds the page.
+            element (WebElement): The element to start from.
+            xpaths (list[str]): The XPaths to follow, each one relative to the node matched by the previous one.
+            name (str): The name of the attribute.
+            timeout (float): The maximum number of seconds to wait. Defaults to `self.timeout`.
+
+        Returns:
+            bool: `True` if the attribute is present, `False` if the wait timed out.
+        """
+        return self.until(
+            lambda: driver.execute_script(NODE_READY_SCRIPT, element, xpaths, name),
+            name=f"attribute:{name}",
+            timeout=timeout
+        )
+
+    def summary(self) -> dict:
+        """Summarizes the recorded waits, i.e. the last `window` waits per name.
+
+        Returns:
+            dict: The number of waits, timeouts, total, mean and maximum duration in seconds per name.
+        """
+        return {
+            name: dict(
+                count=len(durations),
+                timeouts=sum(1 for _, ready in durations if not ready),
+                total=sum(duration for duration, _ in durations),
+                mean=sum(duration for duration, _ in durations) / len(durations),
+                max=max(duration for duration, _ in durations),
+            )
+            for name, durations in self.durations.items()
+        }
+
+    def _record(self, name: str, elapsed: float, ready: bool) -> None:
+        self.durations.setdefault(name, deque(maxlen=self.window)).append((elapsed, ready))
+        instrumentation.observe(f"wait.{name}", elapsed)
+        if not ready:
+            instrumentation.count(f"wait.{name}.timeouts")
+        if ready:
+            logging.debug(f"{name} ready after {elapsed:.3f}s")
+        else:
+            logging.warning(f"{name} timed out after {elapsed:.3f}s")
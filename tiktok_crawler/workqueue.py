@@ -0,0 +1,194 @@
+from tiktok_crawler.config import Config
+from tiktok_crawler.wait import AdaptiveWait
+
+from typing import Iterator
+import logging
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+class WorkQueue:
+    """A durable queue in SQLite which joins the stages of a crawl, e.g. the discovery of the links of the Tiktok videos and
+    their extraction. Producers and consumers may run in different threads or processes and be restarted independently.
+
+    A consumer leases an item with `get()` and either acknowledges it with `ack()` or returns it with `nack()`. An expired lease,
+    e.g. because the consumer died, counts as a failed attempt like `nack()`, so an item which keeps killing its consumers is
+    failed after `max_attempts` leases instead of being handed out forever. The producer calls `finish()` once it has put every item,
+    after which consumers stop as soon as the queue is drained.
+
+    Args:
+        path (str): The path of the SQLite database.
+        name (str): The name of the queue. Several queues can share one database.
+        lease_timeout (float): The number of seconds after which a leased item is handed out again.
+        max_attempts (int): The number of failed attempts after which an item is no longer retried.
+    """
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        lease_timeout: float = Config.QUEUE_LEASE_TIMEOUT,
+        max_attempts: int = Config.QUEUE_MAX_ATTEMPTS
+    ) -> None:
+        self.path = path
+        self.name = name
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS queues (name TEXT PRIMARY KEY, finished INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, leased_until REAL, error TEXT, updated_at REAL, UNIQUE (queue, payload))"
+        )
+        self._execute("INSERT OR IGNORE INTO queues (name) VALUES (?)", self.name)
+
+    def put(self, payloads: list[str]) -> int:
+        """Appends items to the queue. Items which were put before are ignored, whatever their state.
+
+        Args:
+            payloads (list[str]): The items, e.g. the links of the Tiktok videos.
+
+        Returns:
+            int: The number of new items.
+        """
+        with self._lock:
+            changes = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO items (queue, payload, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(self.name, payload, PENDING, time.time()) for payload in payloads]
+            )
+            return self._connection.total_changes - changes
+
+    def get(self) -> str:
+        """Leases the oldest pending item, after returning the items whose lease expired to the queue.
+
+        Returns:
+            str: The item, `None` if no item is available right now.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._connection.execute(
+                    "UPDATE items SET attempts = attempts + 1, error = ?, leased_until = NULL, updated_at = ?, "
+                    "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END WHERE queue = ? AND status = ? AND leased_until < ?",
+                    ("Lease expired", now, self.max_attempts, FAILED, PENDING, self.name, LEASED, now)
+                ).rowcount
+                row = self._connection.execute(
+                    "SELECT id, payload FROM items WHERE queue = ? AND status = ? AND attempts < ? ORDER BY id LIMIT 1",
+                    (self.name, PENDING, self.max_attempts)
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE items SET status = ?, leased_until = ?, updated_at = ? WHERE id = ?",
+                        (LEASED, now + self.lease_timeout, now, row[0])
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        if expired:
+            logging.warning(f"Queue {self.name}: {expired} lease(s) expired")
+        return row[1] if row is not None else None
+
+    def ack(self, payload: str) -> None:
+        """Records that an item was processed.
+        """
+        self._execute(
+            "UPDATE items SET status = ?, leased_until = NULL, updated_at = ? WHERE queue = ? AND payload = ?",
+            DONE, time.time(), self.name, payload
+        )
+
+    def nack(self, payload: str, error: str) -> None:
+        """Returns a leased item to the queue after a failed attempt. The item is failed after `max_attempts` attempts.
+
+        Args:
+            payload (str): The item.
+            error (str): The reason of the failure.
+        """
+        logging.warning(f"Queue {self.name}: {payload} failed: {error}")
+        self._execute(
+            "UPDATE items SET attempts = attempts + 1, error = ?, leased_until = NULL, updated_at = ?, "
+            "status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END WHERE queue = ? AND payload = ?",
+            str(error), time.time(), self.max_attempts, FAILED, PENDING, self.name, payload
+        )
+
+    def finish(self) -> None:
+        """Records that the producer has put every item.
+        """
+        self._execute("UPDATE queues SET finished = 1 WHERE name = ?", self.name)
+
+    def is_finished(self) -> bool:
+        """Checks if the producer has put every item, possibly in a previous run.
+
+        Returns:
+            bool: `True` if `finish()` was called for the queue.
+        """
+        rows = self._execute("SELECT finished FROM queues WHERE name = ?", self.name)
+        return bool(rows and rows[0][0])
+
+    def is_drained(self) -> bool:
+        """Checks if the producer has finished and every item is either done or failed.
+
+        Returns:
+            bool: `True` if no item will be handed out anymore.
+        """
+        rows = self._execute(
+            "SELECT COUNT(*) FROM items WHERE queue = ? AND status IN (?, ?) AND attempts < ?",
+            self.name, PENDING, LEASED, self.max_attempts
+        )
+        return self.is_finished() and rows[0][0] == 0
+
+    def consume(self, wait: AdaptiveWait = None, stop: threading.Event = None) -> Iterator[str]:
+        """Leases the items one at a time until the queue is drained. Every item must be acknowledged with `ack()` or `nack()`.
+
+        Args:
+            wait (AdaptiveWait): The `tiktok_crawler.wait.AdaptiveWait` which polls the queue while it is empty.
+            stop (threading.Event): Stops the consumer once set.
+
+        Yields:
+            str: The leased item.
+        """
+        wait = wait or AdaptiveWait()
+        while not (stop and stop.is_set()):
+            payload = self.get()
+            if payload is None:
+                if self.is_drained():
+                    return
+                payload = wait.until(self.get, name="queue")
+            if payload is not None:
+                yield payload
+
+    def summary(self) -> dict:
+        """Counts the items of the queue per state.
+
+        Returns:
+            dict: The number of items per state.
+        """
+        return dict(self._execute("SELECT status, COUNT(*) FROM items WHERE queue = ? GROUP BY status", self.name))
+
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM items WHERE queue = ? AND status = ?", self.name, PENDING)[0][0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _execute(self, sql: str, *params) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()